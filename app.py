@@ -1,7 +1,12 @@
+import os
 from flask import Flask
 from app import create_app
 
 app = create_app()
 
 if __name__ == '__main__':
+    # Com o reloader, só o processo filho (o que atende) agenda tarefas
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        from app.agendador import iniciar_agendador
+        iniciar_agendador(app)
     app.run(debug=True, host='0.0.0.0', port=8080)
\ No newline at end of file
@@ -1,14 +1,36 @@
+import time
 from flask import Flask, redirect, url_for, session
+from app.config import Config
 
 def create_app():
+    inicio = time.perf_counter()
     app = Flask(__name__)
+    app.config.from_object(Config)
     app.config['SECRET_KEY'] = 'sua-chave-secreta'
     
-    # Configurar banco
-    from app.models.database import db, Lote, Producao, Usuarios, EstoqueVacina, Vacinacao
-    if not db.is_connection_usable():
-        db.connect()
-    db.create_tables([Lote, Producao, Usuarios, EstoqueVacina, Vacinacao], safe=True)
+    # Configurar banco (o schema é criado/migrado por `flask init-db` ou init_db.py)
+    from app.models.database import db, configurar_banco, relatorio_pragmas
+    from app.models.migrations import migracoes_pendentes
+    configurar_banco(app.config)
+    with db.connection_context():
+        app.logger.info("SQLite %s: %s", app.config['DATABASE_PATH'], relatorio_pragmas())
+        pendentes = migracoes_pendentes()
+        if pendentes:
+            app.logger.warning("Banco desatualizado: %d migração(ões) pendente(s). Execute `flask init-db`.",
+                               len(pendentes))
+
+    from app.cli import registrar_comandos
+    registrar_comandos(app)
+
+    # Cada requisição pega uma conexão do pool e a devolve ao final
+    @app.before_request
+    def abrir_conexao_banco():
+        db.connect(reuse_if_open=True)
+
+    @app.teardown_request
+    def fechar_conexao_banco(exc):
+        if not db.is_closed():
+            db.close()
 
     # Registrar blueprints WEB (páginas)
     from app.routes.auth_routes import auth_bp
@@ -18,6 +40,7 @@ def create_app():
     from app.routes.estoque_vacina_routes import estoque_vacina_web
     from app.routes.vacina_routes import vacina_web 
     from app.api.endpoints.producao_api import producao_api
+    from app.api.endpoints.insumo_api import insumo_api
     from app.routes.routes import bp as api_routes
     from app.routes.insumo_routes import insumo_web 
 
@@ -31,6 +54,7 @@ def create_app():
     app.register_blueprint(vacina_web)          
     
     app.register_blueprint(producao_api)                      
+    app.register_blueprint(insumo_api)
     app.register_blueprint(api_routes, url_prefix='/api')     
 
     app.register_blueprint(insumo_web, url_prefix='/insumos') 
@@ -47,5 +71,12 @@ def create_app():
             return redirect(url_for('auth.login'))
         # Se está logado, vai para o dashboard
         return redirect(url_for('dashboard.index'))
+
+    duracao_ms = (time.perf_counter() - inicio) * 1000
+    app.config['STARTUP_TIME_MS'] = round(duracao_ms, 1)
+    if duracao_ms > app.config['STARTUP_BUDGET_MS']:
+        app.logger.warning("create_app levou %.0f ms (orçamento: %d ms)", duracao_ms, app.config['STARTUP_BUDGET_MS'])
+    else:
+        app.logger.info("create_app levou %.0f ms", duracao_ms)
     
     return app
\ No newline at end of file
@@ -0,0 +1,301 @@
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set
+from peewee import fn
+from app.models.database import db, ExecucaoTarefa
+
+logger = logging.getLogger(__name__)
+
+class Agenda:
+    """Expressão cron de 5 campos: minuto, hora, dia do mês, mês e dia da semana (0 ou 7 = domingo).
+
+    Cada campo aceita *, números, intervalos (1-5), listas (1,15) e passos (*/10, 8-18/2).
+    """
+    LIMITES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expressao: str):
+        campos = expressao.split()
+        if len(campos) != 5:
+            raise ValueError(f"Agenda deve ter 5 campos (minuto hora dia mês dia-da-semana): {expressao!r}")
+        self.expressao = ' '.join(campos)
+        self.minutos, self.horas, self.dias, self.meses, self.dias_semana = (
+            Agenda._campo(campo, minimo, maximo) for campo, (minimo, maximo) in zip(campos, Agenda.LIMITES))
+        if 7 in self.dias_semana:
+            self.dias_semana = (self.dias_semana - {7}) | {0}
+        # Como no cron: com dia do mês e dia da semana restritos, basta um dos dois coincidir
+        self._qualquer_dia = campos[2] == '*' or campos[4] == '*'
+
+    @staticmethod
+    def _campo(texto: str, minimo: int, maximo: int) -> Set[int]:
+        valores = set()
+        for parte in texto.split(','):
+            intervalo, _, passo = parte.partition('/')
+            try:
+                if intervalo == '*':
+                    inicio, fim = minimo, maximo
+                elif '-' in intervalo:
+                    inicio, fim = (int(v) for v in intervalo.split('-', 1))
+                else:
+                    inicio = int(intervalo)
+                    fim = maximo if passo else inicio       # "5/15" = de 5 em diante, de 15 em 15
+                passo = int(passo) if passo else 1
+            except ValueError:
+                raise ValueError(f"Campo de agenda inválido: {texto!r}")
+            if not minimo <= inicio <= fim <= maximo or passo < 1:
+                raise ValueError(f"Campo de agenda fora do intervalo {minimo}-{maximo}: {texto!r}")
+            valores.update(range(inicio, fim + 1, passo))
+        return valores
+
+    def _dia_confere(self, dia: date) -> bool:
+        no_mes = dia.day in self.dias
+        na_semana = dia.isoweekday() % 7 in self.dias_semana
+        return (no_mes and na_semana) if self._qualquer_dia else (no_mes or na_semana)
+
+    def proxima(self, apos: datetime) -> datetime:
+        """Primeiro minuto da agenda estritamente depois de `apos`."""
+        momento = apos.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limite = momento + timedelta(days=5 * 366)
+        while momento < limite:
+            if momento.month not in self.meses:
+                momento = (momento.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._dia_confere(momento.date()):
+                momento = momento.replace(hour=0, minute=0) + timedelta(days=1)
+            elif momento.hour not in self.horas:
+                momento = momento.replace(minute=0) + timedelta(hours=1)
+            elif momento.minute not in self.minutos:
+                momento += timedelta(minutes=1)
+            else:
+                return momento
+        raise ValueError(f"Agenda nunca é executada: {self.expressao!r}")
+
+class Tarefa:
+    def __init__(self, nome: str, agenda: str, funcao: Callable[[], Any], descricao: str = '',
+                 lease_segundos: int = 600):
+        self.nome = nome
+        self.agenda = Agenda(agenda)
+        self.funcao = funcao
+        self.descricao = descricao
+        self.lease_segundos = lease_segundos    # tempo máximo esperado de uma execução
+
+TAREFAS: Dict[str, Tarefa] = {}
+
+def tarefa(nome: str, agenda: str, descricao: str = '', lease_segundos: int = 600):
+    """Registra a função como tarefa periódica, ex.: @tarefa('lembrete', '0 7 * * 1')."""
+    def decorator(func):
+        if nome in TAREFAS:
+            raise ValueError(f"Tarefa {nome} registrada duas vezes")
+        TAREFAS[nome] = Tarefa(nome, agenda, func, descricao, lease_segundos)
+        return func
+    return decorator
+
+class Agendador:
+    """Executa as tarefas registradas em uma thread de fundo, fora das requisições.
+
+    Cada worker do gunicorn tem seu agendador, mas uma tarefa vencida roda em um só:
+    a execução começa com um UPDATE condicional que grava o lease (dono e validade)
+    na linha da tarefa em tarefas_agendadas, e só o worker que alterou a linha
+    executa. Ao terminar, ele grava duração, status e próxima execução e libera o
+    lease. Se o worker morrer no meio, o lease expira e outro worker repete a tarefa.
+    """
+
+    def __init__(self, tarefas: Dict[str, Tarefa] = None, intervalo: int = 30, dono: str = None):
+        self.tarefas = TAREFAS if tarefas is None else tarefas
+        self.intervalo = intervalo
+        self.dono = dono or f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        self._parar = threading.Event()
+        self._thread = None
+
+    def sincronizar(self, agora: datetime = None) -> None:
+        """Cria a linha das tarefas novas e reprograma as que tiveram a agenda alterada."""
+        agora = agora or datetime.now()
+        agendas = {t.nome: t.agenda for t in ExecucaoTarefa.select(ExecucaoTarefa.nome, ExecucaoTarefa.agenda)}
+        for t in self.tarefas.values():
+            if t.nome not in agendas:
+                (ExecucaoTarefa
+                 .insert(nome=t.nome, agenda=t.agenda.expressao, proxima_execucao=t.agenda.proxima(agora))
+                 .on_conflict_ignore()
+                 .execute())
+            elif agendas[t.nome] != t.agenda.expressao:
+                (ExecucaoTarefa
+                 .update(agenda=t.agenda.expressao, proxima_execucao=t.agenda.proxima(agora))
+                 .where(ExecucaoTarefa.nome == t.nome)
+                 .execute())
+
+    def _adquirir(self, tarefa: Tarefa, agora: datetime, forcar: bool) -> bool:
+        condicao = ((ExecucaoTarefa.nome == tarefa.nome) &
+                    (ExecucaoTarefa.lease_ate.is_null() | (ExecucaoTarefa.lease_ate < agora)))
+        if not forcar:
+            condicao &= ExecucaoTarefa.proxima_execucao <= agora
+        return (ExecucaoTarefa
+                .update(lease_dono=self.dono, lease_ate=agora + timedelta(seconds=tarefa.lease_segundos))
+                .where(condicao)
+                .execute()) == 1
+
+    def executar(self, nome: str, agora: datetime = None, forcar: bool = False) -> bool:
+        """Executa a tarefa se estiver vencida (ou `forcar`) e nenhum worker a estiver executando.
+
+        Retorna se a tarefa foi executada por este agendador.
+        """
+        tarefa = self.tarefas[nome]
+        agora = agora or datetime.now()
+        if not self._adquirir(tarefa, agora, forcar):
+            return False
+
+        erro = None
+        inicio = time.perf_counter()
+        try:
+            tarefa.funcao()
+        except Exception as e:
+            logger.exception("Tarefa %s falhou", nome)
+            erro = f'{type(e).__name__}: {e}'
+        duracao_ms = round((time.perf_counter() - inicio) * 1000, 1)
+
+        (ExecucaoTarefa
+         .update(ultima_execucao=agora,
+                 proxima_execucao=tarefa.agenda.proxima(max(agora, datetime.now())),
+                 ultimo_status='erro' if erro else 'ok',
+                 ultimo_erro=erro,
+                 ultima_duracao_ms=duracao_ms,
+                 duracao_total_ms=ExecucaoTarefa.duracao_total_ms + duracao_ms,
+                 duracao_max_ms=fn.MAX(ExecucaoTarefa.duracao_max_ms, duracao_ms),
+                 execucoes=ExecucaoTarefa.execucoes + 1,
+                 falhas=ExecucaoTarefa.falhas + (1 if erro else 0),
+                 lease_dono=None,
+                 lease_ate=None)
+         .where((ExecucaoTarefa.nome == nome) & (ExecucaoTarefa.lease_dono == self.dono))
+         .execute())
+        logger.info("Tarefa %s executada em %.0f ms (%s)", nome, duracao_ms, erro or 'ok')
+        return True
+
+    def agendar_agora(self, nome: str, agora: datetime = None) -> bool:
+        """Antecipa a próxima execução da tarefa para `agora`; a thread de algum worker a executa na próxima volta.
+
+        Retorna False se outro worker estiver com o lease (tarefa em execução).
+        """
+        agora = agora or datetime.now()
+        return (ExecucaoTarefa
+                .update(proxima_execucao=agora)
+                .where((ExecucaoTarefa.nome == nome) &
+                       (ExecucaoTarefa.lease_ate.is_null() | (ExecucaoTarefa.lease_ate < agora)))
+                .execute()) == 1
+
+    def executar_pendentes(self, agora: datetime = None) -> List[str]:
+        """Executa as tarefas vencidas e livres; retorna os nomes das executadas aqui."""
+        agora = agora or datetime.now()
+        vencidas = [t.nome for t in (ExecucaoTarefa
+                                     .select(ExecucaoTarefa.nome)
+                                     .where((ExecucaoTarefa.proxima_execucao <= agora) &
+                                            (ExecucaoTarefa.lease_ate.is_null() |
+                                             (ExecucaoTarefa.lease_ate < agora)))
+                                     .order_by(ExecucaoTarefa.proxima_execucao))]
+        return [nome for nome in vencidas if nome in self.tarefas and self.executar(nome, agora)]
+
+    def _loop(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            try:
+                with db.connection_context():
+                    self.executar_pendentes()
+            except Exception:
+                logger.exception("Erro no agendador de tarefas")
+
+    def iniciar(self) -> None:
+        if self._thread is not None:
+            return
+        with db.connection_context():
+            self.sincronizar()
+        self._thread = threading.Thread(target=self._loop, name='agendador-tarefas', daemon=True)
+        self._thread.start()
+        logger.info("Agendador %s iniciado com %d tarefa(s)", self.dono, len(self.tarefas))
+
+    def parar(self) -> None:
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def situacao(self) -> List[Dict[str, Any]]:
+        """Agenda, última execução e durações de cada tarefa registrada."""
+        linhas = {t.nome: t for t in ExecucaoTarefa.select()}
+        resultado = []
+        for nome, t in sorted(self.tarefas.items()):
+            linha = linhas.get(nome)
+            resultado.append({
+                'nome': nome,
+                'descricao': t.descricao,
+                'agenda': t.agenda.expressao,
+                'proxima_execucao': linha.proxima_execucao.isoformat() if linha else None,
+                'ultima_execucao': linha.ultima_execucao.isoformat() if linha and linha.ultima_execucao else None,
+                'ultimo_status': linha.ultimo_status if linha else None,
+                'ultimo_erro': linha.ultimo_erro if linha else None,
+                'ultima_duracao_ms': linha.ultima_duracao_ms if linha else None,
+                'media_duracao_ms': round(linha.duracao_total_ms / linha.execucoes, 1) if linha and linha.execucoes else None,
+                'max_duracao_ms': linha.duracao_max_ms if linha and linha.execucoes else None,
+                'execucoes': linha.execucoes if linha else 0,
+                'falhas': linha.falhas if linha else 0,
+                'em_execucao_por': linha.lease_dono if linha else None,
+            })
+        return resultado
+
+_agendador: Optional[Agendador] = None
+
+def obter_agendador(intervalo: int = 30) -> Agendador:
+    """Agendador do processo (um por worker)."""
+    global _agendador
+    if _agendador is None:
+        _agendador = Agendador(intervalo=intervalo)
+    return _agendador
+
+def iniciar_agendador(app) -> bool:
+    """Inicia o agendador deste processo se AGENDADOR_ATIVO e o schema estiver em dia.
+
+    Chamado apenas por quem serve requisições (run.py, app.py e o post_worker_init do
+    gunicorn.conf.py): create_app() não agenda nada, então comandos `flask`, init_db.py
+    e scripts não abrem a thread nem escrevem em tarefas_agendadas.
+    """
+    if not app.config['AGENDADOR_ATIVO']:
+        return False
+    from app.models.migrations import migracoes_pendentes
+    with db.connection_context():
+        if migracoes_pendentes():
+            logger.warning("Agendador não iniciado: há migrações pendentes. Execute `flask init-db`.")
+            return False
+    obter_agendador(app.config['AGENDADOR_INTERVALO']).iniciar()
+    return True
+
+# ===== TAREFAS =====
+# Os imports ficam dentro das funções para não pesar na inicialização dos workers
+
+@tarefa('verificar_estoque', '0 * * * *', 'Alerta de estoque baixo para todo o catálogo')
+def _verificar_estoque():
+    from app.utils.notificacoes import check_stock_levels
+    check_stock_levels()
+
+@tarefa('alertas_validade', '15 6 * * *', 'Alertas de insumos e vacinas que entraram na janela de validade')
+def _alertas_validade():
+    from app.controllers.alerta_controller import AlertaController
+    AlertaController.avaliar_validades()
+
+@tarefa('lembrete_manutencao', '0 7 * * 1', 'Lembrete semanal de manutenção aos operadores')
+def _lembrete_manutencao():
+    from app.utils.notificacoes import notify_maintenance_due
+    notify_maintenance_due()
+
+@tarefa('lembrete_relatorios', '0 7 1 * *', 'Lembrete mensal de relatórios a administradores e gerentes')
+def _lembrete_relatorios():
+    from app.utils.notificacoes import notify_report_due
+    notify_report_due()
+
+@tarefa('fechar_estoque', '10 0 1 * *', 'Saldos mensais de insumos (checkpoints)')
+def _fechar_estoque():
+    from app.controllers.insumo_controller import SaldoInsumoController
+    SaldoInsumoController.gerar_checkpoints()
+
+@tarefa('atualizar_previsoes', '30 2 * * *', 'Previsão de consumo com o dia anterior', lease_segundos=1800)
+def _atualizar_previsoes():
+    from app.controllers.previsao_controller import PrevisaoConsumoController
+    PrevisaoConsumoController.atualizar()
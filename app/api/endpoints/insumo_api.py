@@ -0,0 +1,135 @@
+from datetime import date, datetime
+from flask import Blueprint, current_app, request, jsonify, g
+from app.controllers.insumo_controller import MovimentacaoInsumoController, SaldoInsumoController
+from app.controllers.unidade_controller import ConversaoUnidadeController
+from app.decorators import manager_access, production_access, read_only_access
+from app.exceptions import BusinessError
+
+insumo_api = Blueprint('insumo_api', __name__, url_prefix='/api/insumos')
+
+@insumo_api.route('/movimentacoes', methods=['POST'])
+@production_access
+def criar_movimentacoes():
+    """Registra várias movimentações de uma vez, todas ou nenhuma.
+
+    {"data_movimentacao": "AAAA-MM-DD" (padrão: hoje),
+     "movimentacoes": [{"insumo_id": 1, "tipo": "Saída - Uso", "quantidade": "12.5", "unidade": "kg",
+                        "observacoes": "..."}]}
+
+    `unidade` é opcional (padrão: a do insumo); g, t, sacos etc. são convertidos pelas conversões do insumo.
+    """
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict) or not isinstance(payload.get('movimentacoes'), list):
+        return jsonify({'error': 'Envie {"movimentacoes": [...]}'}), 400
+    if not all(isinstance(m, dict) for m in payload['movimentacoes']):
+        return jsonify({'error': 'Cada movimentação deve ser um objeto JSON'}), 400
+
+    try:
+        data_movimentacao = (datetime.strptime(payload['data_movimentacao'], '%Y-%m-%d').date()
+                             if payload.get('data_movimentacao') else date.today())
+    except (TypeError, ValueError):
+        return jsonify({'error': 'data_movimentacao inválida (use AAAA-MM-DD)'}), 400
+
+    try:
+        resultado = MovimentacaoInsumoController.criar_movimentacoes(
+            payload['movimentacoes'], data_movimentacao, usuario_id=g.current_user.id_usuario)
+    except BusinessError as be:
+        return jsonify({'error': be.message}), 409
+    except Exception:
+        current_app.logger.exception("Erro interno ao registrar movimentações")
+        return jsonify({'error': 'erro interno'}), 500
+
+    return jsonify(resultado), 422 if resultado['erros'] else 201
+
+@insumo_api.route('/estoque', methods=['GET'])
+@read_only_access
+def estoque_em():
+    """Estoque de cada insumo ao final de um dia: ?data=AAAA-MM-DD (padrão: hoje), &categoria=, &ativo=true|false."""
+    try:
+        dia = datetime.strptime(request.args['data'], '%Y-%m-%d').date() if request.args.get('data') else date.today()
+    except ValueError:
+        return jsonify({'error': 'data inválida (use AAAA-MM-DD)'}), 400
+
+    ativo = request.args.get('ativo')
+    insumos = SaldoInsumoController.inventario_em(
+        dia, categoria=request.args.get('categoria'),
+        ativo=None if ativo is None else ativo.lower() == 'true')
+
+    for insumo in insumos:
+        insumo['saldo'] = float(insumo['saldo'])
+    return jsonify({'data': dia.isoformat(), 'insumos': insumos}), 200
+
+@insumo_api.route('/previsao', methods=['GET'])
+@read_only_access
+def previsao_consumo():
+    """Consumo diário previsto e data de ruptura de cada insumo ativo: ?categoria=, &horizonte=dias, &confianca=0.8."""
+    from app.controllers.previsao_controller import PrevisaoConsumoController, HORIZONTE_DIAS, CONFIANCA
+
+    horizonte = request.args.get('horizonte', HORIZONTE_DIAS, type=int)
+    confianca = request.args.get('confianca', CONFIANCA, type=float)
+    if not 1 <= horizonte <= 3650 or not 0 < confianca < 1:
+        return jsonify({'error': 'horizonte deve estar entre 1 e 3650 dias e confianca entre 0 e 1'}), 400
+
+    try:
+        insumos = PrevisaoConsumoController.prever(categoria=request.args.get('categoria'),
+                                                   horizonte=horizonte, confianca=confianca)
+    except Exception:
+        current_app.logger.exception("Erro interno ao calcular a previsão de consumo")
+        return jsonify({'error': 'erro interno'}), 500
+
+    for insumo in insumos:
+        for campo in ('data_ruptura', 'data_ruptura_min', 'data_ruptura_max', 'ajustado_ate'):
+            if insumo[campo]:
+                insumo[campo] = insumo[campo].isoformat()
+    return jsonify({'horizonte': horizonte, 'confianca': confianca, 'insumos': insumos}), 200
+
+@insumo_api.route('/reposicao', methods=['GET'])
+@read_only_access
+def reposicao():
+    """Ponto de pedido e compra sugerida de cada insumo ativo: ?categoria=, &nivel_servico=0.95, &apenas_repor=true."""
+    from app.controllers.reposicao_controller import ReposicaoController
+
+    nivel_servico = request.args.get('nivel_servico', current_app.config['REPOSICAO_NIVEL_SERVICO'], type=float)
+    if not 0.5 <= nivel_servico < 1:
+        return jsonify({'error': 'nivel_servico deve estar entre 0.5 e 1'}), 400
+
+    try:
+        insumos = ReposicaoController.calcular(
+            categoria=request.args.get('categoria'), nivel_servico=nivel_servico,
+            ciclo_dias=current_app.config['REPOSICAO_CICLO_DIAS'],
+            prazos_entrega=current_app.config['REPOSICAO_PRAZOS_ENTREGA'],
+            apenas_repor=request.args.get('apenas_repor', '').lower() == 'true')
+    except Exception:
+        current_app.logger.exception("Erro interno ao calcular a reposição de insumos")
+        return jsonify({'error': 'erro interno'}), 500
+
+    return jsonify({'nivel_servico': nivel_servico, 'insumos': insumos}), 200
+
+def _conversao_json(conversao) -> dict:
+    return {'unidade': conversao.unidade, 'quantidade': float(conversao.quantidade),
+            'unidade_referencia': conversao.unidade_referencia}
+
+@insumo_api.route('/<int:id_insumo>/conversoes', methods=['GET'])
+@read_only_access
+def listar_conversoes(id_insumo):
+    """Unidades próprias do insumo, ex.: [{"unidade": "saco", "quantidade": 25, "unidade_referencia": "kg"}]."""
+    conversoes = ConversaoUnidadeController.listar_conversoes(id_insumo)
+    return jsonify({'id_insumo': id_insumo, 'conversoes': [_conversao_json(c) for c in conversoes]}), 200
+
+@insumo_api.route('/<int:id_insumo>/conversoes/<unidade>', methods=['PUT'])
+@manager_access
+def definir_conversao(id_insumo, unidade):
+    """Cadastra ou altera quanto vale uma unidade do insumo: {"quantidade": 25, "unidade_referencia": "kg"}."""
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({'error': 'JSON inválido ou ausente'}), 400
+
+    try:
+        conversao = ConversaoUnidadeController.definir_conversao(
+            id_insumo, unidade, payload.get('quantidade'), payload.get('unidade_referencia'))
+    except BusinessError as be:
+        return jsonify({'error': be.message}), 422
+    except Exception:
+        current_app.logger.exception("Erro interno ao definir conversão de unidade")
+        return jsonify({'error': 'erro interno'}), 500
+    return jsonify(_conversao_json(conversao)), 200
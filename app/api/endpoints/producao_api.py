@@ -1,28 +1,215 @@
-from flask import Blueprint, jsonify
-from datetime import datetime, timedelta
+import csv
+import io
+from datetime import date, datetime, timedelta
+from flask import Blueprint, current_app, request, jsonify, g
 from app.controllers.producao_controller import ProducaoController
+from app.controllers.lote_controller import LoteController
+from app.decorators import production_access, read_only_access
+from app.exceptions import BusinessError
 
 producao_api = Blueprint('producao_api', __name__, url_prefix='/api/producao')
 
-@producao_api.route('/api/producao/teste', methods=['GET'])
-def teste_producao():
-    producao_ctrl = ProducaoController()
-    
-    nova_producao = producao_ctrl.criar_producao(                   # Criar produção
-        lote_id=1,
-        data_producao=datetime.now(),
-        quantidade_aves=1000,
-        quantidade_produzida=950,
-        qualidade_producao="Excelente",
-        producao_nao_aproveitada=50
-    )
-    
-    stats = producao_ctrl.calcular_estatisticas_periodo(            # Buscar estatísticas
-        data_inicio=datetime.now() - timedelta(days=30),
-        data_fim=datetime.now()
-    )
-    
-    return jsonify({
-        'producao_id': nova_producao.id_producao,
-        'estatisticas': stats
-    })
\ No newline at end of file
+def _parcial(valor) -> bool:
+    return str(valor).strip().lower() in ('1', 'true', 'sim')
+
+def _ler_csv(arquivo) -> tuple:
+    """Retorna (registros, número da linha de cada registro no arquivo)."""
+    conteudo = arquivo.read()
+    try:
+        texto = conteudo.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        texto = conteudo.decode('latin-1')          # CSV salvo pelo Excel em português
+
+    try:
+        dialeto = csv.Sniffer().sniff(texto[:4096], delimiters=',;')
+    except csv.Error:
+        dialeto = csv.excel
+
+    # O DictReader pula linhas em branco: o número de cada registro vem do leitor (line_num)
+    leitor = csv.DictReader(io.StringIO(texto), dialect=dialeto)
+    registros, numeros = [], []
+    for linha in leitor:
+        registros.append({(chave or '').strip().lower(): valor for chave, valor in linha.items()})
+        numeros.append(leitor.line_num)
+    return registros, numeros
+
+def _ler_xlsx(arquivo) -> tuple:
+    """Retorna (registros, número da linha de cada registro na planilha); linhas vazias são ignoradas."""
+    import openpyxl     # só carregado quando alguém importa uma planilha
+
+    planilha = openpyxl.load_workbook(arquivo, read_only=True, data_only=True).active
+    linhas = planilha.iter_rows(values_only=True)
+    cabecalho = [str(c or '').strip().lower() for c in next(linhas, ())]
+    registros, numeros = [], []
+    for numero, valores in enumerate(linhas, start=2):
+        if any(v not in (None, '') for v in valores):
+            registros.append(dict(zip(cabecalho, valores)))
+            numeros.append(numero)
+    return registros, numeros
+
+def _resposta_importacao(resultado: dict):
+    if resultado['inseridos']:
+        status = 201
+    elif resultado['atualizados']:
+        status = 200
+    elif resultado['erros']:
+        status = 422
+    else:
+        status = 400
+    return jsonify(resultado), status
+
+@producao_api.route('/', methods=['POST'])
+@production_access
+def criar_producao():
+    """Registra a produção de um lote em um dia; reenviar o mesmo lote e dia substitui o registro."""
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({'error': 'JSON inválido ou ausente'}), 400
+
+    try:
+        referencia = payload.get('id_lote', payload.get('lote'))
+        dados = ProducaoController.normalizar_registro(payload, LoteController.mapa_referencias([referencia]),
+                                                       responsavel_padrao=g.current_user.nome)
+        producao, criado = ProducaoController.salvar_producao(lote_id=dados.pop('lote'), **dados)
+        return jsonify({'id_producao': producao.id_producao, 'criado': criado}), 201 if criado else 200
+    except BusinessError as be:
+        current_app.logger.warning("Regra de negócio falhou: %s", be.message)
+        return jsonify({'error': be.message}), 422
+    except Exception:
+        current_app.logger.exception("Erro interno ao criar produção")
+        return jsonify({'error': 'erro interno'}), 500
+
+@producao_api.route('/registros', methods=['POST'])
+@production_access
+def criar_producoes():
+    """Recebe vários registros: {"registros": [...], "parcial": false} ou diretamente a lista."""
+    payload = request.get_json(silent=True)
+    if isinstance(payload, list):
+        registros, parcial = payload, _parcial(request.args.get('parcial'))
+    elif isinstance(payload, dict) and isinstance(payload.get('registros'), list):
+        registros, parcial = payload['registros'], _parcial(payload.get('parcial'))
+    else:
+        return jsonify({'error': 'Envie uma lista de registros ou {"registros": [...]}'}), 400
+
+    if not all(isinstance(r, dict) for r in registros):
+        return jsonify({'error': 'Cada registro deve ser um objeto JSON'}), 400
+
+    try:
+        resultado = ProducaoController.importar_registros(registros, responsavel_padrao=g.current_user.nome,
+                                                          parcial=parcial)
+    except Exception:
+        current_app.logger.exception("Erro interno ao importar produções")
+        return jsonify({'error': 'erro interno'}), 500
+    return _resposta_importacao(resultado)
+
+@producao_api.route('/importar', methods=['POST'])
+@production_access
+def importar_producoes():
+    """Importa um arquivo .csv (vírgula ou ponto e vírgula) ou .xlsx enviado no campo `arquivo`.
+
+    A primeira linha traz os nomes das colunas, iguais aos campos do JSON.
+    Os números de linha dos erros são os da planilha (o cabeçalho é a linha 1).
+    """
+    arquivo = request.files.get('arquivo')
+    if arquivo is None or not arquivo.filename:
+        return jsonify({'error': 'Envie o arquivo no campo "arquivo"'}), 400
+
+    extensao = arquivo.filename.rsplit('.', 1)[-1].lower()
+    try:
+        if extensao == 'csv':
+            registros, linhas = _ler_csv(arquivo)
+        elif extensao == 'xlsx':
+            registros, linhas = _ler_xlsx(arquivo)
+        else:
+            return jsonify({'error': 'Formato não suportado: use .csv ou .xlsx'}), 400
+    except Exception as e:
+        return jsonify({'error': f'Não foi possível ler o arquivo: {str(e)}'}), 400
+
+    try:
+        resultado = ProducaoController.importar_registros(registros, responsavel_padrao=g.current_user.nome,
+                                                          parcial=_parcial(request.form.get('parcial')),
+                                                          linhas=linhas)
+    except Exception:
+        current_app.logger.exception("Erro interno ao importar produções")
+        return jsonify({'error': 'erro interno'}), 500
+    return _resposta_importacao(resultado)
+
+@producao_api.route('/serie', methods=['GET'])
+@read_only_access
+def serie_producao():
+    """Série temporal para gráficos: ?inicio=AAAA-MM-DD&fim=...&agrupamento=dia|semana|mes&lote=&pontos=200.
+
+    Sem datas, cobre os últimos 90 dias. Séries longas são reduzidas a `pontos` períodos.
+    """
+    from app.controllers.serie_producao_controller import SerieProducaoController, MAX_PONTOS
+
+    try:
+        fim = datetime.strptime(request.args['fim'], '%Y-%m-%d').date() if request.args.get('fim') else date.today()
+        inicio = (datetime.strptime(request.args['inicio'], '%Y-%m-%d').date() if request.args.get('inicio')
+                  else fim - timedelta(days=90))
+    except ValueError:
+        return jsonify({'error': 'inicio e fim devem estar no formato AAAA-MM-DD'}), 400
+    pontos = request.args.get('pontos', MAX_PONTOS, type=int)
+    if not 3 <= pontos <= 5000:
+        return jsonify({'error': 'pontos deve estar entre 3 e 5000'}), 400
+
+    try:
+        serie = SerieProducaoController.serie(inicio, fim, agrupamento=request.args.get('agrupamento', 'dia'),
+                                              lote=request.args.get('lote'), max_pontos=pontos)
+        return jsonify(serie), 200
+    except BusinessError as be:
+        return jsonify({'error': be.message}), 400
+    except Exception:
+        current_app.logger.exception("Erro interno ao montar a série de produção")
+        return jsonify({'error': 'erro interno'}), 500
+
+@producao_api.route('/comparacao', methods=['GET'])
+@read_only_access
+def comparar_periodos():
+    """Compara dois períodos por lote e no total.
+
+    Comparação pronta: ?modo=semana|mes|mes_ano_anterior&data=AAAA-MM-DD (hoje, por padrão).
+    Períodos livres: ?inicio=...&fim=...&ref_inicio=...&ref_fim=... Ambos aceitam &lote=.
+    """
+    try:
+        datas = {chave: datetime.strptime(request.args[chave], '%Y-%m-%d').date()
+                 for chave in ('data', 'inicio', 'fim', 'ref_inicio', 'ref_fim') if request.args.get(chave)}
+    except ValueError:
+        return jsonify({'error': 'datas devem estar no formato AAAA-MM-DD'}), 400
+
+    try:
+        if request.args.get('modo'):
+            atual, anterior = ProducaoController.periodos_comparacao(request.args['modo'], datas.get('data'))
+        elif all(chave in datas for chave in ('inicio', 'fim', 'ref_inicio', 'ref_fim')):
+            atual, anterior = (datas['inicio'], datas['fim']), (datas['ref_inicio'], datas['ref_fim'])
+        else:
+            return jsonify({'error': 'informe modo ou inicio, fim, ref_inicio e ref_fim'}), 400
+        return jsonify(ProducaoController.comparar_periodos(atual, anterior, lote=request.args.get('lote'))), 200
+    except BusinessError as be:
+        return jsonify({'error': be.message}), 400
+    except Exception:
+        current_app.logger.exception("Erro interno ao comparar períodos de produção")
+        return jsonify({'error': 'erro interno'}), 500
+
+@producao_api.route('/ranking', methods=['GET'])
+@read_only_access
+def ranking_lotes():
+    """Ranking dos lotes por ovos por ave-dia: ?dias=28&limite=5&data=AAAA-MM-DD (hoje, por padrão)."""
+    from app.controllers.producao_controller import JANELA_RANKING
+
+    try:
+        hoje = datetime.strptime(request.args['data'], '%Y-%m-%d').date() if request.args.get('data') else None
+    except ValueError:
+        return jsonify({'error': 'data deve estar no formato AAAA-MM-DD'}), 400
+    dias = request.args.get('dias', JANELA_RANKING, type=int)
+    limite = request.args.get('limite', 5, type=int)
+    if not 1 <= dias <= 366 or not 1 <= limite <= 100:
+        return jsonify({'error': 'dias deve estar entre 1 e 366 e limite entre 1 e 100'}), 400
+
+    try:
+        ranking = ProducaoController.buscar_melhores_lotes(limite, dias, hoje,
+                                                           ttl=current_app.config['RANKING_CACHE_TTL'])
+        return jsonify({'dias': dias, 'lotes': ranking}), 200
+    except Exception:
+        current_app.logger.exception("Erro interno ao montar o ranking de lotes")
+        return jsonify({'error': 'erro interno'}), 500
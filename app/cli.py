@@ -0,0 +1,65 @@
+import click
+from app.models.database import db
+
+def registrar_comandos(app):
+    """Registra os comandos `flask ...` de manutenção do banco."""
+
+    @app.cli.command('init-db')
+    @click.option('--sem-backup', is_flag=True, help='Não copia o banco antes de aplicar migrações.')
+    def init_db(sem_backup):
+        """Cria o schema ou aplica as migrações pendentes."""
+        from app.models.migrations import migrar, versao_atual
+
+        with db.connection_context():
+            aplicadas = migrar(backup=not sem_backup)
+            click.echo(f"Banco na versão {versao_atual()} ({aplicadas} migração(ões) aplicada(s)).")
+
+    @app.cli.command('rebuild-producao-diaria')
+    def rebuild_producao_diaria():
+        """Recalcula do zero o resumo diário de produção (producao_diaria)."""
+        from app.controllers.producao_controller import ProducaoController
+
+        with db.connection_context():
+            linhas = ProducaoController.reconstruir_resumo_diario()
+            click.echo(f"Resumo diário reconstruído: {linhas} linha(s) (lote, dia).")
+
+    @app.cli.command('fechar-estoque')
+    @click.option('--ate', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+                  help='Fecha os meses até esta data (padrão: hoje).')
+    def fechar_estoque(ate):
+        """Grava os saldos mensais de insumos (checkpoints) que ainda faltam."""
+        from app.controllers.insumo_controller import SaldoInsumoController
+
+        with db.connection_context():
+            criados = SaldoInsumoController.gerar_checkpoints(ate.date() if ate else None)
+            click.echo(f"{criados} saldo(s) mensal(is) de insumo gravado(s).")
+
+    @app.cli.command('atualizar-previsoes')
+    @click.option('--reconstruir', is_flag=True, help='Descarta o estado salvo e ajusta tudo de novo.')
+    def atualizar_previsoes(reconstruir):
+        """Ajusta a previsão de consumo dos insumos com os dias completos ainda não considerados."""
+        from app.controllers.previsao_controller import PrevisaoConsumoController
+
+        with db.connection_context():
+            if reconstruir:
+                ajustados = PrevisaoConsumoController.reconstruir()
+            else:
+                ajustados = PrevisaoConsumoController.atualizar()
+            click.echo(f"Previsão de consumo ajustada para {ajustados} insumo(s).")
+
+    @app.cli.command('executar-tarefas')
+    @click.option('--tarefa', 'nome', default=None, help='Executa esta tarefa agora, mesmo fora da agenda.')
+    def executar_tarefas(nome):
+        """Executa as tarefas periódicas vencidas (para quem prefere o cron do sistema ao agendador interno)."""
+        from app.agendador import obter_agendador, TAREFAS
+
+        agendador = obter_agendador()
+        with db.connection_context():
+            agendador.sincronizar()
+            if nome:
+                if nome not in TAREFAS:
+                    raise click.BadParameter(f"use uma de: {', '.join(sorted(TAREFAS))}", param_hint='--tarefa')
+                executadas = [nome] if agendador.executar(nome, forcar=True) else []
+            else:
+                executadas = agendador.executar_pendentes()
+            click.echo(f"{len(executadas)} tarefa(s) executada(s): {', '.join(executadas) or '-'}")
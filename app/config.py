@@ -1,3 +1,4 @@
+import json
 import os
 import jwt
 from datetime import datetime, timedelta
@@ -6,12 +7,40 @@ from flask import current_app
 class Config:
     
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'default_secret_key'
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///site.db'
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
     DEBUG = os.environ.get('DEBUG', 'False') == 'True'
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt_secret_key_2024'
     JWT_EXPIRATION_HOURS = int(os.environ.get('JWT_EXPIRATION_HOURS', 24))
 
+    # Banco peewee (SQLite) e PRAGMAs aplicados a cada conexão
+    DATABASE_PATH = os.environ.get('DATABASE_PATH', 'BD_Granja.db')
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'wal')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'normal')
+    SQLITE_CACHE_SIZE = int(os.environ.get('SQLITE_CACHE_SIZE', -64000))       # negativo = KiB (64 MB)
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    SQLITE_TEMP_STORE = os.environ.get('SQLITE_TEMP_STORE', 'memory')
+    SQLITE_BUSY_TIMEOUT = int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000))     # ms
+
+    # Pool de conexões (por processo/worker)
+    DB_MAX_CONNECTIONS = int(os.environ.get('DB_MAX_CONNECTIONS', 8))
+    DB_STALE_TIMEOUT = int(os.environ.get('DB_STALE_TIMEOUT', 300))            # s; conexões mais antigas são recicladas
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 10))               # s de espera por uma conexão livre
+
+    # Tempo máximo aceitável para import + create_app() de um worker
+    STARTUP_BUDGET_MS = int(os.environ.get('STARTUP_BUDGET_MS', 1500))
+
+    # Reposição de insumos: nível de serviço, dias entre compras e prazos de entrega por categoria
+    REPOSICAO_NIVEL_SERVICO = float(os.environ.get('REPOSICAO_NIVEL_SERVICO', 0.95))
+    REPOSICAO_CICLO_DIAS = int(os.environ.get('REPOSICAO_CICLO_DIAS', 30))
+    REPOSICAO_PRAZOS_ENTREGA = json.loads(os.environ.get('REPOSICAO_PRAZOS_ENTREGA', '{}'))    # ex.: {"Ração": 5}
+
+    # Agendador de tarefas periódicas (uma thread por worker; o lease no banco evita execuções repetidas)
+    AGENDADOR_ATIVO = os.environ.get('AGENDADOR_ATIVO', 'True') == 'True'
+    AGENDADOR_INTERVALO = int(os.environ.get('AGENDADOR_INTERVALO', 30))      # s entre verificações
+
+    # Validade do resumo do dashboard em cache em cada worker
+    DASHBOARD_CACHE_TTL = int(os.environ.get('DASHBOARD_CACHE_TTL', 30))      # s
+    RANKING_CACHE_TTL = int(os.environ.get('RANKING_CACHE_TTL', 60))          # s, ranking de lotes
+
 def generate_jwt_token(user_id, user_tipo, user_nome):
     payload = {
         'user_id': user_id,
@@ -0,0 +1,320 @@
+import functools
+import hashlib
+import logging
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+from peewee import IntegrityError, fn
+from app.exceptions import BusinessError
+from app.models.database import (db, RegraAlerta, AlertaEmitido, InsumoNovo, EstoqueVacina, Lote, ProducaoDiaria,
+                                 RelatoriosMortalidade, TipoUsuarios, PrioridadeAviso, CategoriaAviso)
+from app.utils.helpers import como_data
+from app.utils.notificacoes import create_automatic_notification
+
+logger = logging.getLogger(__name__)
+
+# Padrão de cada regra; uma linha em RegraAlerta com o mesmo código sobrepõe limite, janela, prioridade e ativa
+REGRAS_ALERTA = {
+    'estoque_baixo': {
+        'descricao': 'Estoque do insumo menor ou igual a limite × quantidade mínima',
+        'limite': 1.0, 'janela_dias': 0, 'prioridade': 'ALTA',
+    },
+    'insumo_vencendo': {
+        'descricao': 'Insumo ativo vence nos próximos janela_dias dias',
+        'limite': 0.0, 'janela_dias': 30, 'prioridade': 'NORMAL',
+    },
+    'vacina_vencendo': {
+        'descricao': 'Estoque de vacina ativo vence nos próximos janela_dias dias',
+        'limite': 0.0, 'janela_dias': 30, 'prioridade': 'ALTA',
+    },
+    'queda_producao': {
+        'descricao': 'Ovos por ave do dia ao menos limite % abaixo da média dos janela_dias dias anteriores',
+        'limite': 20.0, 'janela_dias': 7, 'prioridade': 'ALTA',
+    },
+    'pico_mortalidade': {
+        'descricao': 'Mortes nos últimos janela_dias dias somam ao menos limite % das aves do lote',
+        'limite': 0.5, 'janela_dias': 1, 'prioridade': 'CRITICA',
+    },
+}
+
+def _fingerprint(regra: str, entidade: str, ocorrencia: str = '') -> str:
+    return hashlib.sha1(f'{regra}|{entidade}|{ocorrencia}'.encode('utf-8')).hexdigest()
+
+def _sem_falhar(func):
+    """Alertas nunca desfazem a escrita que os disparou: erros são apenas registrados no log."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            logger.exception("Erro ao avaliar alertas em %s", func.__name__)
+            return []
+    return wrapper
+
+class AlertaController:
+    """Regras de alerta avaliadas a cada escrita, apenas sobre a entidade alterada.
+
+    As funções avaliar_* são chamadas pelos controllers depois do commit e consultam
+    só as linhas afetadas (por chave primária ou pelos índices de lote e dia). Cada
+    ocorrência tem um fingerprint (regra, entidade e, quando houver, o dia ou a
+    validade); o índice único de AlertaEmitido garante um único aviso por
+    ocorrência, mesmo com escritas concorrentes. Condições que podem deixar de
+    valer (estoque recomposto, produção corrigida) apagam o alerta em aberto, para
+    que uma nova ocorrência volte a avisar.
+    """
+
+    @staticmethod
+    def regras() -> Dict[str, Dict[str, Any]]:
+        regras = {codigo: dict(padrao, codigo=codigo, ativa=True) for codigo, padrao in REGRAS_ALERTA.items()}
+        for regra in RegraAlerta.select():
+            if regra.codigo in regras:
+                regras[regra.codigo].update(limite=regra.limite, janela_dias=regra.janela_dias,
+                                            prioridade=regra.prioridade, ativa=regra.ativa)
+        return regras
+
+    @staticmethod
+    def definir_regra(codigo: str, limite: float = None, janela_dias: int = None,
+                      prioridade: str = None, ativa: bool = None) -> Dict[str, Any]:
+        """Altera a configuração de uma regra; campos não informados mantêm o valor atual."""
+        if codigo not in REGRAS_ALERTA:
+            raise BusinessError(f"Regra de alerta desconhecida: {codigo}")
+        atual = AlertaController.regras()[codigo]
+        if limite is not None:
+            try:
+                limite = float(limite)
+            except (TypeError, ValueError):
+                raise BusinessError("Limite deve ser numérico")
+            if limite < 0:
+                raise BusinessError("Limite não pode ser negativo")
+            atual['limite'] = limite
+        if janela_dias is not None:
+            try:
+                janela_dias = int(janela_dias)
+            except (TypeError, ValueError):
+                raise BusinessError("Janela deve ser um número inteiro de dias")
+            if janela_dias < 0:
+                raise BusinessError("Janela não pode ser negativa")
+            atual['janela_dias'] = janela_dias
+        if prioridade is not None:
+            if prioridade not in PrioridadeAviso.__members__:
+                raise BusinessError(f"Prioridade deve ser uma de: {', '.join(PrioridadeAviso.__members__)}")
+            atual['prioridade'] = prioridade
+        if ativa is not None:
+            atual['ativa'] = bool(ativa)
+
+        campos = {'limite': atual['limite'], 'janela_dias': atual['janela_dias'],
+                  'prioridade': atual['prioridade'], 'ativa': atual['ativa']}
+        (RegraAlerta
+         .insert(codigo=codigo, **campos)
+         .on_conflict(conflict_target=[RegraAlerta.codigo], update=campos)
+         .execute())
+        return atual
+
+    @staticmethod
+    def listar_em_aberto(regra: str = None) -> List[AlertaEmitido]:
+        query = AlertaEmitido.select().order_by(AlertaEmitido.criado_em.desc())
+        if regra:
+            query = query.where(AlertaEmitido.regra == regra)
+        return list(query)
+
+    @staticmethod
+    def _emitir(regra: Dict[str, Any], entidade: str, ocorrencia: str, titulo: str, conteudo: str,
+                categoria: str) -> Optional[int]:
+        """Cria o aviso se a ocorrência ainda não foi avisada. Retorna o id do aviso ou None."""
+        try:
+            with db.atomic() as transacao:
+                alerta = AlertaEmitido.create(fingerprint=_fingerprint(regra['codigo'], entidade, ocorrencia),
+                                              regra=regra['codigo'], entidade=entidade)
+                id_aviso = create_automatic_notification(
+                    titulo=titulo,
+                    conteudo=conteudo,
+                    categoria=categoria,
+                    prioridade=regra['prioridade'],
+                    tipos=(TipoUsuarios.ADMIN, TipoUsuarios.GERENTE)
+                )
+                if id_aviso is None:
+                    # Sem o aviso o alerta não conta como emitido; a próxima escrita tenta de novo
+                    transacao.rollback()
+                    return None
+                AlertaEmitido.update(aviso=id_aviso).where(AlertaEmitido.id_alerta == alerta.id_alerta).execute()
+                return id_aviso
+        except IntegrityError:
+            # Fingerprint já gravado: ocorrência avisada antes
+            return None
+
+    @staticmethod
+    def _resolver(regra: Dict[str, Any], entidade: str, ocorrencia: str = '', outras: bool = False) -> None:
+        """Apaga o alerta em aberto da ocorrência; com outras=True, os de todas as demais ocorrências da entidade."""
+        fingerprint = _fingerprint(regra['codigo'], entidade, ocorrencia)
+        if not outras:
+            AlertaEmitido.delete().where(AlertaEmitido.fingerprint == fingerprint).execute()
+            return
+        (AlertaEmitido
+         .delete()
+         .where((AlertaEmitido.regra == regra['codigo']) & (AlertaEmitido.entidade == entidade) &
+                (AlertaEmitido.fingerprint != fingerprint))
+         .execute())
+
+    @staticmethod
+    @_sem_falhar
+    def avaliar_insumos(insumo_ids: Iterable[int]) -> List[int]:
+        """Estoque baixo e validade próxima dos insumos informados. Retorna os ids dos avisos criados."""
+        insumo_ids = list(set(insumo_ids))
+        regras = AlertaController.regras()
+        baixo, vencendo = regras['estoque_baixo'], regras['insumo_vencendo']
+        if not insumo_ids or not (baixo['ativa'] or vencendo['ativa']):
+            return []
+
+        avisos = []
+        hoje = date.today()
+        for insumo in (InsumoNovo
+                       .select(InsumoNovo.id_insumo, InsumoNovo.nome, InsumoNovo.unidade, InsumoNovo.ativo,
+                               InsumoNovo.quantidade_atual, InsumoNovo.quantidade_minima, InsumoNovo.data_validade)
+                       .where(InsumoNovo.id_insumo.in_(insumo_ids))):
+            entidade = f'insumo:{insumo.id_insumo}'
+            if baixo['ativa']:
+                minimo = float(insumo.quantidade_minima) * baixo['limite']
+                if insumo.ativo and float(insumo.quantidade_atual) <= minimo:
+                    avisos.append(AlertaController._emitir(
+                        baixo, entidade, '',
+                        titulo=f"Alerta: Estoque Baixo - {insumo.nome}",
+                        conteudo=f"O insumo {insumo.nome} está com {insumo.quantidade_atual} {insumo.unidade} em "
+                                 f"estoque (mínimo: {insumo.quantidade_minima} {insumo.unidade}).\n\n"
+                                 f"Verifique a necessidade de reposição.",
+                        categoria=CategoriaAviso.ESTOQUE.value))
+                else:
+                    AlertaController._resolver(baixo, entidade)
+
+            if vencendo['ativa']:
+                # A ocorrência é a data de validade: alertas de uma validade anterior deixam de valer
+                validade = como_data(insumo.data_validade)
+                if insumo.ativo and validade and validade <= hoje + timedelta(days=vencendo['janela_dias']):
+                    AlertaController._resolver(vencendo, entidade, validade.isoformat(), outras=True)
+                    avisos.append(AlertaController._emitir(
+                        vencendo, entidade, validade.isoformat(),
+                        titulo=f"Alerta: Insumo Vencendo - {insumo.nome}",
+                        conteudo=f"O insumo {insumo.nome} vence em {validade.strftime('%d/%m/%Y')} "
+                                 f"({insumo.quantidade_atual} {insumo.unidade} em estoque).",
+                        categoria=CategoriaAviso.ESTOQUE.value))
+                else:
+                    AlertaController._resolver(vencendo, entidade, outras=True)
+        return [a for a in avisos if a]
+
+    @staticmethod
+    @_sem_falhar
+    def avaliar_vacinas(estoque_ids: Iterable[int]) -> List[int]:
+        """Validade próxima dos estoques de vacina informados."""
+        estoque_ids = list(set(estoque_ids))
+        regra = AlertaController.regras()['vacina_vencendo']
+        if not estoque_ids or not regra['ativa']:
+            return []
+
+        limite = date.today() + timedelta(days=regra['janela_dias'])
+        avisos = []
+        for estoque in (EstoqueVacina
+                        .select(EstoqueVacina.id_estoque_vacina, EstoqueVacina.tipo_vacina, EstoqueVacina.lote_vacina,
+                                EstoqueVacina.data_validade, EstoqueVacina.quantidade_doses)
+                        .where(EstoqueVacina.id_estoque_vacina.in_(estoque_ids) &
+                               (EstoqueVacina.ativo == True) & (EstoqueVacina.data_validade <= limite))):
+            validade = como_data(estoque.data_validade)
+            avisos.append(AlertaController._emitir(
+                regra, f'vacina:{estoque.id_estoque_vacina}', validade.isoformat(),
+                titulo=f"Alerta: Vacina Vencendo - {estoque.tipo_vacina}",
+                conteudo=f"O lote {estoque.lote_vacina} de {estoque.tipo_vacina} vence em "
+                         f"{validade.strftime('%d/%m/%Y')} ({estoque.quantidade_doses} doses em estoque).",
+                categoria=CategoriaAviso.GERAL.value))
+        return [a for a in avisos if a]
+
+    @staticmethod
+    def avaliar_validades() -> List[int]:
+        """Insumos e vacinas que entraram na janela de validade com a passagem do tempo, sem escrita.
+
+        Executada uma vez por dia pelo agendador; as demais regras dependem só das escritas.
+        """
+        regras = AlertaController.regras()
+        hoje = date.today()
+        insumos = (InsumoNovo
+                   .select(InsumoNovo.id_insumo)
+                   .where((InsumoNovo.ativo == True) & InsumoNovo.data_validade.is_null(False) &
+                          (InsumoNovo.data_validade <= hoje + timedelta(days=regras['insumo_vencendo']['janela_dias']))))
+        vacinas = (EstoqueVacina
+                   .select(EstoqueVacina.id_estoque_vacina)
+                   .where((EstoqueVacina.data_validade <= hoje + timedelta(days=regras['vacina_vencendo']['janela_dias'])) &
+                          (EstoqueVacina.ativo == True)))
+        return (AlertaController.avaliar_insumos([i.id_insumo for i in insumos]) +
+                AlertaController.avaliar_vacinas([v.id_estoque_vacina for v in vacinas]))
+
+    @staticmethod
+    @_sem_falhar
+    def avaliar_producao(lote_id: int, dia) -> List[int]:
+        """Queda da postura (ovos por ave) do lote no dia em relação aos dias anteriores."""
+        regra = AlertaController.regras()['queda_producao']
+        if not regra['ativa']:
+            return []
+
+        dia = como_data(dia)
+        entidade = f'lote:{lote_id}'
+        atual = (ProducaoDiaria
+                 .select(ProducaoDiaria.total_ovos, ProducaoDiaria.total_aves)
+                 .where((ProducaoDiaria.lote == lote_id) & (ProducaoDiaria.dia == dia))
+                 .first())
+        ovos, aves = (ProducaoDiaria
+                      .select(fn.SUM(ProducaoDiaria.total_ovos), fn.SUM(ProducaoDiaria.total_aves))
+                      .where((ProducaoDiaria.lote == lote_id) &
+                             (ProducaoDiaria.dia >= dia - timedelta(days=regra['janela_dias'])) &
+                             (ProducaoDiaria.dia < dia))
+                      .tuples()
+                      .get())
+        if atual is None or not atual.total_aves or not aves:
+            AlertaController._resolver(regra, entidade, dia.isoformat())
+            return []
+
+        taxa, media = atual.total_ovos / atual.total_aves, ovos / aves
+        queda = (1 - taxa / media) * 100 if media else 0.0
+        if queda < regra['limite']:
+            AlertaController._resolver(regra, entidade, dia.isoformat())
+            return []
+
+        numero_lote = Lote.select(Lote.numero_lote).where(Lote.id_lote == lote_id).scalar()
+        aviso = AlertaController._emitir(
+            regra, entidade, dia.isoformat(),
+            titulo=f"Alerta: Queda de Produção - Lote {numero_lote}",
+            conteudo=f"Em {dia.strftime('%d/%m/%Y')} o lote {numero_lote} produziu {atual.total_ovos} ovos "
+                     f"({taxa:.1%} de postura), {queda:.1f}% abaixo da média dos {regra['janela_dias']} "
+                     f"dias anteriores ({media:.1%}).",
+            categoria=CategoriaAviso.RELATORIOS.value)
+        return [aviso] if aviso else []
+
+    @staticmethod
+    @_sem_falhar
+    def avaliar_mortalidade(lote_id: int, momento) -> List[int]:
+        """Mortes do lote na janela que termina no dia do evento, em % das aves alojadas."""
+        regra = AlertaController.regras()['pico_mortalidade']
+        if not regra['ativa']:
+            return []
+
+        dia = como_data(momento)
+        lote = Lote.select(Lote.numero_lote, Lote.quantidade_inicial).where(Lote.id_lote == lote_id).first()
+        if lote is None or not lote.quantidade_inicial:
+            return []
+
+        # Datas puras: a comparação cobre tanto "2024-05-01" quanto "2024-05-01 08:30:00" gravados no SQLite
+        inicio = dia - timedelta(days=max(regra['janela_dias'], 1) - 1)
+        fim = dia + timedelta(days=1)
+        mortes = (RelatoriosMortalidade
+                  .select()
+                  .where((RelatoriosMortalidade.lote == lote_id) &
+                         (RelatoriosMortalidade.data_hora_evento >= inicio) &
+                         (RelatoriosMortalidade.data_hora_evento < fim))
+                  .count())
+        percentual = mortes / lote.quantidade_inicial * 100
+        if percentual < regra['limite']:
+            return []
+
+        aviso = AlertaController._emitir(
+            regra, f'lote:{lote_id}', dia.isoformat(),
+            titulo=f"Alerta: Mortalidade Elevada - Lote {lote.numero_lote}",
+            conteudo=f"O lote {lote.numero_lote} registrou {mortes} morte(s) até {dia.strftime('%d/%m/%Y')} "
+                     f"na janela de {max(regra['janela_dias'], 1)} dia(s), {percentual:.2f}% das "
+                     f"{lote.quantidade_inicial} aves alojadas.",
+            categoria=CategoriaAviso.GERAL.value)
+        return [aviso] if aviso else []
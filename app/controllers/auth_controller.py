@@ -1,9 +1,8 @@
 
 from flask import request, jsonify
 from app.controllers.usuario_controller import find_by_email_or_cpf
-from app.models import Usuarios, Granja, db, Sexo, TipoUsuarios, db
+from app.models import Usuarios, Granja, db, Sexo, TipoUsuarios
 from app.utils import validate_password, generate_matricula, validate_cpf, log_user_activity
-from sqlalchemy import or_
 from datetime import date
 from typing import Union
 import bcrypt
@@ -45,9 +44,6 @@ def register(nome: str, email: str, cpf: str, senha: str, tipo_usuario: Union[st
             telefone=telefone,
             username=matricula  
           )
-
-        db.session.add(new_user)
-        db.session.commit()
         
         log_user_activity(new_user.id_usuario, 'USER_CREATED', f'Novo usuário criado: {nome} ({email})')
         
@@ -58,12 +54,12 @@ def register(nome: str, email: str, cpf: str, senha: str, tipo_usuario: Union[st
     
 def sign_in(email: str, senha: str):
     try:
-        user = Usuarios.query.filter_by(email=email).first()
+        user = Usuarios.get_or_none(Usuarios.email == email)
         if not user:
             log_user_activity(None, 'LOGIN_FAILED', f'Tentativa de login com email inexistente: {email}')
             return jsonify({'message': 'User not found'}), 404
 
-        if not user.is_ativo:
+        if not user.ativo:
             log_user_activity(user.id_usuario, 'LOGIN_DENIED', 'Tentativa de login com usuário desativado')
             return jsonify({'message': 'This user has been deactivated and cannot be used.'}), 403
         
@@ -74,7 +70,7 @@ def sign_in(email: str, senha: str):
         from app.config import generate_jwt_token
         token = generate_jwt_token(
             user_id=user.id_usuario,
-            user_tipo=user.tipo_usuario.value,
+            user_tipo=user.tipo_usuario,
             user_nome=user.nome
         )
         
@@ -98,71 +94,60 @@ def register_grange():
         if 'nome_granja' not in data or not data['nome_granja'].strip():
             return jsonify({'error': 'Grange name is required'}), 400
 
-        from app.models import Granjas, db
-        
-        existing_granja = Granjas.query.filter_by(cnpj_granja=data['cnpj_granja']).first()
+        existing_granja = Granja.get_or_none(Granja.cnpj_granja == data['cnpj_granja'])
         if existing_granja:
             return jsonify({'error': 'This CNPJ has already been registered'}), 400
 
-        new_granja = Granjas(**{
-            'cnpj_granja': data['cnpj_granja'],
-            'nome_granja': data['nome_granja'].strip()
-        })
-
-        db.session.add(new_granja)
-        db.session.commit()
+        Granja.create(
+            cnpj_granja=data['cnpj_granja'],
+            nome_granja=data['nome_granja'].strip()
+        )
         
         return jsonify({
             'message': 'Grange registered successfully!',
         }), 201
         
     except Exception as e:
-        db.session.rollback()
         return jsonify({'error': f'Internal error: {str(e)}'}), 500
 
 def create_default_admin():
     try:
-        admin_exists = Usuarios.query.filter_by(email='ADMIN').first()
+        admin_exists = Usuarios.get_or_none(Usuarios.email == 'ADMIN')
         if admin_exists:
             return True
         
-        granja_exists = Granja.query.first()
-        if not granja_exists:
-            default_granja = Granja(**{
-                'cnpj_granja': '00000000000000',
-                'nome_granja': 'GRANJA PADRÃO'
-            })
-            db.session.add(default_granja)
-            db.session.commit()
-            granja_id = default_granja.id_granja
-        else:
-            granja_id = granja_exists.id_granja
-        
         hashedPassword = bcrypt.hashpw('ADMIN'.encode('utf-8'), bcrypt.gensalt(10)).decode('utf-8')
         
-        admin_user = Usuarios(**{
-            'nome': 'Administrator',
-            'email': 'ADMIN',
-            'cpf': '00000000000',
-            'senha': hashedPassword,
-            'tipo_usuario': TipoUsuarios.ADMIN,
-            'id_granja': granja_id,
-            'sexo': Sexo.MASCULINO,
-            'data_nascimento': date(1990, 1, 1),
-            'endereco': 'Sistema',
-            'data_admissao': date.today(),
-            'carteira_trabalho': 'ADMIN000',
-            'telefone': '00000000000',
-            'matricula': 'ADMIN001'
-        })
-        
-        db.session.add(admin_user)
-        db.session.commit()
+        with db.atomic():
+            granja_exists = Granja.select().first()
+            if not granja_exists:
+                default_granja = Granja.create(
+                    cnpj_granja='00000000000000',
+                    nome_granja='GRANJA PADRÃO'
+                )
+                granja_id = default_granja.id_granja
+            else:
+                granja_id = granja_exists.id_granja
+            
+            admin_user = Usuarios.create(
+                nome='Administrator',
+                email='ADMIN',
+                cpf='00000000000',
+                senha=hashedPassword,
+                tipo_usuario=TipoUsuarios.ADMIN.value,
+                id_granja=granja_id,
+                sexo=Sexo.MASCULINO.value,
+                data_nascimento=date(1990, 1, 1),
+                endereco='Sistema',
+                data_admissao=date.today(),
+                carteira_trabalho='ADMIN000',
+                telefone='00000000000',
+                username='ADMIN001'
+            )
         
         log_user_activity(admin_user.id_usuario, 'ADMIN_CREATED', 'Usuário ADMIN padrão criado')
         
         return True
         
     except Exception as e:
-        db.session.rollback()
         return False
\ No newline at end of file
@@ -1,5 +1,6 @@
 from flask import jsonify, g
-from app.models import Aves, RacaAve, db
+from app.models import Aves, RacaAve, Lote, db
+from app.controllers.lote_controller import LoteController
 from datetime import date, datetime
 from typing import Union, Optional
 
@@ -26,8 +27,12 @@ def register_poultry(id_lote: str, raca_ave: Union[str, RacaAve], data_nasciment
             except ValueError:
                 return jsonify({'error': f'Invalid breed: {raca_ave}. Valid values: {[r.value for r in RacaAve]}'}), 400
 
+        lote = LoteController.buscar_por_referencia(id_lote)
+        if not lote:
+            return jsonify({'error': f'Lot not found: {id_lote}'}), 400
+
         new_poultry = Aves.create(
-            id_lote=id_lote,
+            lote=lote,
             raca_ave=raca_ave.value,  
             data_nascimento=data_nascimento,
             tempo_de_vida=tempo_de_vida,
@@ -48,7 +53,7 @@ def register_poultry(id_lote: str, raca_ave: Union[str, RacaAve], data_nasciment
 
 def get_poultries(id_ave=None, raca=None, id_lote=None, data_nascimento=None, incluir_inativas=False):
     try:
-        query = Aves.select()
+        query = Aves.select(Aves, Lote).join(Lote)
         
         if not incluir_inativas:
             query = query.where(Aves.ativa == True)
@@ -58,7 +63,8 @@ def get_poultries(id_ave=None, raca=None, id_lote=None, data_nascimento=None, in
         if raca:
             query = query.where(Aves.raca_ave == raca)
         if id_lote:
-            query = query.where(Aves.id_lote == id_lote)
+            lote = LoteController.buscar_por_referencia(id_lote)
+            query = query.where(Aves.lote == (lote.id_lote if lote else None))
         if data_nascimento:
             query = query.where(Aves.data_nascimento == data_nascimento)
         
@@ -67,6 +73,7 @@ def get_poultries(id_ave=None, raca=None, id_lote=None, data_nascimento=None, in
         return jsonify({'aves': [{
             'id_ave': ave.id_ave,
             'id_lote': ave.id_lote,
+            'numero_lote': ave.lote.numero_lote,
             'raca_ave': ave.raca_ave,
             'data_nascimento': ave.data_nascimento.isoformat() if ave.data_nascimento else None,
             'tempo_de_vida': ave.tempo_de_vida,
@@ -82,13 +89,14 @@ def get_poultries(id_ave=None, raca=None, id_lote=None, data_nascimento=None, in
 
 def get_poultry(ave_id: int):
     try:
-        ave = Aves.get_or_none(Aves.id_ave == ave_id)
+        ave = Aves.select(Aves, Lote).join(Lote).where(Aves.id_ave == ave_id).first()
         if not ave:
             return jsonify({'message': 'Poultry not found'}), 404
         
         return jsonify({
             'id_ave': ave.id_ave,
             'id_lote': ave.id_lote,
+            'numero_lote': ave.lote.numero_lote,
             'raca_ave': ave.raca_ave,
             'data_nascimento': ave.data_nascimento.isoformat() if ave.data_nascimento else None,
             'tempo_de_vida': ave.tempo_de_vida,
@@ -0,0 +1,72 @@
+import time
+from datetime import date
+from typing import Any, Dict
+from peewee import Select, fn
+from app.models.database import db, Lote, Producao, ProducaoDiaria, Usuarios, AlertaEmitido
+
+CACHE_TTL = 30      # s; o resumo é por worker, então outros workers veem uma escrita em até CACHE_TTL
+
+_cache = (0.0, None)    # (expira_em, resumo)
+_geracao = 0            # incrementada por invalidar(); resumo calculado antes do incremento não é guardado
+
+class DashboardController:
+    """Resumo da página inicial: contadores em um único SELECT e as últimas produções em outro.
+
+    O resultado fica em cache no processo por CACHE_TTL segundos; as escritas de
+    produção chamam invalidar() para que o próprio worker não mostre dados antigos.
+    """
+
+    @staticmethod
+    def resumo(ttl: int = CACHE_TTL) -> Dict[str, Any]:
+        global _cache
+        expira_em, resumo = _cache
+        if resumo is not None and time.monotonic() < expira_em:
+            return resumo
+
+        # Uma escrita que termina durante o cálculo invalida o cache no meio dele: o resultado
+        # (talvez lido antes do commit) é devolvido, mas não guardado
+        geracao = _geracao
+        resumo = DashboardController._calcular(date.today())
+        if geracao == _geracao:
+            _cache = (time.monotonic() + ttl, resumo)
+        return resumo
+
+    @staticmethod
+    def invalidar() -> None:
+        global _cache, _geracao
+        _geracao += 1
+        _cache = (0.0, None)
+
+    @staticmethod
+    def _calcular(hoje: date) -> Dict[str, Any]:
+        def ovos(*condicoes):
+            return ProducaoDiaria.select(fn.COALESCE(fn.SUM(ProducaoDiaria.total_ovos), 0)).where(*condicoes)
+
+        contadores = (Select(columns=[
+            Lote.select(fn.COUNT(Lote.id_lote)).alias('total_lotes'),
+            Lote.select(fn.COALESCE(fn.SUM(Lote.quantidade_inicial), 0)).alias('total_aves'),
+            ovos(ProducaoDiaria.dia == hoje).alias('producao_hoje'),
+            ovos(ProducaoDiaria.dia >= hoje.replace(day=1), ProducaoDiaria.dia <= hoje).alias('producao_mes'),
+            Usuarios.select(fn.COUNT(Usuarios.id_usuario)).alias('total_usuarios'),
+            AlertaEmitido.select(fn.COUNT(AlertaEmitido.id_alerta)).alias('alertas_abertos'),
+        ]).bind(db).dicts().get())
+
+        ultimas = (Producao
+                   .select(Producao.id_producao, Producao.data_coleta, Producao.quantidade_ovos,
+                           Producao.qualidade_producao, Lote.numero_lote)
+                   .join(Lote)
+                   .order_by(Producao.data_coleta.desc(), Producao.id_producao.desc())
+                   .limit(5)
+                   .dicts())
+
+        return {
+            **contadores,
+            'ultimas_producoes': [{
+                'id_producao': p['id_producao'],
+                'data_coleta': p['data_coleta'].isoformat() if hasattr(p['data_coleta'], 'isoformat') else p['data_coleta'],
+                'lote': p['numero_lote'],
+                'quantidade_ovos': p['quantidade_ovos'],
+                'qualidade_producao': p['qualidade_producao'],
+            } for p in ultimas],
+            'atualizado_em': time.strftime('%H:%M:%S'),
+        }
@@ -1,4 +1,5 @@
 from app.models.database import EstoqueVacina
+from app.controllers.alerta_controller import AlertaController
 from app.exceptions import BusinessError
 from typing import List, Optional
 from datetime import date
@@ -42,6 +43,7 @@ class EstoqueVacinaController:
                 observacoes=observacoes
             )
             
+            AlertaController.avaliar_vacinas([estoque.id_estoque_vacina])
             return estoque
             
         except Exception as e:
@@ -73,6 +75,7 @@ class EstoqueVacinaController:
             estoque.observacoes = observacoes
             estoque.save() 
             
+            AlertaController.avaliar_vacinas([estoque.id_estoque_vacina])
             return estoque
             
         except Exception as e:
@@ -10,88 +10,137 @@ import csv
 from io import BytesIO, StringIO
 from flask import Response
 from datetime import date, timedelta
-from app.controllers.insumo_controller import InsumoController, MovimentacaoInsumoController
+from peewee import JOIN, fn
+from app.controllers.insumo_controller import InsumoController
+from app.controllers.serie_producao_controller import AGRUPAMENTOS
+from app.controllers.unidade_controller import ConversaoUnidadeController, da_base
+from app.models.database import InsumoNovo, MovimentacaoInsumo, TipoMovimentacao
 
 class RelatoriosInsumosController:
     
     @staticmethod
-    def consumo(data_inicio, data_fim, categoria=None):
-        """Gera dados do relatório de consumo"""
-        # Buscar movimentações de saída no período
-        movimentacoes = MovimentacaoInsumoController.listar_movimentacoes(
-            tipo='Saída - Uso',
-            data_inicio=data_inicio,
-            data_fim=data_fim
-        )
-        
-        # Agrupar por insumo
+    def consumo(data_inicio, data_fim, categoria=None, agrupamento=None):
+        """Gera dados do relatório de consumo ("Saída - Uso") no período.
+
+        Os totais por insumo saem de um único GROUP BY, com o filtro de categoria na
+        consulta. Com `agrupamento` ('dia', 'semana' ou 'mes') uma segunda consulta
+        agrupada traz a evolução por período, geral e de cada insumo. As somas são
+        de quantidade_base (inteiros) e só os totais voltam para a unidade do insumo.
+        O total geral de cada período é separado por unidade: [(inicio, unidade, quantidade)].
+        """
+        filtros = [
+            MovimentacaoInsumo.tipo == TipoMovimentacao.SAIDA_USO.value,
+            MovimentacaoInsumo.data_movimentacao >= data_inicio,
+            MovimentacaoInsumo.data_movimentacao < data_fim + timedelta(days=1),
+        ]
+        if categoria:
+            filtros.append(InsumoNovo.categoria == categoria)
+
+        total = fn.SUM(MovimentacaoInsumo.quantidade_base)
+        insumos = list(InsumoNovo
+                       .select(InsumoNovo, total.alias('total_base'),
+                               fn.COUNT(MovimentacaoInsumo.id_movimentacao).alias('num_movimentacoes'))
+                       .join(MovimentacaoInsumo, on=(MovimentacaoInsumo.insumo == InsumoNovo.id_insumo))
+                       .where(*filtros)
+                       .group_by(InsumoNovo.id_insumo))
+        fatores = ConversaoUnidadeController.fatores_estoque({i.id_insumo: i.unidade for i in insumos})
+        for insumo in insumos:
+            insumo.total_consumido = da_base(insumo.total_base, fatores[insumo.id_insumo])
+        insumos.sort(key=lambda i: (-i.total_consumido, i.nome))
+
+        # Chaveado pelo nome, como a página exibe; nomes repetidos ganham o id
         consumo_por_insumo = {}
-        for mov in movimentacoes:
-            if categoria and mov.insumo.categoria != categoria:
-                continue
-                
-            nome_insumo = mov.insumo.nome
-            if nome_insumo not in consumo_por_insumo:
-                consumo_por_insumo[nome_insumo] = {
-                    'insumo': mov.insumo,
-                    'total_consumido': 0,
-                    'movimentacoes': []
-                }
-            
-            consumo_por_insumo[nome_insumo]['total_consumido'] += mov.quantidade
-            consumo_por_insumo[nome_insumo]['movimentacoes'].append(mov)
-        
-        # Ordenar por consumo
-        consumo_ordenado = sorted(
-            consumo_por_insumo.items(), 
-            key=lambda x: x[1]['total_consumido'], 
-            reverse=True
-        )
-        
+        por_id = {}
+        for insumo in insumos:
+            chave = insumo.nome if insumo.nome not in consumo_por_insumo else f"{insumo.nome} (#{insumo.id_insumo})"
+            consumo_por_insumo[chave] = por_id[insumo.id_insumo] = {
+                'insumo': insumo,
+                'total_consumido': insumo.total_consumido,
+                'num_movimentacoes': insumo.num_movimentacoes,
+            }
+
+        por_periodo = []
+        if agrupamento:
+            periodo = AGRUPAMENTOS[agrupamento](MovimentacaoInsumo.data_movimentacao).coerce(False)
+            linhas = (MovimentacaoInsumo
+                      .select(MovimentacaoInsumo.insumo, periodo, total)
+                      .join(InsumoNovo)
+                      .where(*filtros)
+                      .group_by(MovimentacaoInsumo.insumo, periodo)
+                      .order_by(periodo)
+                      .tuples())
+
+            totais = {}
+            for dados in por_id.values():
+                dados['por_periodo'] = []
+            for insumo_id, inicio_periodo, quantidade_base in linhas:
+                inicio_periodo = date.fromisoformat(inicio_periodo)
+                quantidade = da_base(quantidade_base, fatores[insumo_id])
+                por_id[insumo_id]['por_periodo'].append((inicio_periodo, quantidade))
+                # kg, L e un não se somam: um total por unidade em cada período
+                chave = (inicio_periodo, por_id[insumo_id]['insumo'].unidade)
+                totais[chave] = totais.get(chave, 0) + quantidade
+            por_periodo = [(inicio, unidade, quantidade) for (inicio, unidade), quantidade in sorted(totais.items())]
+
+        consumo_ordenado = list(consumo_por_insumo.items())      # já em ordem, do maior para o menor
+
         return {
             'consumo_por_insumo': consumo_por_insumo,
             'consumo_ordenado': consumo_ordenado,
             'total_itens': len(consumo_por_insumo),
-            'total_quantidade': sum(dados['total_consumido'] for dados in consumo_por_insumo.values())
+            'total_quantidade': sum(dados['total_consumido'] for dados in consumo_por_insumo.values()),
+            'total_movimentacoes': sum(dados['num_movimentacoes'] for dados in consumo_por_insumo.values()),
+            'agrupamento': agrupamento,
+            'por_periodo': por_periodo,
         }
     
     @staticmethod
-    def cobertura():
-        """Gera relatório de cobertura de estoque"""
-        insumos = InsumoController.listar_todos(ativo=True)
-        
-        # Calcular cobertura baseada no consumo dos últimos 30 dias
+    def cobertura(dias=30):
+        """Gera relatório de cobertura de estoque com base no consumo dos últimos `dias` dias.
+
+        O consumo de todos os insumos sai de uma única consulta agrupada, ligada ao
+        catálogo por LEFT JOIN; insumos sem saída no período aparecem com consumo zero.
+        """
+        dias = max(int(dias), 1)
         data_fim = date.today()
-        data_inicio = data_fim - timedelta(days=30)
-        
+        data_inicio = data_fim - timedelta(days=dias - 1)     # `dias` dias de calendário, contando hoje
+
+        consumo = (MovimentacaoInsumo
+                   .select(MovimentacaoInsumo.insumo.alias('insumo_id'),
+                           fn.SUM(MovimentacaoInsumo.quantidade_base).alias('total'))
+                   .where((MovimentacaoInsumo.tipo == TipoMovimentacao.SAIDA_USO.value) &
+                          (MovimentacaoInsumo.data_movimentacao >= data_inicio) &
+                          (MovimentacaoInsumo.data_movimentacao < data_fim + timedelta(days=1)))
+                   .group_by(MovimentacaoInsumo.insumo)
+                   .alias('consumo'))
+
+        insumos = list(InsumoNovo
+                       .select(InsumoNovo, fn.COALESCE(consumo.c.total, 0).alias('total_base'))
+                       .join(consumo, JOIN.LEFT_OUTER, on=(consumo.c.insumo_id == InsumoNovo.id_insumo))
+                       .where(InsumoNovo.ativo == True)
+                       .order_by(InsumoNovo.nome))
+        fatores = ConversaoUnidadeController.fatores_estoque({i.id_insumo: i.unidade for i in insumos})
+
         relatorio_cobertura = []
-        
+
         for insumo in insumos:
-            # Buscar movimentações do insumo nos últimos 30 dias
-            movimentacoes = MovimentacaoInsumoController.listar_movimentacoes(
-                insumo_id=insumo.id_insumo,
-                tipo='Saída - Uso',
-                data_inicio=data_inicio,
-                data_fim=data_fim
-            )
-            
-            total_consumido = sum(mov.quantidade for mov in movimentacoes)
-            media_diaria = total_consumido / 30 if total_consumido > 0 else 0
+            total = da_base(insumo.total_base, fatores[insumo.id_insumo])
+            media_diaria = total / dias if total > 0 else 0
             dias_cobertura = (insumo.quantidade_atual / media_diaria) if media_diaria > 0 else 999
-            
+
             relatorio_cobertura.append({
                 'insumo': insumo,
-                'total_consumido_30d': total_consumido,
+                'total_consumido_30d': total,
                 'media_diaria': media_diaria,
                 'dias_cobertura': dias_cobertura,
                 'status': 'crítico' if dias_cobertura < 7 else 'atenção' if dias_cobertura < 30 else 'ok'
             })
-        
+
         # Ordenar por dias de cobertura (menor primeiro)
         relatorio_cobertura.sort(key=lambda x: x['dias_cobertura'])
-        
+
         return relatorio_cobertura
-    
+
     @staticmethod
     def vencimentos(dias=30):
         """Gera relatório de vencimentos próximos"""
@@ -151,13 +200,15 @@ class RelatoriosInsumosController:
             return RelatoriosInsumosController._exportar_vencimentos(formato, **kwargs)
         elif tipo_relatorio == 'abaixo_minimo':
             return RelatoriosInsumosController._exportar_abaixo_minimo(formato, **kwargs)
+        elif tipo_relatorio == 'reposicao':
+            return RelatoriosInsumosController._exportar_reposicao(formato, **kwargs)
         else:
             raise ValueError("Tipo de relatório inválido")
     
     @staticmethod
-    def _exportar_consumo(formato, data_inicio, data_fim, categoria=None):
+    def _exportar_consumo(formato, data_inicio, data_fim, categoria=None, agrupamento=None):
         """Exporta relatório de consumo"""
-        dados = RelatoriosInsumosController.consumo(data_inicio, data_fim, categoria)
+        dados = RelatoriosInsumosController.consumo(data_inicio, data_fim, categoria, agrupamento)
         
         if formato == 'csv':
             return RelatoriosInsumosController._export_consumo_csv(dados, data_inicio, data_fim)
@@ -167,16 +218,16 @@ class RelatoriosInsumosController:
             return RelatoriosInsumosController._export_consumo_pdf(dados, data_inicio, data_fim)
     
     @staticmethod
-    def _exportar_cobertura(formato, **kwargs):
+    def _exportar_cobertura(formato, dias=30):
         """Exporta relatório de cobertura"""
-        dados = RelatoriosInsumosController.cobertura()
+        dados = RelatoriosInsumosController.cobertura(dias)
         
         if formato == 'csv':
-            return RelatoriosInsumosController._export_cobertura_csv(dados)
+            return RelatoriosInsumosController._export_cobertura_csv(dados, dias)
         elif formato == 'excel':
-            return RelatoriosInsumosController._export_cobertura_excel(dados)
+            return RelatoriosInsumosController._export_cobertura_excel(dados, dias)
         elif formato == 'pdf':
-            return RelatoriosInsumosController._export_cobertura_pdf(dados)
+            return RelatoriosInsumosController._export_cobertura_pdf(dados, dias)
     
     @staticmethod
     def _exportar_vencimentos(formato, dias=30):
@@ -202,6 +253,289 @@ class RelatoriosInsumosController:
         elif formato == 'pdf':
             return RelatoriosInsumosController._export_abaixo_minimo_pdf(dados)
         
+    @staticmethod
+    def _exportar_reposicao(formato, **kwargs):
+        """Exporta sugestões de reposição (ponto de pedido)"""
+        from app.controllers.reposicao_controller import ReposicaoController     # carrega o NumPy só aqui
+        
+        dados = ReposicaoController.calcular(**kwargs)
+        
+        if formato == 'csv':
+            return RelatoriosInsumosController._export_reposicao_csv(dados)
+        elif formato == 'excel':
+            return RelatoriosInsumosController._export_reposicao_excel(dados)
+        elif formato == 'pdf':
+            return RelatoriosInsumosController._export_reposicao_pdf(dados)
+    
+    # ===== EXPORTAÇÕES REPOSIÇÃO =====
+    _COLUNAS_REPOSICAO = [
+        ('Insumo', 'nome'), ('Categoria', 'categoria'), ('Unidade', 'unidade'),
+        ('Estoque Atual', 'estoque_atual'), ('Consumo Diário', 'consumo_diario'),
+        ('Prazo Entrega (dias)', 'prazo_entrega_dias'), ('Estoque Segurança', 'estoque_seguranca'),
+        ('Ponto de Pedido', 'ponto_pedido'), ('Quantidade Sugerida', 'quantidade_sugerida'),
+    ]
+    
+    @staticmethod
+    def _export_reposicao_csv(dados):
+        """Exporta reposição em CSV"""
+        output = StringIO()
+        writer = csv.writer(output)
+        
+        colunas = RelatoriosInsumosController._COLUNAS_REPOSICAO
+        writer.writerow([titulo.replace(' ', '_') for titulo, _ in colunas] + ['Repor'])
+        for item in dados:
+            writer.writerow([item[campo] for _, campo in colunas] + ['sim' if item['repor'] else 'não'])
+        
+        output.seek(0)
+        
+        return Response(
+            output.getvalue(),
+            mimetype='text/csv',
+            headers={'Content-Disposition': f'attachment; filename=reposicao_insumos_{date.today()}.csv'}
+        )
+    
+    @staticmethod
+    def _export_reposicao_excel(dados):
+        """Exporta reposição em Excel"""
+        buffer = BytesIO()
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.title = "Reposição"
+        
+        header_fill = PatternFill(start_color='28A745', end_color='28A745', fill_type='solid')
+        header_font = Font(color='FFFFFF', bold=True)
+        destaque = PatternFill(start_color='F8D7DA', end_color='F8D7DA', fill_type='solid')
+        
+        colunas = RelatoriosInsumosController._COLUNAS_REPOSICAO
+        for col, (titulo, _) in enumerate(colunas, 1):
+            cell = ws.cell(row=1, column=col, value=titulo)
+            cell.fill = header_fill
+            cell.font = header_font
+            cell.alignment = Alignment(horizontal='center')
+        
+        # Dados (itens a repor destacados)
+        for row, item in enumerate(dados, 2):
+            for col, (_, campo) in enumerate(colunas, 1):
+                cell = ws.cell(row=row, column=col, value=item[campo])
+                if item['repor']:
+                    cell.fill = destaque
+        
+        for column in ws.columns:
+            max_length = max(len(str(cell.value or '')) for cell in column)
+            ws.column_dimensions[column[0].column_letter].width = min(max_length + 2, 50)
+        
+        wb.save(buffer)
+        buffer.seek(0)
+        
+        return Response(
+            buffer.getvalue(),
+            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            headers={'Content-Disposition': f'attachment; filename=reposicao_insumos_{date.today()}.xlsx'}
+        )
+    
+    @staticmethod
+    def _export_reposicao_pdf(dados):
+        """Exporta reposição em PDF (apenas os itens a repor)"""
+        buffer = BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=A4)
+        styles = getSampleStyleSheet()
+        story = []
+        
+        title_style = ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=16,
+            spaceAfter=30,
+            alignment=TA_CENTER
+        )
+        story.append(Paragraph("Relatório - Sugestão de Compras", title_style))
+        story.append(Spacer(1, 20))
+        
+        table_data = [['Insumo', 'Categoria', 'Estoque', 'Ponto de Pedido', 'Comprar']]
+        for item in dados:
+            if item['repor']:
+                table_data.append([
+                    item['nome'],
+                    item['categoria'],
+                    f"{item['estoque_atual']:.2f} {item['unidade']}",
+                    f"{item['ponto_pedido']:.2f} {item['unidade']}",
+                    f"{item['quantidade_sugerida']:.0f} {item['unidade']}"
+                ])
+        
+        if len(table_data) == 1:
+            story.append(Paragraph("Nenhum insumo atingiu o ponto de pedido.", styles['Normal']))
+        else:
+            table = Table(table_data)
+            table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.green),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, 0), 10),
+                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black)
+            ]))
+            story.append(table)
+        
+        story.append(Spacer(1, 30))
+        story.append(Paragraph(f"Gerado em: {date.today().strftime('%d/%m/%Y')}", styles['Normal']))
+        
+        doc.build(story)
+        buffer.seek(0)
+        
+        return Response(
+            buffer.getvalue(),
+            mimetype='application/pdf',
+            headers={'Content-Disposition': f'attachment; filename=reposicao_insumos_{date.today()}.pdf'}
+        )
+    
+    # ===== EXPORTAÇÕES COBERTURA =====
+    @staticmethod
+    def _export_cobertura_csv(dados, dias=30):
+        """Exporta cobertura em CSV"""
+        output = StringIO()
+        writer = csv.writer(output)
+        
+        # Cabeçalho
+        writer.writerow(['Insumo', 'Categoria', 'Estoque_Atual', 'Unidade', f'Consumo_{dias}d',
+                         'Media_Diaria', 'Dias_Cobertura', 'Status'])
+        
+        # Dados
+        for item in dados:
+            writer.writerow([
+                item['insumo'].nome,
+                item['insumo'].categoria,
+                float(item['insumo'].quantidade_atual),
+                item['insumo'].unidade,
+                float(item['total_consumido_30d']),
+                round(float(item['media_diaria']), 2),
+                round(float(item['dias_cobertura']), 1),
+                item['status']
+            ])
+        
+        output.seek(0)
+        
+        return Response(
+            output.getvalue(),
+            mimetype='text/csv',
+            headers={'Content-Disposition': f'attachment; filename=cobertura_insumos_{date.today()}.csv'}
+        )
+    
+    @staticmethod
+    def _export_cobertura_excel(dados, dias=30):
+        """Exporta cobertura em Excel"""
+        buffer = BytesIO()
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.title = "Cobertura"
+        
+        # Cabeçalho
+        header_fill = PatternFill(start_color='17A2B8', end_color='17A2B8', fill_type='solid')
+        header_font = Font(color='FFFFFF', bold=True)
+        
+        headers = ['Insumo', 'Categoria', 'Estoque Atual', 'Unidade', f'Consumo ({dias} dias)',
+                   'Média Diária', 'Dias de Cobertura', 'Status']
+        
+        for col, header in enumerate(headers, 1):
+            cell = ws.cell(row=1, column=col, value=header)
+            cell.fill = header_fill
+            cell.font = header_font
+            cell.alignment = Alignment(horizontal='center')
+        
+        # Dados
+        for i, item in enumerate(dados, 1):
+            row = i + 1
+            
+            ws.cell(row=row, column=1, value=item['insumo'].nome)
+            ws.cell(row=row, column=2, value=item['insumo'].categoria)
+            ws.cell(row=row, column=3, value=float(item['insumo'].quantidade_atual))
+            ws.cell(row=row, column=4, value=item['insumo'].unidade)
+            ws.cell(row=row, column=5, value=float(item['total_consumido_30d']))
+            ws.cell(row=row, column=6, value=round(float(item['media_diaria']), 2))
+            ws.cell(row=row, column=7, value=round(float(item['dias_cobertura']), 1))
+            ws.cell(row=row, column=8, value=item['status'])
+        
+        # Autofit
+        for column in ws.columns:
+            max_length = max(len(str(cell.value or '')) for cell in column)
+            ws.column_dimensions[column[0].column_letter].width = min(max_length + 2, 50)
+        
+        wb.save(buffer)
+        buffer.seek(0)
+        
+        return Response(
+            buffer.getvalue(),
+            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            headers={'Content-Disposition': f'attachment; filename=cobertura_insumos_{date.today()}.xlsx'}
+        )
+    
+    @staticmethod
+    def _export_cobertura_pdf(dados, dias=30):
+        """Exporta cobertura em PDF"""
+        buffer = BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=A4)
+        styles = getSampleStyleSheet()
+        story = []
+        
+        # Título
+        title_style = ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=16,
+            spaceAfter=30,
+            alignment=TA_CENTER
+        )
+        
+        title = Paragraph("Relatório - Cobertura de Estoque", title_style)
+        story.append(title)
+        story.append(Paragraph(f"Consumo médio dos últimos {dias} dias", styles['Normal']))
+        story.append(Spacer(1, 20))
+        
+        # Dados da tabela
+        table_data = [['Insumo', 'Categoria', 'Estoque', 'Média/Dia', 'Cobertura', 'Status']]
+        
+        for item in dados:
+            unidade = item['insumo'].unidade
+            cobertura = 'Sem consumo' if item['dias_cobertura'] >= 999 else f"{item['dias_cobertura']:.0f} dias"
+            table_data.append([
+                item['insumo'].nome,
+                item['insumo'].categoria,
+                f"{item['insumo'].quantidade_atual} {unidade}",
+                f"{item['media_diaria']:.2f} {unidade}",
+                cobertura,
+                item['status'].upper()
+            ])
+        
+        # Criar tabela
+        table = Table(table_data)
+        table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.teal),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ]))
+        
+        story.append(table)
+        
+        # Rodapé
+        story.append(Spacer(1, 30))
+        footer = Paragraph(f"Gerado em: {date.today().strftime('%d/%m/%Y')}", styles['Normal'])
+        story.append(footer)
+        
+        doc.build(story)
+        buffer.seek(0)
+        
+        return Response(
+            buffer.getvalue(),
+            mimetype='application/pdf',
+            headers={'Content-Disposition': f'attachment; filename=cobertura_insumos_{date.today()}.pdf'}
+        )
+    
     # ===== EXPORTAÇÕES VENCIMENTOS =====
     @staticmethod
     def _export_vencimentos_csv(dados):
@@ -371,10 +705,19 @@ class RelatoriosInsumosController:
                 float(dados_insumo['total_consumido']),
                 dados_insumo['insumo'].unidade,
                 round(media_diaria, 2),
-                len(dados_insumo['movimentacoes']),
+                dados_insumo['num_movimentacoes'],
                 float(dados_insumo['insumo'].quantidade_atual)
             ])
         
+        # Evolução por período (quando pedida)
+        if dados['por_periodo']:
+            writer.writerow([])
+            writer.writerow(['Periodo', 'Insumo', 'Total_Consumido', 'Unidade'])
+            for nome_insumo, dados_insumo in dados['consumo_ordenado']:
+                for inicio_periodo, quantidade in dados_insumo['por_periodo']:
+                    writer.writerow([inicio_periodo.strftime('%d/%m/%Y'), nome_insumo, float(quantidade),
+                                     dados_insumo['insumo'].unidade])
+        
         output.seek(0)
         
         return Response(
@@ -447,9 +790,29 @@ class RelatoriosInsumosController:
             ws.cell(row=row, column=4, value=float(dados_insumo['total_consumido'])) 
             ws.cell(row=row, column=5, value=dados_insumo['insumo'].unidade)  
             ws.cell(row=row, column=6, value=round(media_diaria, 2))  
-            ws.cell(row=row, column=7, value=len(dados_insumo['movimentacoes'])) 
+            ws.cell(row=row, column=7, value=dados_insumo['num_movimentacoes']) 
             ws.cell(row=row, column=8, value=float(dados_insumo['insumo'].quantidade_atual)) 
         
+        # Evolução por período (quando pedida): uma linha por período, uma coluna por insumo
+        if dados['por_periodo']:
+            ws_periodo = wb.create_sheet("Por Período")
+            unidades = sorted({unidade for _, unidade, _ in dados['por_periodo']})
+            nomes = [nome_insumo for nome_insumo, _ in dados['consumo_ordenado']]
+            for col, header in enumerate(['Período'] + [f'Total ({u})' for u in unidades] + nomes, 1):
+                cell = ws_periodo.cell(row=1, column=col, value=header)
+                cell.fill = header_fill
+                cell.font = header_font
+            inicios = sorted({inicio for inicio, _, _ in dados['por_periodo']})
+            linha_periodo = {inicio: row for row, inicio in enumerate(inicios, 2)}
+            coluna_unidade = {unidade: col for col, unidade in enumerate(unidades, 2)}
+            for inicio_periodo, unidade, quantidade in dados['por_periodo']:
+                ws_periodo.cell(row=linha_periodo[inicio_periodo], column=1, value=inicio_periodo)
+                ws_periodo.cell(row=linha_periodo[inicio_periodo], column=coluna_unidade[unidade],
+                                value=float(quantidade))
+            for col, (_, dados_insumo) in enumerate(dados['consumo_ordenado'], 2 + len(unidades)):
+                for inicio_periodo, quantidade in dados_insumo['por_periodo']:
+                    ws_periodo.cell(row=linha_periodo[inicio_periodo], column=col, value=float(quantidade))
+        
         # Autofit colunas
         for column in ws.columns:
             max_length = 0
@@ -570,8 +933,7 @@ class RelatoriosInsumosController:
             ])
         
         # Criar tabela
-        table = Table(table_data)
-        table.setStyle(TableStyle([
+        estilo_tabela = TableStyle([
             ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
             ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
@@ -580,10 +942,23 @@ class RelatoriosInsumosController:
             ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
             ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
             ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        ])
+        table = Table(table_data)
+        table.setStyle(estilo_tabela)
         
         story.append(table)
         
+        # Evolução por período (quando pedida)
+        if dados['por_periodo']:
+            story.append(Spacer(1, 20))
+            story.append(Paragraph("Consumo total por período", styles['Heading2']))
+            periodos = [['Início do Período', 'Total Consumido', 'Unidade']]
+            periodos += [[inicio.strftime('%d/%m/%Y'), f"{quantidade}", unidade]
+                         for inicio, unidade, quantidade in dados['por_periodo']]
+            tabela_periodos = Table(periodos)
+            tabela_periodos.setStyle(estilo_tabela)
+            story.append(tabela_periodos)
+        
         # Rodapé
         story.append(Spacer(1, 30))
         footer = Paragraph(f"Gerado em: {date.today().strftime('%d/%m/%Y')}", styles['Normal'])
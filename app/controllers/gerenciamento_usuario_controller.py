@@ -1,12 +1,13 @@
 from flask import request, jsonify, g
-from app.models import Usuarios, UserActivityLog, db, Sexo, TipoUsuarios
+from peewee import JOIN
+from app.models import Usuarios, UserActivityLog
 from app.utils import validate_password, log_user_activity, validate_cpf
 import bcrypt
 
 def update_user_data(user_id: str):
     try:
         current_user = g.get('current_user')
-        user = Usuarios.query.get(user_id)
+        user = Usuarios.get_or_none(Usuarios.id_usuario == user_id)
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -19,11 +20,6 @@ def update_user_data(user_id: str):
                 old_value = getattr(user, field)
                 new_value = data[field]
                 
-                if field == 'sexo' and isinstance(new_value, str):
-                    new_value = Sexo(new_value)
-                elif field == 'tipo_usuario' and isinstance(new_value, str):
-                    new_value = TipoUsuarios(new_value)
-                
                 if old_value != new_value:
                     setattr(user, field, new_value)
                     log_user_activity(
@@ -32,11 +28,10 @@ def update_user_data(user_id: str):
                         f'Campo {field} alterado de {old_value} para {new_value} no usuário {user.nome}'
                     )
         
-        db.session.commit()
+        user.save()
         return jsonify({'message': 'User data updated successfully'}), 200
         
     except Exception as e:
-        db.session.rollback()
         return jsonify({'error': f'Internal error: {str(e)}'}), 500
 
 def get_user_by_cpf():
@@ -47,7 +42,7 @@ def get_user_by_cpf():
         if not cpf:
             return jsonify({'error': 'CPF is required'}), 400
         
-        user = Usuarios.query.filter_by(cpf=cpf).first()
+        user = Usuarios.get_or_none(Usuarios.cpf == cpf)
         if not user:
             return jsonify({'message': 'User not found'}), 404
 
@@ -84,25 +79,28 @@ def change_password():
         
         hashed_new_password = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt(10)).decode('utf-8')
         current_user.senha = hashed_new_password
-        
-        db.session.commit()
+        current_user.save()
 
         log_user_activity(current_user.id_usuario, 'PASSWORD_CHANGED', 'Password changed successfully')
 
         return jsonify({'message': 'Password changed successfully'}), 200
 
     except Exception as e:
-        db.session.rollback()
         return jsonify({'error': f'Internal error: {str(e)}'}), 500
 
 from typing import Optional
 
 def get_user_activity_logs(user_id: Optional[str] = None):
     try:
+        # Um único SELECT com LEFT JOIN traz o nome do autor junto com cada registro
+        logs = (UserActivityLog
+                .select(UserActivityLog, Usuarios.id_usuario, Usuarios.nome)
+                .join(Usuarios, JOIN.LEFT_OUTER)
+                .order_by(UserActivityLog.data_acao.desc()))
         if user_id:
-            logs = UserActivityLog.query.filter_by(user_id=user_id).order_by(UserActivityLog.timestamp.desc()).limit(50).all()
+            logs = logs.where(UserActivityLog.usuario == user_id).limit(50)
         else:
-            logs = UserActivityLog.query.order_by(UserActivityLog.timestamp.desc()).limit(100).all()
+            logs = logs.limit(100)
         
         current_user = g.get('current_user')
         log_user_activity(
@@ -112,12 +110,12 @@ def get_user_activity_logs(user_id: Optional[str] = None):
         )
         
         return jsonify([{
-            'id': log.id,
-            'user_id': log.user_id,
-            'user_name': log.user.nome if log.user else 'Sistema',
-            'action': log.action,
-            'details': log.details,
-            'timestamp': log.timestamp.isoformat(),
+            'id': log.id_log,
+            'user_id': log.usuario_id,
+            'user_name': log.usuario.nome if log.usuario_id else 'Sistema',
+            'action': log.acao,
+            'details': log.detalhes,
+            'timestamp': log.data_acao.isoformat(),
             'ip_address': log.ip_address
         } for log in logs]), 200
         
@@ -126,7 +124,7 @@ def get_user_activity_logs(user_id: Optional[str] = None):
 
 def get_all_users_for_admin():
     try:
-        users = Usuarios.query.all()
+        users = Usuarios.select().order_by(Usuarios.nome)
         
         current_user = g.get('current_user')
         log_user_activity(
@@ -148,15 +146,14 @@ def forgot_password():
         if not email:
             return jsonify({'error': 'Email is required'}), 400
         
-        user = Usuarios.query.filter_by(email=email).first()
+        user = Usuarios.get_or_none(Usuarios.email == email)
         if not user:
             return jsonify({'message': 'If the email exists, instructions have been sent'}), 200
 
         new_password = "Temp123"
         hashed_password = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt(10)).decode('utf-8')
         user.senha = hashed_password
-        
-        db.session.commit()
+        user.save()
 
         log_user_activity(user.id_usuario, 'PASSWORD_RESET', 'Password reset due to forgetfulness')
 
@@ -167,5 +164,4 @@ def forgot_password():
         }), 200
         
     except Exception as e:
-        db.session.rollback()
         return jsonify({'error': f'Internal error: {str(e)}'}), 500
\ No newline at end of file
@@ -1,8 +1,17 @@
-from app.models.database import InsumoNovo, MovimentacaoInsumo, Usuarios
+from peewee import JOIN, Case, Tuple, chunked, fn
+from app.models.database import db, InsumoNovo, MovimentacaoInsumo, SaldoInsumo, Usuarios, TipoMovimentacao
+from app.controllers.unidade_controller import ConversaoUnidadeController, para_base, da_base
+from app.controllers.alerta_controller import AlertaController
 from app.exceptions import BusinessError
+from app.utils.helpers import como_data
 from typing import List, Optional, Dict, Any
-from datetime import date, datetime, timedelta
-from decimal import Decimal
+from datetime import date, timedelta
+from decimal import Decimal, InvalidOperation
+
+POR_PAGINA = 50     # movimentações por página no histórico
+
+def _primeiro_dia_mes_seguinte(dia: date) -> date:
+    return (dia.replace(day=1) + timedelta(days=32)).replace(day=1)
 
 class InsumoController:
     
@@ -27,6 +36,14 @@ class InsumoController:
         
         return list(query.order_by(InsumoNovo.nome))
     
+    @staticmethod
+    def listar_opcoes(ativo: bool = True) -> List[InsumoNovo]:
+        """Só id e nome dos insumos, para preencher selects"""
+        return list(InsumoNovo
+                    .select(InsumoNovo.id_insumo, InsumoNovo.nome)
+                    .where(InsumoNovo.ativo == ativo)
+                    .order_by(InsumoNovo.nome))
+
     @staticmethod
     def buscar_por_id(id_insumo: int) -> Optional[InsumoNovo]:
         """Busca insumo por ID"""
@@ -51,30 +68,40 @@ class InsumoController:
             if data_validade and data_validade <= date.today():
                 raise BusinessError("Data de validade deve ser futura")
             
-            # Criar insumo
-            insumo = InsumoNovo.create(
-                nome=nome,
-                categoria=categoria,
-                unidade=unidade,
-                quantidade_atual=quantidade_inicial,
-                quantidade_minima=quantidade_minima,
-                data_validade=data_validade,
-                observacoes=observacoes,
-                usuario_criacao=usuario_id
-            )
-            
-            # Criar movimentação inicial se quantidade > 0
-            if quantidade_inicial > 0:
-                MovimentacaoInsumo.create(
-                    insumo=insumo,
-                    tipo='Entrada - Ajuste',
-                    quantidade=quantidade_inicial,
-                    observacoes='Estoque inicial',
-                    usuarios=usuario_id,
-                    estoque_anterior=0,
-                    estoque_posterior=quantidade_inicial
+            # Insumo e estoque inicial na mesma transação
+            with db.atomic():
+                # Criar insumo
+                insumo = InsumoNovo.create(
+                    nome=nome,
+                    categoria=categoria,
+                    unidade=unidade,
+                    quantidade_atual=quantidade_inicial,
+                    quantidade_minima=quantidade_minima,
+                    data_validade=data_validade,
+                    observacoes=observacoes,
+                    usuario_criacao=usuario_id
                 )
             
+                # Criar movimentação inicial se quantidade > 0
+                if quantidade_inicial > 0:
+                    fator = ConversaoUnidadeController.fatores_estoque({insumo.id_insumo: unidade})[insumo.id_insumo]
+                    insumo.estoque_base = para_base(quantidade_inicial, fator)
+                    insumo.quantidade_atual = da_base(insumo.estoque_base, fator)
+                    insumo.save(only=[InsumoNovo.estoque_base, InsumoNovo.quantidade_atual])
+                    MovimentacaoInsumo.create(
+                        insumo=insumo,
+                        tipo='Entrada - Ajuste',
+                        quantidade=quantidade_inicial,
+                        quantidade_base=insumo.estoque_base,
+                        unidade=unidade,
+                        observacoes='Estoque inicial',
+                        usuarios=usuario_id,
+                        estoque_anterior=0,
+                        estoque_posterior=insumo.quantidade_atual,
+                        estoque_posterior_base=insumo.estoque_base
+                    )
+            
+            AlertaController.avaliar_insumos([insumo.id_insumo])
             return insumo
             
         except Exception as e:
@@ -96,6 +123,11 @@ class InsumoController:
             if quantidade_minima < 0:
                 raise BusinessError("Quantidade mínima não pode ser negativa")
             
+            # O estoque e o histórico estão na unidade atual; outras unidades entram pelas conversões
+            if unidade != insumo.unidade and insumo.movimentacoes.exists():
+                raise BusinessError("A unidade de um insumo com movimentações não pode ser alterada; "
+                                    "cadastre uma conversão para lançar em outra unidade")
+            
             # Atualizar dados
             insumo.nome = nome
             insumo.categoria = categoria
@@ -105,6 +137,7 @@ class InsumoController:
             insumo.observacoes = observacoes
             insumo.save()
             
+            AlertaController.avaliar_insumos([insumo.id_insumo])
             return insumo
             
         except Exception as e:
@@ -123,6 +156,7 @@ class InsumoController:
             insumo.ativo = False
             insumo.save()
             
+            AlertaController.avaliar_insumos([insumo.id_insumo])
             return True
             
         except Exception as e:
@@ -141,6 +175,7 @@ class InsumoController:
             insumo.ativo = True
             insumo.save()
             
+            AlertaController.avaliar_insumos([insumo.id_insumo])
             return True
             
         except Exception as e:
@@ -151,87 +186,456 @@ class InsumoController:
 class MovimentacaoInsumoController:
     
     @staticmethod
-    def listar_movimentacoes(insumo_id: int = None, tipo: str = None, 
+    def listar_movimentacoes(insumo_id: int = None, tipo: str = None,
                            data_inicio: date = None, data_fim: date = None,
-                           usuario_id: int = None) -> List[MovimentacaoInsumo]:
-        """Lista movimentações com filtros opcionais"""
-        query = MovimentacaoInsumo.select().join(InsumoNovo)
-        
+                           usuario_id: int = None, apos: int = None, antes: int = None,
+                           limite: int = POR_PAGINA) -> Dict[str, Any]:
+        """Uma página do histórico, da movimentação mais recente para a mais antiga.
+
+        A ordem é (data_movimentacao, id_movimentacao) e a paginação é por cursor:
+        `apos` traz as movimentações seguintes (mais antigas) à de id informado e
+        `antes` as anteriores (mais recentes). O custo não depende do tamanho do
+        histórico: a consulta parte do cursor pelo índice e lê no máximo limite + 1 linhas.
+
+        Cada movimentação vem com insumo e usuário já carregados e com
+        `saldo_acumulado`, o saldo do insumo logo após ela na ordem do histórico.
+        """
+        filtros = []
         if insumo_id:
-            query = query.where(MovimentacaoInsumo.insumo == insumo_id)
-        
+            filtros.append(MovimentacaoInsumo.insumo == insumo_id)
         if tipo:
-            query = query.where(MovimentacaoInsumo.tipo == tipo)
-        
+            filtros.append(MovimentacaoInsumo.tipo == tipo)
         if data_inicio:
-            query = query.where(MovimentacaoInsumo.data_movimentacao >= data_inicio)
-        
+            filtros.append(MovimentacaoInsumo.data_movimentacao >= data_inicio)
         if data_fim:
-            query = query.where(MovimentacaoInsumo.data_movimentacao <= data_fim)
-        
+            filtros.append(MovimentacaoInsumo.data_movimentacao < data_fim + timedelta(days=1))
         if usuario_id:
-            query = query.where(MovimentacaoInsumo.usuarios == usuario_id)
+            filtros.append(MovimentacaoInsumo.usuarios == usuario_id)
+
+        # O cursor é só o id; a data é lida do banco como está gravada (com ou sem hora)
+        chave = Tuple(MovimentacaoInsumo.data_movimentacao, MovimentacaoInsumo.id_movimentacao)
+        cursor = apos or antes
+        if cursor:
+            Cursor = MovimentacaoInsumo.alias()
+            data_cursor = (Cursor.select(Cursor.data_movimentacao)
+                           .where(Cursor.id_movimentacao == cursor))
+            filtros.append(chave < Tuple(data_cursor, cursor) if apos else chave > Tuple(data_cursor, cursor))
+
+        ordem = [MovimentacaoInsumo.data_movimentacao, MovimentacaoInsumo.id_movimentacao]
+        query = (MovimentacaoInsumo
+                 .select(MovimentacaoInsumo, InsumoNovo.id_insumo, InsumoNovo.nome, InsumoNovo.categoria,
+                         InsumoNovo.unidade, Usuarios.id_usuario, Usuarios.nome,
+                         MovimentacaoInsumoController._saldo_acumulado().alias('saldo_acumulado'))
+                 # LEFT JOIN mantém movimentacoes_insumo como tabela externa: o SQLite percorre o
+                 # índice na ordem da página e para no limite, sem ordenar o histórico inteiro
+                 .join(InsumoNovo, JOIN.LEFT_OUTER)
+                 .switch(MovimentacaoInsumo)
+                 .join(Usuarios, JOIN.LEFT_OUTER)
+                 .order_by(*(ordem if antes else [campo.desc() for campo in ordem]))
+                 .limit(limite + 1))
+        if filtros:
+            query = query.where(*filtros)
+
+        movimentacoes = list(query)
+        mais = len(movimentacoes) > limite
+        movimentacoes = movimentacoes[:limite]
+        if antes:
+            movimentacoes.reverse()
+        fatores = ConversaoUnidadeController.fatores_estoque({mov.insumo.id_insumo: mov.insumo.unidade
+                                                             for mov in movimentacoes})
+        for mov in movimentacoes:
+            mov.saldo_acumulado = da_base(mov.saldo_acumulado, fatores[mov.insumo.id_insumo])
+
+        # Vindo de um cursor, sabe-se que existem movimentações do outro lado dele
+        tem_proxima, tem_anterior = (True, mais) if antes else (mais, bool(apos))
+        return {
+            'movimentacoes': movimentacoes,
+            'proximo': movimentacoes[-1].id_movimentacao if movimentacoes and tem_proxima else None,
+            'anterior': movimentacoes[0].id_movimentacao if movimentacoes and tem_anterior else None,
+        }
+
+    @staticmethod
+    def _saldo_acumulado():
+        """Saldo do insumo (em estoque_base) logo após cada movimentação da consulta externa.
+
+        Parte do último checkpoint (SaldoInsumo) até a data da movimentação e soma o efeito
+        das movimentações desde ele, como saldos_no_corte, pelo índice (insumo, data_movimentacao).
+        """
+        Checkpoint = SaldoInsumo.alias()
+        Anterior = MovimentacaoInsumo.alias()
+
+        def checkpoint(campo):
+            return (Checkpoint
+                    .select(campo)
+                    .where((Checkpoint.insumo == MovimentacaoInsumo.insumo) &
+                           (Checkpoint.data_corte <= MovimentacaoInsumo.data_movimentacao))
+                    .order_by(Checkpoint.data_corte.desc())
+                    .limit(1))
+
+        desde_checkpoint = (Anterior
+                            .select(fn.SUM(Anterior.estoque_posterior_base - Anterior.estoque_anterior_base))
+                            .where((Anterior.insumo == MovimentacaoInsumo.insumo) &
+                                   (Anterior.data_movimentacao >= fn.COALESCE(checkpoint(Checkpoint.data_corte), '')) &
+                                   (Tuple(Anterior.data_movimentacao, Anterior.id_movimentacao) <=
+                                    Tuple(MovimentacaoInsumo.data_movimentacao,
+                                          MovimentacaoInsumo.id_movimentacao))))
+        return fn.COALESCE(checkpoint(Checkpoint.saldo_base), 0) + fn.COALESCE(desde_checkpoint, 0)
+
+    @staticmethod
+    def _validar(tipo: str, quantidade: Decimal, data_movimentacao: date, observacoes: str = None) -> None:
+        if quantidade <= 0:
+            raise BusinessError("Quantidade deve ser maior que zero")
         
-        return list(query.order_by(MovimentacaoInsumo.data_movimentacao.desc()))
-    
+        if data_movimentacao > date.today():
+            raise BusinessError("Data da movimentação não pode ser futura")
+        
+        if not (tipo.startswith('Entrada') or tipo.startswith('Saída') or tipo == TipoMovimentacao.AJUSTE.value):
+            raise BusinessError("Tipo de movimentação inválido")
+        
+        # Validações específicas
+        if tipo == 'Saída - Perda' and not observacoes:
+            raise BusinessError("Observação é obrigatória para perdas")
+
+    @staticmethod
+    def _converter(tabela: Dict[str, int], unidade_estoque: str, quantidade: Decimal, unidade: str = None):
+        """Retorna (quantidade_base, unidade lançada)."""
+        unidade = unidade or unidade_estoque
+        quantidade_base = para_base(quantidade, ConversaoUnidadeController.fator(tabela, unidade, unidade_estoque))
+        if quantidade_base <= 0:
+            raise BusinessError(f"Quantidade muito pequena para registrar em {unidade}")
+        return quantidade_base, unidade
+
+    @staticmethod
+    def _ler_estoque(insumo_id: int):
+        return (InsumoNovo.select(InsumoNovo.estoque_base, InsumoNovo.versao, InsumoNovo.ativo)
+                .where(InsumoNovo.id_insumo == insumo_id)
+                .first())
+
+    @staticmethod
+    def _aplicar_no_estoque(insumo_id: int, tipo: str, quantidade_base: int, fator: int):
+        """Aplica a movimentação ao estoque e retorna (estoque_anterior, estoque_posterior) em estoque_base.
+
+        A conta é feita em estoque_base, na mesma escala inteira de quantidade_base das
+        movimentações; quantidade_atual só recebe o resultado convertido (fator da unidade
+        de estoque), nunca é somada. Deve ser chamado dentro da transação IMMEDIATE que
+        grava a movimentação: com a escrita já reservada, o saldo lido não muda até o
+        commit. O UPDATE ainda confere a versao da leitura (controle otimista).
+        """
+        lido = MovimentacaoInsumoController._ler_estoque(insumo_id)
+        if lido is None:
+            raise BusinessError("Insumo não encontrado")
+        if not lido.ativo:
+            raise BusinessError("Não é possível movimentar insumo inativo")
+
+        anterior = lido.estoque_base
+        if tipo == TipoMovimentacao.AJUSTE.value:
+            posterior = quantidade_base
+        elif tipo.startswith('Entrada'):
+            posterior = anterior + quantidade_base
+        elif anterior < quantidade_base:
+            raise BusinessError("Estoque insuficiente")
+        else:
+            posterior = anterior - quantidade_base
+
+        alteradas = (InsumoNovo
+                     .update(estoque_base=posterior, quantidade_atual=da_base(posterior, fator),
+                             versao=InsumoNovo.versao + 1)
+                     .where((InsumoNovo.id_insumo == insumo_id) & (InsumoNovo.versao == lido.versao))
+                     .execute())
+        if not alteradas:
+            raise BusinessError("Estoque alterado por outra movimentação; tente novamente")
+        return anterior, posterior
+
     @staticmethod
     def criar_movimentacao(insumo_id: int, tipo: str, quantidade: Decimal,
                           data_movimentacao: date, observacoes: str = None,
-                          usuario_id: int = None) -> MovimentacaoInsumo:
-        """Cria nova movimentação e atualiza estoque"""
+                          usuario_id: int = None, unidade: str = None) -> MovimentacaoInsumo:
+        """Cria nova movimentação e atualiza estoque na mesma transação.
+
+        `unidade` é a unidade em que a quantidade foi informada (padrão: a do insumo).
+        """
         try:
-            insumo = InsumoController.buscar_por_id(insumo_id)
-            if not insumo:
-                raise BusinessError("Insumo não encontrado")
-            
-            if not insumo.ativo:
-                raise BusinessError("Não é possível movimentar insumo inativo")
-            
-            # Validações
-            if quantidade <= 0:
-                raise BusinessError("Quantidade deve ser maior que zero")
-            
-            if data_movimentacao > date.today():
-                raise BusinessError("Data da movimentação não pode ser futura")
-            
-            estoque_anterior = insumo.quantidade_atual
-            
-            # Calcular novo estoque
-            if tipo.startswith('Entrada'):
-                novo_estoque = estoque_anterior + quantidade
-            elif tipo.startswith('Saída'):
-                if estoque_anterior < quantidade:
-                    raise BusinessError("Estoque insuficiente")
-                novo_estoque = estoque_anterior - quantidade
-            elif tipo == 'Entrada - Ajuste':
-                # Para ajuste, a quantidade pode ser positiva ou negativa
-                novo_estoque = quantidade
-            else:
-                raise BusinessError("Tipo de movimentação inválido")
-            
-            # Validações específicas
-            if tipo == 'Saída - Perda' and not observacoes:
-                raise BusinessError("Observação é obrigatória para perdas")
-            
-            # Criar movimentação
-            movimentacao = MovimentacaoInsumo.create(
-                insumo=insumo,
-                tipo=tipo,
-                quantidade=quantidade,
-                data_movimentacao=data_movimentacao,
-                observacoes=observacoes,
-                usuarios=usuario_id,
-                estoque_anterior=estoque_anterior,
-                estoque_posterior=novo_estoque
-            )
-            
-            # Atualizar estoque do insumo
-            insumo.quantidade_atual = novo_estoque
-            insumo.save()
+            MovimentacaoInsumoController._validar(tipo, quantidade, data_movimentacao, observacoes)
+            quantidade = Decimal(str(quantidade))
             
+            # IMMEDIATE reserva a escrita já no BEGIN: transações concorrentes esperam
+            # pelo busy_timeout em vez de falhar ao promover uma leitura para escrita
+            with db.atomic('IMMEDIATE'):
+                unidade_estoque = InsumoNovo.select(InsumoNovo.unidade).where(InsumoNovo.id_insumo == insumo_id).scalar()
+                if unidade_estoque is None:
+                    raise BusinessError("Insumo não encontrado")
+                tabela = ConversaoUnidadeController.fatores({insumo_id: unidade_estoque})[insumo_id]
+                quantidade_base, unidade = MovimentacaoInsumoController._converter(
+                    tabela, unidade_estoque, quantidade, unidade)
+
+                fator = tabela[unidade_estoque]
+                estoque_anterior, novo_estoque = MovimentacaoInsumoController._aplicar_no_estoque(
+                    insumo_id, tipo, quantidade_base, fator)
+                SaldoInsumoController.ajustar_checkpoints(
+                    [(insumo_id, data_movimentacao, novo_estoque - estoque_anterior)])
+                
+                movimentacao = MovimentacaoInsumo.create(
+                    insumo=insumo_id,
+                    tipo=tipo,
+                    quantidade=quantidade,
+                    quantidade_base=quantidade_base,
+                    unidade=unidade,
+                    data_movimentacao=data_movimentacao,
+                    observacoes=observacoes,
+                    usuarios=usuario_id,
+                    estoque_anterior=da_base(estoque_anterior, fator),
+                    estoque_posterior=da_base(novo_estoque, fator),
+                    estoque_anterior_base=estoque_anterior,
+                    estoque_posterior_base=novo_estoque
+                )
+
+            # Fora da transação: o lock de escrita não fica preso enquanto as regras são avaliadas
+            AlertaController.avaliar_insumos([insumo_id])
             return movimentacao
             
         except Exception as e:
             if isinstance(e, BusinessError):
                 raise e
-            raise BusinessError(f"Erro ao criar movimentação: {str(e)}")
\ No newline at end of file
+            raise BusinessError(f"Erro ao criar movimentação: {str(e)}")
+
+    @staticmethod
+    def criar_movimentacoes(itens: List[Dict[str, Any]], data_movimentacao: date,
+                            usuario_id: int = None) -> Dict[str, Any]:
+        """Registra várias movimentações em uma única transação: ou todas são gravadas, ou nenhuma.
+
+        Cada item tem insumo_id, tipo, quantidade e, opcionalmente, unidade e observacoes.
+        Itens do mesmo insumo são aplicados na ordem recebida.
+        Retorna {'registradas': n, 'erros': [{'item': i, 'erro': msg}]} (itens a partir de 1);
+        havendo qualquer erro, nada é gravado.
+        """
+        resultado = {'registradas': 0, 'erros': []}
+        erros = resultado['erros']
+        if not itens:
+            erros.append({'item': None, 'erro': "Nenhuma movimentação informada"})
+            return resultado
+
+        validos = []
+        for numero, item in enumerate(itens, start=1):
+            try:
+                insumo_id = int(item.get('insumo_id'))
+                quantidade = Decimal(str(item.get('quantidade')))
+                tipo = str(item.get('tipo') or '')
+                observacoes = item.get('observacoes') or None
+                unidade = item.get('unidade') or None
+                MovimentacaoInsumoController._validar(tipo, quantidade, data_movimentacao, observacoes)
+                validos.append((numero, insumo_id, tipo, quantidade, unidade, observacoes))
+            except (TypeError, ValueError, InvalidOperation):
+                erros.append({'item': numero, 'erro': "insumo_id e quantidade devem ser numéricos"})
+            except BusinessError as e:
+                erros.append({'item': numero, 'erro': e.message})
+        if erros:
+            return resultado
+
+        try:
+            with db.atomic('IMMEDIATE'):
+                ids = {insumo_id for _, insumo_id, _, _, _, _ in validos}
+                insumos = {i.id_insumo: i for i in
+                           InsumoNovo.select(InsumoNovo.id_insumo, InsumoNovo.nome, InsumoNovo.unidade,
+                                             InsumoNovo.estoque_base, InsumoNovo.versao, InsumoNovo.ativo)
+                           .where(InsumoNovo.id_insumo.in_(list(ids)))}
+
+                saldos = {i.id_insumo: i.estoque_base for i in insumos.values()}
+                tabelas = ConversaoUnidadeController.fatores({i.id_insumo: i.unidade for i in insumos.values()})
+                linhas = []
+                for numero, insumo_id, tipo, quantidade, unidade, observacoes in validos:
+                    insumo = insumos.get(insumo_id)
+                    if insumo is None:
+                        erros.append({'item': numero, 'erro': "Insumo não encontrado"})
+                        continue
+                    if not insumo.ativo:
+                        erros.append({'item': numero, 'erro': f"Não é possível movimentar insumo inativo: {insumo.nome}"})
+                        continue
+                    try:
+                        quantidade_base, unidade = MovimentacaoInsumoController._converter(
+                            tabelas[insumo_id], insumo.unidade, quantidade, unidade)
+                    except BusinessError as e:
+                        erros.append({'item': numero, 'erro': f"{insumo.nome}: {e.message}"})
+                        continue
+
+                    fator = tabelas[insumo_id][insumo.unidade]
+                    anterior = saldos[insumo_id]
+                    if tipo == TipoMovimentacao.AJUSTE.value:
+                        posterior = quantidade_base
+                    elif tipo.startswith('Entrada'):
+                        posterior = anterior + quantidade_base
+                    elif anterior < quantidade_base:
+                        erros.append({'item': numero, 'erro': f"Estoque insuficiente de {insumo.nome}: "
+                                                              f"{da_base(anterior, fator)} {insumo.unidade} disponível(is)"})
+                        continue
+                    else:
+                        posterior = anterior - quantidade_base
+
+                    saldos[insumo_id] = posterior
+                    linhas.append({
+                        'insumo': insumo_id,
+                        'tipo': tipo,
+                        'quantidade': quantidade,
+                        'quantidade_base': quantidade_base,
+                        'unidade': unidade,
+                        'data_movimentacao': data_movimentacao,
+                        'observacoes': observacoes,
+                        'usuarios': usuario_id,
+                        'estoque_anterior': da_base(anterior, fator),
+                        'estoque_posterior': da_base(posterior, fator),
+                        'estoque_anterior_base': anterior,
+                        'estoque_posterior_base': posterior,
+                    })
+
+                if erros:
+                    return resultado
+
+                for bloco in chunked(linhas, 100):
+                    MovimentacaoInsumo.insert_many(bloco).execute()
+
+                # Um único UPDATE grava o saldo final de cada insumo; a versão lida garante
+                # que nenhum deles mudou desde o SELECT acima
+                alterados = [insumos[i] for i in ids if i in insumos]
+                atualizados = (InsumoNovo
+                               .update(estoque_base=Case(InsumoNovo.id_insumo,
+                                                         [(i.id_insumo, saldos[i.id_insumo]) for i in alterados]),
+                                       quantidade_atual=Case(InsumoNovo.id_insumo,
+                                                             [(i.id_insumo, da_base(saldos[i.id_insumo],
+                                                                                    tabelas[i.id_insumo][i.unidade]))
+                                                              for i in alterados]),
+                                       versao=InsumoNovo.versao + 1)
+                               .where(InsumoNovo.id_insumo.in_([i.id_insumo for i in alterados]) &
+                                      (InsumoNovo.versao == Case(InsumoNovo.id_insumo,
+                                                                 [(i.id_insumo, i.versao) for i in alterados])))
+                               .execute())
+                if atualizados != len(alterados):
+                    raise BusinessError("Estoque alterado por outra movimentação; tente novamente")
+
+                SaldoInsumoController.ajustar_checkpoints(
+                    [(l['insumo'], l['data_movimentacao'], l['estoque_posterior_base'] - l['estoque_anterior_base'])
+                     for l in linhas])
+
+            resultado['registradas'] = len(linhas)
+            AlertaController.avaliar_insumos({l['insumo'] for l in linhas})
+            return resultado
+
+        except Exception as e:
+            if isinstance(e, BusinessError):
+                raise e
+            raise BusinessError(f"Erro ao registrar movimentações: {str(e)}")
+
+class SaldoInsumoController:
+    """Estoque em uma data passada: checkpoint mensal mais próximo + movimentações desde ele.
+
+    O efeito de cada movimentação é estoque_posterior_base - estoque_anterior_base, o que
+    vale também para ajustes (valor exato). As contas e os checkpoints (SaldoInsumo) ficam
+    na escala inteira de estoque_base e só o resultado vai para a unidade do insumo: mudar
+    o peso da unidade de estoque não desalinha o histórico. Os checkpoints são criados por
+    gerar_checkpoints (`flask fechar-estoque`) e corrigidos quando alguém lança uma
+    movimentação com data anterior a eles.
+    """
+
+    @staticmethod
+    def saldos_no_corte(corte: date) -> Dict[int, int]:
+        """Saldo de cada insumo, em estoque_base, no início do dia `corte` (movimentações com data anterior aplicadas).
+
+        Insumos sem nenhuma movimentação antes do corte não aparecem (saldo zero).
+        """
+        def efeito(*condicoes):
+            return (MovimentacaoInsumo
+                    .select(fn.SUM(MovimentacaoInsumo.estoque_posterior_base -
+                                   MovimentacaoInsumo.estoque_anterior_base))
+                    .where((MovimentacaoInsumo.data_movimentacao < corte), *condicoes))
+
+        # Último checkpoint de cada insumo até o corte, mais as movimentações entre ele e o corte.
+        # As subconsultas correlacionadas partem do checkpoint e usam o índice (insumo, data_movimentacao).
+        Anterior = SaldoInsumo.alias()
+        ultimo = (Anterior
+                  .select(fn.MAX(Anterior.data_corte))
+                  .where((Anterior.insumo == SaldoInsumo.insumo) & (Anterior.data_corte <= corte)))
+        desde_checkpoint = efeito(MovimentacaoInsumo.insumo == SaldoInsumo.insumo,
+                                  MovimentacaoInsumo.data_movimentacao >= SaldoInsumo.data_corte)
+        checkpoints = (SaldoInsumo
+                       .select(SaldoInsumo.insumo, SaldoInsumo.saldo_base, desde_checkpoint.alias('efeito'))
+                       .where(SaldoInsumo.data_corte == ultimo)
+                       .dicts())
+        saldos = {c['insumo']: c['saldo_base'] + (c['efeito'] or 0) for c in checkpoints}
+
+        # Insumos sem checkpoint até o corte: todo o histórico (em geral curto, são insumos novos)
+        sem_checkpoint = (MovimentacaoInsumo
+                          .select(MovimentacaoInsumo.insumo,
+                                  fn.SUM(MovimentacaoInsumo.estoque_posterior_base -
+                                         MovimentacaoInsumo.estoque_anterior_base).alias('efeito'))
+                          .where(MovimentacaoInsumo.insumo.not_in(list(saldos)) &
+                                 (MovimentacaoInsumo.data_movimentacao < corte))
+                          .group_by(MovimentacaoInsumo.insumo)
+                          .dicts())
+        for linha in sem_checkpoint:
+            saldos[linha['insumo']] = linha['efeito'] or 0
+
+        return saldos
+
+    @staticmethod
+    def inventario_em(dia: date, categoria: str = None, ativo: bool = None) -> List[Dict[str, Any]]:
+        """Estoque de cada insumo ao final do dia informado."""
+        saldos = SaldoInsumoController.saldos_no_corte(dia + timedelta(days=1))
+
+        query = InsumoNovo.select(InsumoNovo.id_insumo, InsumoNovo.nome, InsumoNovo.categoria, InsumoNovo.unidade)
+        if categoria:
+            query = query.where(InsumoNovo.categoria == categoria)
+        if ativo is not None:
+            query = query.where(InsumoNovo.ativo == ativo)
+
+        insumos = list(query.order_by(InsumoNovo.nome))
+        fatores = ConversaoUnidadeController.fatores_estoque({i.id_insumo: i.unidade for i in insumos})
+        return [{
+            'id_insumo': insumo.id_insumo,
+            'nome': insumo.nome,
+            'categoria': insumo.categoria,
+            'unidade': insumo.unidade,
+            'saldo': da_base(saldos.get(insumo.id_insumo, 0), fatores[insumo.id_insumo]),
+        } for insumo in insumos]
+
+    @staticmethod
+    def gerar_checkpoints(ate: date = None) -> int:
+        """Cria os checkpoints do dia 1º de cada mês que ainda faltam, até o mês de `ate` (padrão: hoje).
+
+        Retorna quantos checkpoints foram criados.
+        """
+        limite = (ate or date.today()).replace(day=1)
+        primeira = MovimentacaoInsumo.select(fn.MIN(MovimentacaoInsumo.data_movimentacao)).scalar()
+        if primeira is None:
+            return 0
+
+        criados = 0
+        corte = _primeiro_dia_mes_seguinte(como_data(primeira))
+        while corte <= limite:
+            with db.atomic():
+                existentes = {s.insumo_id for s in
+                              SaldoInsumo.select(SaldoInsumo.insumo).where(SaldoInsumo.data_corte == corte)}
+                linhas = [{'insumo': insumo_id, 'data_corte': corte, 'saldo_base': saldo}
+                          for insumo_id, saldo in SaldoInsumoController.saldos_no_corte(corte).items()
+                          if insumo_id not in existentes]
+                for bloco in chunked(linhas, 200):
+                    SaldoInsumo.insert_many(bloco).execute()
+            criados += len(linhas)
+            corte = _primeiro_dia_mes_seguinte(corte)
+        return criados
+
+    @staticmethod
+    def ajustar_checkpoints(movimentos: List[tuple]) -> None:
+        """Soma o efeito de movimentações retroativas aos checkpoints posteriores à data delas.
+
+        movimentos: [(insumo_id, data_movimentacao, efeito em estoque_base)]. Deve rodar na transação da movimentação.
+        """
+        ultimo = SaldoInsumo.select(fn.MAX(SaldoInsumo.data_corte)).scalar()
+        if ultimo is None:
+            return
+        ultimo = como_data(ultimo)
+
+        for insumo_id, data_movimentacao, efeito in movimentos:
+            dia = como_data(data_movimentacao)
+            if efeito and dia < ultimo:
+                (SaldoInsumo
+                 .update(saldo_base=SaldoInsumo.saldo_base + efeito)
+                 .where((SaldoInsumo.insumo == insumo_id) & (SaldoInsumo.data_corte > dia))
+                 .execute())
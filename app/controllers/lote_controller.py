@@ -0,0 +1,63 @@
+from typing import Any, Dict, Iterable, Optional
+from app.models.database import Lote
+from app.exceptions import BusinessError
+
+class LoteController:
+
+    @staticmethod
+    def buscar_por_referencia(referencia) -> Optional[Lote]:
+        """Localiza um lote pelo número (ex.: LOTE001) ou, se a referência for numérica, pelo id.
+
+        Inteiros são sempre tratados como id.
+        """
+        if isinstance(referencia, Lote):
+            return referencia
+        if isinstance(referencia, int):
+            return Lote.get_or_none(Lote.id_lote == referencia)
+        texto = str(referencia or '').strip()
+        if not texto:
+            return None
+
+        lote = Lote.select().where(Lote.numero_lote == texto).order_by(Lote.id_lote).first()
+        if lote is None and texto.isdigit():
+            lote = Lote.get_or_none(Lote.id_lote == int(texto))
+        return lote
+
+    @staticmethod
+    def resolver(referencia) -> Lote:
+        lote = LoteController.buscar_por_referencia(referencia)
+        if lote is None:
+            raise BusinessError(f"Lote não encontrado: {referencia}")
+        return lote
+
+    @staticmethod
+    def mapa_referencias(referencias: Iterable) -> Dict[Any, int]:
+        """Resolve várias referências de uma vez (mesmas regras de buscar_por_referencia).
+
+        Inteiros são sempre ids; textos são procurados pelo número do lote e, se não
+        houver e forem numéricos, pelo id. Retorna {referência: id_lote} apenas para as
+        que existem, com inteiros como chave int e textos sem espaços nas pontas; usa
+        no máximo duas consultas.
+        """
+        ids, textos = set(), set()
+        for referencia in referencias:
+            if isinstance(referencia, int) and not isinstance(referencia, bool):
+                ids.add(referencia)
+            elif referencia is not None and str(referencia).strip():
+                textos.add(str(referencia).strip())
+        mapa = {}
+
+        if textos:
+            for lote in (Lote.select(Lote.id_lote, Lote.numero_lote)
+                         .where(Lote.numero_lote.in_(list(textos)))
+                         .order_by(Lote.id_lote.desc())):
+                mapa[lote.numero_lote] = lote.id_lote       # em números repetidos fica o menor id
+
+        numericos = {int(t): t for t in textos - set(mapa) if t.isdigit()}
+        if ids or numericos:
+            for lote in Lote.select(Lote.id_lote).where(Lote.id_lote.in_(list(ids | set(numericos)))):
+                if lote.id_lote in ids:
+                    mapa[lote.id_lote] = lote.id_lote
+                if lote.id_lote in numericos:
+                    mapa[numericos[lote.id_lote]] = lote.id_lote
+        return mapa
@@ -1,6 +1,7 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, Response
 from app.forms.mortalidade_forms import MortalidadeForm
 from app.models.database import RelatoriosMortalidade, Aves, Lote, Setor, Usuarios
+from app.controllers.alerta_controller import AlertaController
 import datetime
 
 mortalidade_bp = Blueprint('mortalidade', __name__)
@@ -21,6 +22,7 @@ def registrar_mortalidade():
 			funcionario=form.funcionario.data,
 			data_registro=datetime.datetime.now()
 		)
+		AlertaController.avaliar_mortalidade(evento.lote_id, evento.data_hora_evento)
 		flash('Evento de mortalidade registrado com sucesso!', 'success')
 		return redirect(url_for('mortalidade.registrar_mortalidade'))
 	return render_template('mortalidade/registrar.html', form=form)
@@ -1,92 +1,102 @@
 from flask import request, jsonify, g
+from peewee import JOIN, fn, Case
 from app.models import Avisos, NotificacaoUsuario, HistoricoAvisos, Usuarios, db
-from app.models import CategoriaNotificacao, PrioridadeNotificacao, StatusNotificacao
+from app.models import CategoriaAviso, PrioridadeAviso, SituacaoNotificacao
 from app.utils import log_user_activity
 from datetime import datetime
-from sqlalchemy import or_
+
+Criador = Usuarios.alias()
+
+def _com_criador(query):
+    """Junta o autor do aviso (id e nome) ao SELECT, disponível em `aviso.criador`."""
+    return query.join(Criador, JOIN.LEFT_OUTER, on=(Avisos.criado_por == Criador.id_usuario), attr='criador')
+
+def _aviso_dict(aviso):
+    return {
+        'id_aviso': aviso.id_aviso,
+        'titulo': aviso.titulo,
+        'conteudo': aviso.mensagem,
+        'categoria': aviso.tipo,
+        'prioridade': aviso.prioridade,
+        'data_criacao': aviso.data_criacao.isoformat(),
+        'criado_por': aviso.criador.nome if aviso.criador else 'Sistema'
+    }
 
 def create_notification():
     try:
         current_user = g.get('current_user')
         data = request.get_json()
-        
+
         required_fields = ['titulo', 'conteudo', 'categoria', 'destinatarios']
         for field in required_fields:
             if field not in data:
                 return jsonify({'error': f'Required field: {field}'}), 400
-        
-        if isinstance(data['categoria'], str):
-            try:
-                categoria = CategoriaNotificacao(data['categoria'])
-            except ValueError:
-                return jsonify({'error': f'Invalid category: {data["categoria"]}'}), 400
-        else:
-            categoria = data['categoria']
-        
-        prioridade = PrioridadeNotificacao.NORMAL
+
+        try:
+            categoria = CategoriaAviso(data['categoria'])
+        except ValueError:
+            return jsonify({'error': f'Invalid category: {data["categoria"]}'}), 400
+
+        prioridade = PrioridadeAviso.NORMAL
         if 'prioridade' in data:
             try:
-                prioridade = PrioridadeNotificacao(data['prioridade'])
+                prioridade = PrioridadeAviso(data['prioridade'])
             except ValueError:
                 return jsonify({'error': f'Invalid priority: {data["prioridade"]}'}), 400
-        
+
         data_validade = None
         if 'data_validade' in data and data['data_validade']:
             data_validade = datetime.strptime(data['data_validade'], '%Y-%m-%d %H:%M:%S')
-        
-        novo_aviso = Avisos(**{
-            'titulo': data['titulo'],
-            'conteudo': data['conteudo'],
-            'categoria': categoria,
-            'prioridade': prioridade,
-            'data_validade': data_validade,
-            'criado_por': current_user.id_usuario
-        })
-        
-        db.session.add(novo_aviso)
-        db.session.flush()
-        
-        destinatarios_criados = []
-        for user_id in data['destinatarios']:
-            user = Usuarios.query.get(user_id)
-            if user and user.is_ativo:
-                notificacao = NotificacaoUsuario(**{
-                    'id_aviso': novo_aviso.id_aviso,
-                    'id_usuario': user_id
-                })
-                db.session.add(notificacao)
-                destinatarios_criados.append(user.nome)
-        
-        historico = HistoricoAvisos(**{
-            'id_aviso': novo_aviso.id_aviso,
-            'acao': 'CRIADO',
-            'detalhes': f'Aviso criado com título: {data["titulo"]}. Destinatários: {", ".join(destinatarios_criados)}',
-            'usuario_acao': current_user.id_usuario
-        })
-        db.session.add(historico)
-        
-        db.session.commit()
-        
+
+        # Destinatários válidos em uma única consulta
+        destinatarios = list(Usuarios
+                             .select(Usuarios.id_usuario, Usuarios.nome)
+                             .where((Usuarios.id_usuario.in_(data['destinatarios'])) & (Usuarios.ativo == True)))
+        destinatarios_criados = [user.nome for user in destinatarios]
+
+        agora = datetime.now()
+        with db.atomic():
+            novo_aviso = Avisos.create(
+                titulo=data['titulo'],
+                mensagem=data['conteudo'],
+                tipo=categoria.value,
+                prioridade=prioridade.value,
+                data_validade=data_validade,
+                criado_por=current_user.id_usuario
+            )
+
+            if destinatarios:
+                NotificacaoUsuario.insert_many(
+                    [{'aviso': novo_aviso.id_aviso, 'usuario': user.id_usuario, 'data_criacao': agora}
+                     for user in destinatarios]
+                ).execute()
+
+            HistoricoAvisos.create(
+                aviso=novo_aviso,
+                acao='CRIADO',
+                detalhes=f'Aviso criado com título: {data["titulo"]}. Destinatários: {", ".join(destinatarios_criados)}',
+                usuario_modificador=current_user.id_usuario
+            )
+
         log_user_activity(
             current_user.id_usuario,
             'AVISO_CRIADO',
             f'Aviso criado: {data["titulo"]} para {len(destinatarios_criados)} usuários'
         )
-        
+
         return jsonify({
             'message': 'Notification created successfully!',
             'id_aviso': novo_aviso.id_aviso,
             'destinatarios_notificados': len(destinatarios_criados)
         }), 201
-        
+
     except Exception as e:
-        db.session.rollback()
         return jsonify({'error': f'Internal error: {str(e)}'}), 500
 
 def get_notifications():
     try:
         current_user = g.get('current_user')
-        
+
         id_aviso = request.args.get('id_aviso')
         categoria = request.args.get('categoria')
         prioridade = request.args.get('prioridade')
@@ -94,283 +104,257 @@ def get_notifications():
         criado_por = request.args.get('criado_por')
         conteudo = request.args.get('conteudo')
         apenas_ativos = request.args.get('apenas_ativos', 'true').lower() == 'true'
-        
-        query = Avisos.query
-        
+
+        # Nome do autor e total de notificações vêm no mesmo SELECT (sem consultas por aviso)
+        total_notificacoes = (NotificacaoUsuario
+                              .select(fn.COUNT(NotificacaoUsuario.id_notificacao))
+                              .where(NotificacaoUsuario.aviso == Avisos.id_aviso))
+        query = _com_criador(Avisos.select(Avisos, Criador.id_usuario, Criador.nome, total_notificacoes.alias('total_notificacoes')))
+
         if apenas_ativos:
-            query = query.filter(Avisos.is_ativo == True)
-        
+            query = query.where(Avisos.ativo == True)
+
         if id_aviso:
-            query = query.filter(Avisos.id_aviso == id_aviso)
+            query = query.where(Avisos.id_aviso == id_aviso)
         if categoria:
-            query = query.filter(Avisos.categoria == categoria)
+            query = query.where(Avisos.tipo == categoria)
         if prioridade:
-            query = query.filter(Avisos.prioridade == prioridade)
+            query = query.where(Avisos.prioridade == prioridade)
         if data_criacao:
             data_filter = datetime.strptime(data_criacao, '%Y-%m-%d').date()
-            query = query.filter(db.func.date(Avisos.data_criacao) == data_filter)
+            query = query.where(fn.DATE(Avisos.data_criacao) == data_filter)
         if criado_por:
-            query = query.filter(Avisos.criado_por == criado_por)
+            query = query.where(Avisos.criado_por == criado_por)
         if conteudo:
-            query = query.filter(or_(
-                Avisos.titulo.ilike(f'%{conteudo}%'),
-                Avisos.conteudo.ilike(f'%{conteudo}%')
-            ))
-        
-        avisos = query.order_by(Avisos.data_criacao.desc()).all()
-        
+            query = query.where(
+                Avisos.titulo.contains(conteudo) | Avisos.mensagem.contains(conteudo)
+            )
+
+        avisos = query.order_by(Avisos.data_criacao.desc())
+
         log_user_activity(
             current_user.id_usuario,
             'AVISOS_CONSULTADOS',
             f'Consulta de avisos realizada com filtros aplicados'
         )
-        
+
         return jsonify([{
-            'id_aviso': aviso.id_aviso,
-            'titulo': aviso.titulo,
-            'conteudo': aviso.conteudo,
-            'categoria': aviso.categoria.value,
-            'prioridade': aviso.prioridade.value,
-            'data_criacao': aviso.data_criacao.isoformat(),
+            **_aviso_dict(aviso),
             'data_validade': aviso.data_validade.isoformat() if aviso.data_validade else None,
-            'criado_por': aviso.criador.nome if aviso.criador else 'Sistema',
-            'is_ativo': aviso.is_ativo,
-            'total_notificacoes': len(aviso.notificacoes)
+            'is_ativo': aviso.ativo,
+            'total_notificacoes': aviso.total_notificacoes
         } for aviso in avisos]), 200
-        
+
     except Exception as e:
         return jsonify({'error': f'Internal error: {str(e)}'}), 500
 
 def delete_notifications(aviso_id: str):
     try:
         current_user = g.get('current_user')
-        aviso = Avisos.query.get(aviso_id)
-        
+        aviso = Avisos.get_or_none(Avisos.id_aviso == aviso_id)
+
         if not aviso:
             return jsonify({'error': 'Notification not found.'}), 404
-        
-        if not aviso.is_ativo:
+
+        if not aviso.ativo:
             return jsonify({'error': 'Notification already deleted.'}), 400
-        
-        if aviso.criado_por != current_user.id_usuario and current_user.tipo_usuario.value != 'ADMIN':
+
+        if aviso.criado_por_id != current_user.id_usuario and current_user.tipo_usuario.upper() != 'ADMIN':
             return jsonify({'error': 'Only the creator or ADMIN can delete this notification'}), 403
-        
-        aviso.is_ativo = False
-        aviso.data_exclusao = datetime.utcnow()
-        aviso.excluido_por = current_user.id_usuario
-        
-        for notificacao in aviso.notificacoes:
-            if notificacao.status == StatusNotificacao.ATIVO:
-                notificacao.status = StatusNotificacao.EXCLUIDA
-        
-        historico = HistoricoAvisos(**{
-            'id_aviso': aviso_id,
-            'acao': 'EXCLUIDO',
-            'detalhes': f'Aviso excluído: {aviso.titulo}',
-            'usuario_acao': current_user.id_usuario
-        })
-        db.session.add(historico)
-        
-        db.session.commit()
-        
+
+        with db.atomic():
+            aviso.ativo = False
+            aviso.data_exclusao = datetime.now()
+            aviso.excluido_por = current_user.id_usuario
+            aviso.save()
+
+            (NotificacaoUsuario
+             .update(status=SituacaoNotificacao.EXCLUIDA.value)
+             .where((NotificacaoUsuario.aviso == aviso.id_aviso) &
+                    (NotificacaoUsuario.status == SituacaoNotificacao.ATIVO.value))
+             .execute())
+
+            HistoricoAvisos.create(
+                aviso=aviso,
+                acao='EXCLUIDO',
+                detalhes=f'Aviso excluído: {aviso.titulo}',
+                usuario_modificador=current_user.id_usuario
+            )
+
         log_user_activity(
             current_user.id_usuario,
             'AVISO_EXCLUIDO',
             f'Aviso excluído: {aviso.titulo}'
         )
-        
+
         return jsonify({'message': 'Notification deleted successfully.'}), 200
-        
+
     except Exception as e:
-        db.session.rollback()
         return jsonify({'error': f'Internal error: {str(e)}'}), 500
 
+def _notificacoes_do_usuario(usuario_id):
+    """Notificações do usuário com aviso e autor carregados no mesmo SELECT."""
+    query = NotificacaoUsuario.select(NotificacaoUsuario, Avisos, Criador.id_usuario, Criador.nome).join(Avisos)
+    return _com_criador(query).where((NotificacaoUsuario.usuario == usuario_id) & (Avisos.ativo == True))
+
 def get_user_notifications():
     try:
         current_user = g.get('current_user')
-        
+
         categoria = request.args.get('categoria')
         prioridade = request.args.get('prioridade')
         status = request.args.get('status')
         apenas_nao_lidas = request.args.get('apenas_nao_lidas', 'false').lower() == 'true'
-        
-        query = NotificacaoUsuario.query.filter_by(id_usuario=current_user.id_usuario)
-        
+
+        query = _notificacoes_do_usuario(current_user.id_usuario)
+
         if apenas_nao_lidas:
-            query = query.filter(NotificacaoUsuario.status == StatusNotificacao.ATIVO)
-        
+            query = query.where(NotificacaoUsuario.status == SituacaoNotificacao.ATIVO.value)
+
         if status:
-            query = query.filter(NotificacaoUsuario.status == status)
-        
-        if categoria or prioridade:
-            query = query.join(Avisos)
-            if categoria:
-                query = query.filter(Avisos.categoria == categoria)
-            if prioridade:
-                query = query.filter(Avisos.prioridade == prioridade)
-        
-        notificacoes = query.order_by(NotificacaoUsuario.data_criacao.desc()).all()
-        
-        result = []
-        for notif in notificacoes:
-            if notif.aviso and notif.aviso.is_ativo:
-                result.append({
-                    'id_notificacao': notif.id_notificacao,
-                    'aviso': {
-                        'id_aviso': notif.aviso.id_aviso,
-                        'titulo': notif.aviso.titulo,
-                        'conteudo': notif.aviso.conteudo,
-                        'categoria': notif.aviso.categoria.value,
-                        'prioridade': notif.aviso.prioridade.value,
-                        'data_criacao': notif.aviso.data_criacao.isoformat(),
-                        'criado_por': notif.aviso.criador.nome if notif.aviso.criador else 'Sistema'
-                    },
-                    'status': notif.status.value,
-                    'data_leitura': notif.data_leitura.isoformat() if notif.data_leitura else None,
-                    'data_criacao': notif.data_criacao.isoformat()
-                })
-        
+            query = query.where(NotificacaoUsuario.status == status)
+
+        if categoria:
+            query = query.where(Avisos.tipo == categoria)
+        if prioridade:
+            query = query.where(Avisos.prioridade == prioridade)
+
+        notificacoes = query.order_by(NotificacaoUsuario.data_criacao.desc())
+
+        result = [{
+            'id_notificacao': notif.id_notificacao,
+            'aviso': _aviso_dict(notif.aviso),
+            'status': notif.status,
+            'data_leitura': notif.data_leitura.isoformat() if notif.data_leitura else None,
+            'data_criacao': notif.data_criacao.isoformat()
+        } for notif in notificacoes]
+
         return jsonify(result), 200
-        
+
     except Exception as e:
         return jsonify({'error': f'Internal error: {str(e)}'}), 500
 
 def mark_notification_as_read(notification_id: str):
     try:
         current_user = g.get('current_user')
-        notificacao = NotificacaoUsuario.query.filter_by(
-            id_notificacao=notification_id,
-            id_usuario=current_user.id_usuario
-        ).first()
-        
+        notificacao = (NotificacaoUsuario
+                       .select(NotificacaoUsuario, Avisos)
+                       .join(Avisos)
+                       .where((NotificacaoUsuario.id_notificacao == notification_id) &
+                              (NotificacaoUsuario.usuario == current_user.id_usuario))
+                       .first())
+
         if not notificacao:
             return jsonify({'error': 'Notification not found'}), 404
-        
-        if notificacao.status == StatusNotificacao.LIDA:
+
+        if notificacao.status == SituacaoNotificacao.LIDA.value:
             return jsonify({'message': 'Notification already read.'}), 200
-        
-        notificacao.status = StatusNotificacao.LIDA
-        notificacao.data_leitura = datetime.utcnow()
-        
-        db.session.commit()
-        
+
+        notificacao.status = SituacaoNotificacao.LIDA.value
+        notificacao.data_leitura = datetime.now()
+        notificacao.save()
+
         log_user_activity(
             current_user.id_usuario,
             'NOTIFICACAO_LIDA',
-            f'Notificação marcada como lida: {notificacao.aviso.titulo if notificacao.aviso else "N/A"}'
+            f'Notificação marcada como lida: {notificacao.aviso.titulo}'
         )
-        
+
         return jsonify({'message': 'Notification marked as read.'}), 200
-        
+
     except Exception as e:
-        db.session.rollback()
         return jsonify({'error': f'Internal error: {str(e)}'}), 500
 
 def get_notifications_count():
     try:
         current_user = g.get('current_user')
-        
-        nao_lidas = NotificacaoUsuario.query.filter_by(
-            id_usuario=current_user.id_usuario,
-            status=StatusNotificacao.ATIVO
-        ).count()
-        
-        por_categoria = {}
-        for categoria in CategoriaNotificacao:
-            count = NotificacaoUsuario.query.join(Avisos).filter(
-                NotificacaoUsuario.id_usuario == current_user.id_usuario,
-                NotificacaoUsuario.status == StatusNotificacao.ATIVO,
-                Avisos.categoria == categoria,
-                Avisos.is_ativo == True
-            ).count()
-            por_categoria[categoria.value] = count
-        
-        por_prioridade = {}
-        for prioridade in PrioridadeNotificacao:
-            count = NotificacaoUsuario.query.join(Avisos).filter(
-                NotificacaoUsuario.id_usuario == current_user.id_usuario,
-                NotificacaoUsuario.status == StatusNotificacao.ATIVO,
-                Avisos.prioridade == prioridade,
-                Avisos.is_ativo == True
-            ).count()
-            por_prioridade[prioridade.value] = count
-        
+
+        # Uma consulta agrupada substitui uma contagem por categoria e por prioridade
+        linhas = (NotificacaoUsuario
+                  .select(Avisos.tipo, Avisos.prioridade, fn.COUNT(NotificacaoUsuario.id_notificacao).alias('total'))
+                  .join(Avisos)
+                  .where((NotificacaoUsuario.usuario == current_user.id_usuario) &
+                         (NotificacaoUsuario.status == SituacaoNotificacao.ATIVO.value) &
+                         (Avisos.ativo == True))
+                  .group_by(Avisos.tipo, Avisos.prioridade)
+                  .tuples())
+
+        por_categoria = {categoria.value: 0 for categoria in CategoriaAviso}
+        por_prioridade = {prioridade.value: 0 for prioridade in PrioridadeAviso}
+        nao_lidas = 0
+        for tipo, prioridade, total in linhas:
+            por_categoria[tipo] = por_categoria.get(tipo, 0) + total
+            por_prioridade[prioridade] = por_prioridade.get(prioridade, 0) + total
+            nao_lidas += total
+
         return jsonify({
             'total_nao_lidas': nao_lidas,
             'por_categoria': por_categoria,
             'por_prioridade': por_prioridade
         }), 200
-        
+
     except Exception as e:
         return jsonify({'error': f'Internal error: {str(e)}'}), 500
 
 def get_notification_history(aviso_id: str):
     try:
         current_user = g.get('current_user')
-        
-        aviso = Avisos.query.get(aviso_id)
+
+        aviso = Avisos.get_or_none(Avisos.id_aviso == aviso_id)
         if not aviso:
             return jsonify({'error': 'Notification not found'}), 404
-        
-        historico = HistoricoAvisos.query.filter_by(id_aviso=aviso_id).order_by(
-            HistoricoAvisos.data_acao.desc()
-        ).all()
-        
+
+        historico = (HistoricoAvisos
+                     .select(HistoricoAvisos, Usuarios.id_usuario, Usuarios.nome)
+                     .join(Usuarios, JOIN.LEFT_OUTER)
+                     .where(HistoricoAvisos.aviso == aviso.id_aviso)
+                     .order_by(HistoricoAvisos.data_acao.desc()))
+
         log_user_activity(
             current_user.id_usuario,
             'HISTORICO_AVISO_CONSULTADO',
             f'Histórico consultado para aviso: {aviso.titulo}'
         )
-        
+
         return jsonify([{
             'id_historico': hist.id_historico,
             'acao': hist.acao,
             'detalhes': hist.detalhes,
-            'usuario': hist.usuario.nome if hist.usuario else 'Sistema',
+            'usuario': hist.usuario_modificador.nome if hist.usuario_modificador_id else 'Sistema',
             'data_acao': hist.data_acao.isoformat()
         } for hist in historico]), 200
-        
+
     except Exception as e:
         return jsonify({'error': f'Internal error: {str(e)}'}), 500
 
 def get_notifications_grouped():
     try:
         current_user = g.get('current_user')
-        
-        query = NotificacaoUsuario.query.filter_by(
-            id_usuario=current_user.id_usuario,
-            status=StatusNotificacao.ATIVO
-        ).join(Avisos).filter(Avisos.is_ativo == True)
-        
-        notificacoes = query.order_by(Avisos.prioridade.desc(), Avisos.data_criacao.desc()).all()
-        
+
+        nivel_prioridade = Case(Avisos.prioridade, [(p.value, nivel) for nivel, p in enumerate(PrioridadeAviso)], 0)
+        notificacoes = (_notificacoes_do_usuario(current_user.id_usuario)
+                        .where(NotificacaoUsuario.status == SituacaoNotificacao.ATIVO.value)
+                        .order_by(nivel_prioridade.desc(), Avisos.data_criacao.desc()))
+
         agrupadas = {
             'CRITICA': [],
             'ALTA': [],
             'NORMAL': [],
             'BAIXA': []
         }
-        
+
         for notif in notificacoes:
-            if notif.aviso:
-                prioridade_key = notif.aviso.prioridade.value.upper()
-                if prioridade_key == 'CRÍTICA':
-                    prioridade_key = 'CRITICA'
-                
-                agrupadas[prioridade_key].append({
-                    'id_notificacao': notif.id_notificacao,
-                    'aviso': {
-                        'id_aviso': notif.aviso.id_aviso,
-                        'titulo': notif.aviso.titulo,
-                        'conteudo': notif.aviso.conteudo,
-                        'categoria': notif.aviso.categoria.value,
-                        'prioridade': notif.aviso.prioridade.value,
-                        'data_criacao': notif.aviso.data_criacao.isoformat()
-                    },
-                    'data_criacao': notif.data_criacao.isoformat()
-                })
-        
+            prioridade_key = PrioridadeAviso(notif.aviso.prioridade).name
+            aviso = _aviso_dict(notif.aviso)
+            del aviso['criado_por']
+
+            agrupadas[prioridade_key].append({
+                'id_notificacao': notif.id_notificacao,
+                'aviso': aviso,
+                'data_criacao': notif.data_criacao.isoformat()
+            })
+
         return jsonify(agrupadas), 200
-        
+
     except Exception as e:
-        return jsonify({'error': f'Internal error: {str(e)}'}), 500
\ No newline at end of file
+        return jsonify({'error': f'Internal error: {str(e)}'}), 500
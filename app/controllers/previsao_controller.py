@@ -0,0 +1,232 @@
+import datetime
+from datetime import date, timedelta
+from statistics import NormalDist
+from typing import Any, Dict, List
+import numpy as np
+from peewee import JOIN, chunked, fn
+from app.controllers.unidade_controller import ConversaoUnidadeController
+from app.models.database import db, InsumoNovo, MovimentacaoInsumo, PrevisaoConsumo, TipoMovimentacao
+
+ALFA = 0.3              # peso do consumo do dia no nível
+BETA = 0.05             # peso da variação do nível na tendência
+HISTORICO_DIAS = 365    # dias de histórico usados no primeiro ajuste de um insumo
+HORIZONTE_DIAS = 365    # até onde a data de ruptura é procurada
+CONFIANCA = 0.8         # probabilidade coberta pela faixa de datas de ruptura
+TAMANHO_BLOCO = 1000    # insumos por bloco nas contas com matrizes (insumo x dia)
+
+_USO = TipoMovimentacao.SAIDA_USO.value
+
+def _consumo_diario(insumo_ids: List[int], inicio: date, fim: date) -> np.ndarray:
+    """Matriz (insumo x dia) com o consumo de inicio a fim (inclusive), montada de uma consulta agrupada.
+
+    A soma é de quantidade_base (inteiros); cada linha volta para a unidade de estoque do insumo.
+    """
+    serie = np.zeros((len(insumo_ids), (fim - inicio).days + 1))
+    linha = {insumo_id: i for i, insumo_id in enumerate(insumo_ids)}
+
+    dia = fn.DATE(MovimentacaoInsumo.data_movimentacao)
+    consulta = (MovimentacaoInsumo
+                .select(MovimentacaoInsumo.insumo, dia, fn.SUM(MovimentacaoInsumo.quantidade_base))
+                .where((MovimentacaoInsumo.tipo == _USO) &
+                       (MovimentacaoInsumo.data_movimentacao >= inicio) &
+                       (MovimentacaoInsumo.data_movimentacao < fim + timedelta(days=1)))
+                .group_by(MovimentacaoInsumo.insumo, dia))
+
+    # Cursor direto, sem conversão para date/Decimal linha a linha: o NumPy lê os textos 'AAAA-MM-DD'
+    linhas = [(linha[insumo_id], dia, total) for insumo_id, dia, total in db.execute_sql(*consulta.sql())
+              if insumo_id in linha]
+    if linhas:
+        indices, dias, totais = zip(*linhas)
+        colunas = (np.array(dias, dtype='datetime64[D]') - np.datetime64(inicio, 'D')).astype(int)
+        serie[np.array(indices), colunas] = totais
+
+        unidades = {}
+        for bloco in chunked(insumo_ids, TAMANHO_BLOCO):
+            unidades.update(InsumoNovo.select(InsumoNovo.id_insumo, InsumoNovo.unidade)
+                            .where(InsumoNovo.id_insumo.in_(bloco)).tuples())
+        fatores = ConversaoUnidadeController.fatores_estoque(unidades)
+        serie /= np.array([fatores[insumo_id] for insumo_id in insumo_ids], dtype=float)[:, None]
+    return serie
+
+def _suavizar(nivel, tendencia, variancia, serie, primeira_coluna, novo, alfa, beta):
+    """Suavização de Holt dia a dia, vetorizada sobre todos os insumos.
+
+    Cada insumo entra a partir de primeira_coluna; antes dela o estado não muda.
+    Nos insumos novos o estado é iniciado com o consumo desse primeiro dia.
+    """
+    for t in range(serie.shape[1]):
+        consumo = serie[:, t]
+        previsto = nivel + tendencia
+        erro = consumo - previsto
+        novo_nivel = alfa * consumo + (1 - alfa) * previsto
+        nova_tendencia = beta * (novo_nivel - nivel) + (1 - beta) * tendencia
+        nova_variancia = (1 - alfa) * variancia + alfa * erro ** 2
+
+        inicia = novo & (primeira_coluna == t)
+        segue = (primeira_coluna <= t) & ~inicia
+        nivel = np.where(inicia, consumo, np.where(segue, novo_nivel, nivel))
+        tendencia = np.where(inicia, 0.0, np.where(segue, nova_tendencia, tendencia))
+        variancia = np.where(inicia, 0.0, np.where(segue, nova_variancia, variancia))
+    return nivel, tendencia, variancia
+
+def _primeiro_dia(condicao: np.ndarray) -> np.ndarray:
+    """Índice (1 = primeiro dia do horizonte) da primeira coluna verdadeira de cada linha; 0 se nenhuma."""
+    return np.where(condicao.any(axis=1), condicao.argmax(axis=1) + 1, 0)
+
+class PrevisaoConsumoController:
+    """Previsão do consumo diário ("Saída - Uso") e da data em que cada insumo acaba.
+
+    O estado do modelo (PrevisaoConsumo) cobre só dias completos e é atualizado de
+    forma incremental: cada chamada a atualizar() processa apenas os dias desde o
+    último ajuste. Uma saída lançada com data em um dia já ajustado faz o insumo
+    ser reajustado do zero.
+    """
+
+    @staticmethod
+    def atualizar(ate: date = None, alfa: float = ALFA, beta: float = BETA) -> int:
+        """Leva o estado de todos os insumos com consumo até o dia `ate` (padrão: ontem).
+
+        Retorna quantos insumos foram ajustados.
+        """
+        ate = ate or date.today() - timedelta(days=1)
+        with db.atomic():
+            marca = MovimentacaoInsumo.select(fn.MAX(MovimentacaoInsumo.id_movimentacao)).scalar() or 0
+
+            # Só as movimentações lançadas depois do ajuste mais antigo (faixa de ids) são examinadas
+            menor_marca = PrevisaoConsumo.select(fn.MIN(PrevisaoConsumo.ultima_movimentacao)).scalar()
+            if menor_marca is not None and menor_marca < marca:
+                retroativas = (PrevisaoConsumo
+                               .select(PrevisaoConsumo.id_previsao)
+                               .join(MovimentacaoInsumo, on=(MovimentacaoInsumo.insumo == PrevisaoConsumo.insumo))
+                               .where((MovimentacaoInsumo.id_movimentacao > menor_marca) &
+                                      (MovimentacaoInsumo.id_movimentacao > PrevisaoConsumo.ultima_movimentacao) &
+                                      (MovimentacaoInsumo.tipo == _USO) &
+                                      (MovimentacaoInsumo.data_movimentacao <
+                                       fn.DATE(PrevisaoConsumo.ultimo_dia, '+1 day'))))
+                PrevisaoConsumo.delete().where(PrevisaoConsumo.id_previsao.in_(retroativas)).execute()
+
+            estados = list(PrevisaoConsumo.select().where(PrevisaoConsumo.ultimo_dia < ate))
+
+            # Primeira saída de cada insumo ainda sem estado, pelo índice (insumo, tipo, data)
+            primeira_saida = (MovimentacaoInsumo
+                              .select(fn.MIN(MovimentacaoInsumo.data_movimentacao))
+                              .where((MovimentacaoInsumo.insumo == InsumoNovo.id_insumo) &
+                                     (MovimentacaoInsumo.tipo == _USO) &
+                                     (MovimentacaoInsumo.data_movimentacao < ate + timedelta(days=1))))
+            primeiro_uso = (InsumoNovo
+                            .select(InsumoNovo.id_insumo, primeira_saida)
+                            .where(InsumoNovo.id_insumo.not_in(PrevisaoConsumo.select(PrevisaoConsumo.insumo)))
+                            .tuples())
+
+            limite = ate - timedelta(days=HISTORICO_DIAS - 1)
+            inicios = {e.insumo_id: e.ultimo_dia + timedelta(days=1) for e in estados}
+            novos = {}
+            for insumo_id, primeira in primeiro_uso:
+                if primeira:
+                    novos[insumo_id] = max(date.fromisoformat(str(primeira)[:10]), limite)
+            inicios.update(novos)
+            if not inicios:
+                return 0
+
+            insumo_ids = list(inicios)
+            inicio = min(inicios.values())
+            por_insumo = {e.insumo_id: e for e in estados}
+            nivel = np.array([por_insumo[i].nivel if i in por_insumo else 0.0 for i in insumo_ids])
+            tendencia = np.array([por_insumo[i].tendencia if i in por_insumo else 0.0 for i in insumo_ids])
+            variancia = np.array([por_insumo[i].variancia if i in por_insumo else 0.0 for i in insumo_ids])
+            primeira_coluna = np.array([(inicios[i] - inicio).days for i in insumo_ids])
+            novo = np.array([i in novos for i in insumo_ids])
+
+            serie = _consumo_diario(insumo_ids, inicio, ate)
+            nivel, tendencia, variancia = _suavizar(nivel, tendencia, variancia, serie, primeira_coluna, novo,
+                                                    alfa, beta)
+
+            agora = datetime.datetime.now()
+            linhas = [{
+                'insumo': insumo_id,
+                'nivel': float(nivel[i]),
+                'tendencia': float(tendencia[i]),
+                'variancia': float(variancia[i]),
+                'dias_ajustados': (por_insumo[insumo_id].dias_ajustados if insumo_id in por_insumo else 0)
+                                  + (ate - inicios[insumo_id]).days + 1,
+                'ultimo_dia': ate,
+                'ultima_movimentacao': marca,
+                'atualizado_em': agora,
+            } for i, insumo_id in enumerate(insumo_ids)]
+
+            for bloco in chunked(linhas, 500):
+                (PrevisaoConsumo.insert_many(bloco)
+                 .on_conflict(conflict_target=[PrevisaoConsumo.insumo],
+                              preserve=[PrevisaoConsumo.nivel, PrevisaoConsumo.tendencia,
+                                        PrevisaoConsumo.variancia, PrevisaoConsumo.dias_ajustados,
+                                        PrevisaoConsumo.ultimo_dia, PrevisaoConsumo.ultima_movimentacao,
+                                        PrevisaoConsumo.atualizado_em])
+                 .execute())
+        return len(linhas)
+
+    @staticmethod
+    def reconstruir(ate: date = None) -> int:
+        """Descarta o estado salvo e ajusta todos os insumos a partir do histórico."""
+        with db.atomic():
+            PrevisaoConsumo.delete().execute()
+            return PrevisaoConsumoController.atualizar(ate)
+
+    @staticmethod
+    def prever(categoria: str = None, horizonte: int = HORIZONTE_DIAS,
+               confianca: float = CONFIANCA) -> List[Dict[str, Any]]:
+        """Consumo diário previsto e data de ruptura (com faixa) de cada insumo ativo.
+
+        A faixa supõe erros diários independentes: a incerteza do consumo acumulado
+        em h dias cresce com a raiz de h. Datas além do horizonte voltam como None.
+        Só lê o estado salvo: o ajuste fica com a tarefa `atualizar_previsoes` e o comando
+        `flask atualizar-previsoes`; insumos ainda sem estado voltam com consumo zero.
+        """
+        query = (InsumoNovo
+                 .select(InsumoNovo.id_insumo, InsumoNovo.nome, InsumoNovo.categoria, InsumoNovo.unidade,
+                         InsumoNovo.quantidade_atual, PrevisaoConsumo.nivel, PrevisaoConsumo.tendencia,
+                         PrevisaoConsumo.variancia, PrevisaoConsumo.ultimo_dia)
+                 .join(PrevisaoConsumo, JOIN.LEFT_OUTER, on=(PrevisaoConsumo.insumo == InsumoNovo.id_insumo))
+                 .where(InsumoNovo.ativo == True))
+        if categoria:
+            query = query.where(InsumoNovo.categoria == categoria)
+        insumos = list(query.order_by(InsumoNovo.nome).dicts())
+
+        z = NormalDist().inv_cdf((1 + confianca) / 2)
+        dias = np.arange(1, horizonte + 1)
+        hoje = date.today()
+        resultado = []
+
+        for bloco in chunked(insumos, TAMANHO_BLOCO):
+            nivel = np.array([i['nivel'] or 0.0 for i in bloco])
+            tendencia = np.array([i['tendencia'] or 0.0 for i in bloco])
+            desvio = np.sqrt([i['variancia'] or 0.0 for i in bloco])
+            estoque = np.array([float(i['quantidade_atual']) for i in bloco])[:, None]
+
+            acumulado = np.cumsum(np.maximum(nivel[:, None] + tendencia[:, None] * dias, 0), axis=1)
+            banda = z * desvio[:, None] * np.sqrt(dias)
+            ruptura = _primeiro_dia(acumulado >= estoque)
+            ruptura_min = _primeiro_dia(acumulado + banda >= estoque)
+            ruptura_max = _primeiro_dia(acumulado - banda >= estoque)
+
+            for n, insumo in enumerate(bloco):
+                base = insumo['ultimo_dia']
+
+                def data(indice):
+                    return base + timedelta(days=int(indice)) if base and indice else None
+
+                data_ruptura = data(ruptura[n])
+                resultado.append({
+                    'id_insumo': insumo['id_insumo'],
+                    'nome': insumo['nome'],
+                    'categoria': insumo['categoria'],
+                    'unidade': insumo['unidade'],
+                    'estoque_atual': float(insumo['quantidade_atual']),
+                    'consumo_diario_previsto': round(max(float(nivel[n] + tendencia[n]), 0.0), 3),
+                    'tendencia_diaria': round(float(tendencia[n]), 4),
+                    'data_ruptura': data_ruptura,
+                    'data_ruptura_min': data(ruptura_min[n]),
+                    'data_ruptura_max': data(ruptura_max[n]),
+                    'dias_restantes': max((data_ruptura - hoje).days, 0) if data_ruptura else None,
+                    'ajustado_ate': base,
+                })
+        return resultado
@@ -1,15 +1,193 @@
-from datetime import datetime, timedelta
-from typing import List, Optional
-from app.models.database import Producao, Lote
-from peewee import fn, JOIN
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+from app.models.database import db, Producao, ProducaoDiaria, Lote, QualidadeProducao
+from peewee import fn, Case, JOIN, chunked, IntegrityError, Tuple as TuplaSQL
 from app.exceptions import BusinessError
+from app.utils.helpers import como_data
+from app.controllers.lote_controller import LoteController
+from app.controllers.serie_producao_controller import AGRUPAMENTOS
+from app.controllers.alerta_controller import AlertaController
+from app.controllers.dashboard_controller import DashboardController
+
+# Producao tem 8 colunas: 500 linhas por INSERT ficam bem abaixo do limite de variáveis do SQLite
+TAMANHO_BLOCO_INSERCAO = 500
+POR_PAGINA_RELATORIO = 50   # registros por página no detalhe do relatório
+JANELA_RANKING = 28         # dias da janela móvel do ranking de lotes
+
+RANKING_CACHE_TTL = 60      # s; o cache é por worker, então outros workers veem uma escrita em até este tempo
+RANKING_CACHE_MAX = 32      # combinações (dias, limite) guardadas; a menos usada sai primeiro
+
+_ranking_em_cache = OrderedDict()   # (hoje, dias, limite) -> (expira_em, ranking), da menos à mais usada
+_geracao_ranking = 0                # incrementada a cada invalidação, como em DashboardController
+
+# Chave de cada agrupamento do relatório; dia, semana e mês são os mesmos períodos da série de produção
+AGRUPAMENTOS_RELATORIO = {
+    **{nome: periodo(Producao.data_coleta) for nome, periodo in AGRUPAMENTOS.items()},
+    'lote': Lote.numero_lote,
+    'qualidade': Producao.qualidade_producao,
+}
+
+def _ler_data(valor) -> date:
+    if isinstance(valor, (date, datetime)):
+        return como_data(valor)
+    texto = str(valor or '').strip()
+    for formato in ('%Y-%m-%d', '%d/%m/%Y'):
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            pass
+    raise ValueError(texto)
+
+def _ler_inteiro(valor) -> int:
+    if isinstance(valor, float) and valor.is_integer():
+        return int(valor)
+    return int(str(valor).strip())
+
+_QUALIDADES = {q.value.upper(): q.value for q in QualidadeProducao}
+
+def _limites_semana(dia: date) -> Tuple[date, date]:
+    inicio = dia - timedelta(days=dia.weekday())
+    return inicio, inicio + timedelta(days=6)
+
+def _limites_mes(dia: date) -> Tuple[date, date]:
+    inicio = dia.replace(day=1)
+    return inicio, (inicio + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+# Períodos (atual, anterior) de cada comparação pronta, a partir de um dia de referência
+COMPARACOES = {
+    'semana': lambda dia: (_limites_semana(dia), _limites_semana(dia - timedelta(days=7))),
+    'mes': lambda dia: (_limites_mes(dia), _limites_mes(dia.replace(day=1) - timedelta(days=1))),
+    'mes_ano_anterior': lambda dia: (_limites_mes(dia), _limites_mes(date(dia.year - 1, dia.month, 1))),
+}
+_METRICAS_COMPARACAO = ('ovos', 'perdas', 'aves', 'registros')
+
+def _variacao(atual, anterior) -> dict:
+    delta = atual - anterior
+    return {'delta': round(delta, 2), 'percentual': round(delta / anterior * 100, 2) if anterior else None}
+
+def _comparacao(linha: dict, prefixo: str, dias: Tuple[int, int]) -> dict:
+    periodos = {}
+    for periodo, n_dias in zip(('atual', 'anterior'), dias):
+        valores = {m: int(linha[f'{prefixo}{m}_{periodo}'] or 0) for m in _METRICAS_COMPARACAO}
+        valores['media_diaria'] = round(valores['ovos'] / n_dias, 2)
+        valores['taxa_postura'] = round(valores['ovos'] / valores['aves'] * 100, 2) if valores['aves'] else None
+        periodos[periodo] = valores
+
+    atual, anterior = periodos['atual'], periodos['anterior']
+    periodos['variacao'] = {m: _variacao(atual[m], anterior[m])
+                            for m in ('ovos', 'perdas', 'media_diaria', 'taxa_postura')
+                            if atual[m] is not None and anterior[m] is not None}
+    return periodos
+
+# Reenviar o registro de um lote em um dia substitui os valores gravados (índice único lote + data_coleta)
+_CAMPOS_SUBSTITUIDOS = [Producao.quantidade_aves, Producao.quantidade_ovos, Producao.qualidade_producao,
+                        Producao.producao_nao_aproveitada, Producao.responsavel, Producao.observacoes]
+
+def _indicadores(registros, ovos, perdas, aves) -> dict:
+    ovos, perdas, aves = int(ovos or 0), int(perdas or 0), int(aves or 0)
+    return {
+        'registros': int(registros or 0),
+        'ovos': ovos,
+        'perdas': perdas,
+        'aves': aves,
+        'taxa_quebra': round(perdas / ovos * 100, 2) if ovos else 0,
+        'ovos_por_ave': round(ovos / aves, 2) if aves else 0,
+    }
+
+def _invalidar_caches() -> None:
+    """Descarta neste worker os resumos em cache que leem a produção.
+
+    Chamado depois do commit: invalidar antes deixaria outra requisição recalcular
+    com os dados antigos e guardá-los até o TTL.
+    """
+    global _geracao_ranking
+    DashboardController.invalidar()
+    _geracao_ranking += 1
+    _ranking_em_cache.clear()
+
+def _upsert(linhas):
+    return (Producao.insert_many(linhas)
+            .on_conflict(conflict_target=[Producao.lote, Producao.data_coleta], preserve=_CAMPOS_SUBSTITUIDOS))
 
 class ProducaoController:
     @staticmethod
-    def criar_producao(lote_id: str, data_coleta: datetime, quantidade_aves: int, 
-                      quantidade_ovos: int, qualidade_producao: str,
-                      producao_nao_aproveitada: int, responsavel: str, observacoes: str = None) -> Producao:
-       
+    def _recalcular_resumo_diario(lote_id: int, dia) -> None:
+        """Refaz a linha (lote, dia) de ProducaoDiaria a partir dos registros de Producao.
+
+        Deve ser chamado dentro da mesma transação que alterou Producao; depois do
+        commit, o chamador descarta os caches com _invalidar_caches().
+        """
+        dia = como_data(dia)
+        totais = (Producao
+                  .select(fn.COALESCE(fn.SUM(Producao.quantidade_ovos), 0).alias('ovos'),
+                          fn.COALESCE(fn.SUM(Producao.producao_nao_aproveitada), 0).alias('perdas'),
+                          fn.COALESCE(fn.MAX(Producao.quantidade_aves), 0).alias('aves'),
+                          fn.COUNT(Producao.id_producao).alias('registros'))
+                  .where((Producao.lote == lote_id) & (Producao.data_coleta == dia))
+                  .dicts()
+                  .get())
+
+        if not totais['registros']:
+            (ProducaoDiaria.delete()
+             .where((ProducaoDiaria.lote == lote_id) & (ProducaoDiaria.dia == dia))
+             .execute())
+            return
+
+        (ProducaoDiaria
+         .insert(lote=lote_id, dia=dia, total_ovos=totais['ovos'], total_perdas=totais['perdas'],
+                 total_aves=totais['aves'], registros=totais['registros'])
+         .on_conflict(conflict_target=[ProducaoDiaria.lote, ProducaoDiaria.dia],
+                      preserve=[ProducaoDiaria.total_ovos, ProducaoDiaria.total_perdas,
+                                ProducaoDiaria.total_aves, ProducaoDiaria.registros])
+         .execute())
+
+    @staticmethod
+    def _recalcular_resumo_periodo(lote_ids: Iterable[int] = None, dia_inicio=None, dia_fim=None) -> None:
+        """Refaz de uma vez todas as linhas de ProducaoDiaria dos lotes e do intervalo informados.
+
+        Sem filtros, refaz a tabela inteira. Deve ser chamado dentro de uma transação;
+        depois do commit, o chamador descarta os caches com _invalidar_caches().
+        """
+        filtro_producao, filtro_resumo = [], []
+        if lote_ids is not None:
+            lote_ids = list(lote_ids)
+            filtro_producao.append(Producao.lote.in_(lote_ids))
+            filtro_resumo.append(ProducaoDiaria.lote.in_(lote_ids))
+        if dia_inicio is not None:
+            filtro_producao.append(Producao.data_coleta >= dia_inicio)
+            filtro_resumo.append(ProducaoDiaria.dia >= dia_inicio)
+        if dia_fim is not None:
+            filtro_producao.append(Producao.data_coleta <= dia_fim)
+            filtro_resumo.append(ProducaoDiaria.dia <= dia_fim)
+
+        # Várias coletas no mesmo dia contam as mesmas aves: o plantel do dia é o maior valor informado
+        totais = (Producao
+                  .select(Producao.lote, Producao.data_coleta,
+                          fn.SUM(Producao.quantidade_ovos), fn.SUM(Producao.producao_nao_aproveitada),
+                          fn.MAX(Producao.quantidade_aves), fn.COUNT(Producao.id_producao))
+                  .group_by(Producao.lote, Producao.data_coleta))
+        remocao = ProducaoDiaria.delete()
+        if filtro_producao:
+            totais = totais.where(*filtro_producao)
+            remocao = remocao.where(*filtro_resumo)
+        remocao.execute()
+        ProducaoDiaria.insert_from(totais, [ProducaoDiaria.lote, ProducaoDiaria.dia,
+                                            ProducaoDiaria.total_ovos, ProducaoDiaria.total_perdas,
+                                            ProducaoDiaria.total_aves, ProducaoDiaria.registros]).execute()
+
+    @staticmethod
+    def reconstruir_resumo_diario() -> int:
+        """Apaga e recalcula todo o ProducaoDiaria. Retorna o número de linhas (lote, dia) geradas."""
+        with db.atomic():
+            ProducaoController._recalcular_resumo_periodo()
+            linhas = ProducaoDiaria.select().count()
+        _invalidar_caches()
+        return linhas
+
+    @staticmethod
+    def _validar_quantidades(quantidade_aves: int, quantidade_ovos: int, producao_nao_aproveitada: int) -> None:
         if quantidade_aves <= 0:
             raise BusinessError("quantidade_aves deve ser maior que zero")
         if quantidade_ovos < 0 or producao_nao_aproveitada < 0:
@@ -17,25 +195,176 @@ class ProducaoController:
         if quantidade_ovos > quantidade_aves:
             raise BusinessError("quantidade_ovos não pode ser maior que quantidade_aves")
 
+    @staticmethod
+    def normalizar_registro(dados: dict, lotes: dict, responsavel_padrao: str = None) -> dict:
+        """Converte um registro recebido (JSON, CSV ou planilha) nas colunas de Producao.
+
+        Aplica as mesmas regras de criar_producao. `lotes` é o mapa de
+        LoteController.mapa_referencias; o lote pode vir em `id_lote` ou `lote`.
+        Lança BusinessError com todos os problemas encontrados no registro.
+        """
+        erros = []
+        referencia = dados.get('id_lote', dados.get('lote'))
+        if not isinstance(referencia, int) or isinstance(referencia, bool):
+            referencia = str(referencia).strip() if referencia is not None else ''
+        lote_id = lotes.get(referencia)
+        if referencia == '':
+            erros.append("id_lote é obrigatório")
+        elif lote_id is None:
+            erros.append(f"Lote não encontrado: {referencia}")
+
+        try:
+            data_coleta = _ler_data(dados.get('data_coleta'))
+        except ValueError:
+            data_coleta = None
+            erros.append("data_coleta inválida (use AAAA-MM-DD ou DD/MM/AAAA)")
+
+        quantidades = {}
+        for campo in ('quantidade_aves', 'quantidade_ovos', 'producao_nao_aproveitada'):
+            valor = dados.get(campo)
+            if campo == 'producao_nao_aproveitada' and valor in (None, ''):
+                valor = 0
+            try:
+                quantidades[campo] = _ler_inteiro(valor)
+            except (TypeError, ValueError):
+                erros.append(f"{campo} deve ser um número inteiro")
+
+        qualidade = _QUALIDADES.get(str(dados.get('qualidade_producao') or '').strip().upper())
+        if qualidade is None:
+            erros.append("qualidade_producao deve ser uma de: " + ', '.join(_QUALIDADES.values()))
+
+        responsavel = str(dados.get('responsavel') or responsavel_padrao or '').strip()
+        if not responsavel:
+            erros.append("responsavel é obrigatório")
+
+        if len(quantidades) == 3:
+            try:
+                ProducaoController._validar_quantidades(**quantidades)
+            except BusinessError as e:
+                erros.append(e.message)
+
+        if erros:
+            raise BusinessError('; '.join(erros))
+
+        observacoes = str(dados.get('observacoes') or '').strip() or None
+        return {
+            'lote': lote_id,
+            'data_coleta': data_coleta,
+            'qualidade_producao': qualidade,
+            'responsavel': responsavel[:100],
+            'observacoes': observacoes,
+            **quantidades,
+        }
+
+    @staticmethod
+    def importar_registros(registros: List[dict], responsavel_padrao: str = None, parcial: bool = False,
+                           linhas: List[int] = None) -> dict:
+        """Valida e grava vários registros de produção em uma única transação.
+
+        Com parcial=False nada é gravado se algum registro for inválido; com
+        parcial=True os válidos são gravados e os inválidos apenas relatados.
+        Retorna {'recebidos', 'inseridos', 'erros': [{'linha', 'erro'}]}, com linhas a partir de 1
+        ou, se informadas, as de `linhas` (uma por registro, ex.: a linha de cada um no arquivo).
+        """
+        lotes = LoteController.mapa_referencias(r.get('id_lote', r.get('lote')) for r in registros)
+        validos, erros = [], []
+        for linha, dados in zip(linhas or range(1, len(registros) + 1), registros):
+            try:
+                validos.append(ProducaoController.normalizar_registro(dados, lotes, responsavel_padrao))
+            except BusinessError as e:
+                erros.append({'linha': linha, 'erro': e.message})
+
+        resultado = {'recebidos': len(registros), 'inseridos': 0, 'atualizados': 0, 'erros': erros}
+        if not validos or (erros and not parcial):
+            return resultado
+
+        lote_ids = {v['lote'] for v in validos}
+        inicio = min(v['data_coleta'] for v in validos)
+        fim = max(v['data_coleta'] for v in validos)
+        no_intervalo = (Producao.select()
+                        .where(Producao.lote.in_(list(lote_ids)) &
+                               (Producao.data_coleta >= inicio) & (Producao.data_coleta <= fim)))
+        try:
+            with db.atomic():
+                existentes = no_intervalo.count()
+                for bloco in chunked(validos, TAMANHO_BLOCO_INSERCAO):
+                    _upsert(bloco).execute()
+                resultado['inseridos'] = no_intervalo.count() - existentes
+                ProducaoController._recalcular_resumo_periodo(lote_ids, inicio, fim)
+        except Exception as e:
+            raise Exception(f'Erro ao importar registros de produção: {str(e)}')
+        _invalidar_caches()
+
+        # O que não virou linha nova substituiu um registro existente (ou outro do mesmo lote e dia no lote enviado)
+        resultado['atualizados'] = len(validos) - resultado['inseridos']
+
+        # Importações costumam trazer histórico: só o dia mais recente de cada lote pode gerar alerta
+        ultimos = {}
+        for v in validos:
+            ultimos[v['lote']] = max(ultimos.get(v['lote'], v['data_coleta']), v['data_coleta'])
+        for lote_id, dia in ultimos.items():
+            AlertaController.avaliar_producao(lote_id, dia)
+        return resultado
+
+    @staticmethod
+    def criar_producao(lote_id, data_coleta: datetime, quantidade_aves: int, 
+                      quantidade_ovos: int, qualidade_producao: str,
+                      producao_nao_aproveitada: int, responsavel: str, observacoes: str = None) -> Producao:
+        """Grava a produção do lote no dia; se o dia já tiver registro, ele é substituído."""
+        producao, _ = ProducaoController.salvar_producao(
+            lote_id, data_coleta, quantidade_aves, quantidade_ovos, qualidade_producao,
+            producao_nao_aproveitada, responsavel, observacoes)
+        return producao
+
+    @staticmethod
+    def salvar_producao(lote_id, data_coleta: datetime, quantidade_aves: int,
+                        quantidade_ovos: int, qualidade_producao: str,
+                        producao_nao_aproveitada: int, responsavel: str,
+                        observacoes: str = None) -> Tuple[Producao, bool]:
+        """Como criar_producao, mas informa também se o registro foi criado (True) ou substituído (False)."""
+        ProducaoController._validar_quantidades(quantidade_aves, quantidade_ovos, producao_nao_aproveitada)
+
+        lote = LoteController.resolver(lote_id)
+        data_coleta = como_data(data_coleta)
+        chave = (Producao.lote == lote.id_lote) & (Producao.data_coleta == data_coleta)
+
         try:
-            return Producao.create(
-                id_lote=lote_id,
-                data_coleta=data_coleta,
-                quantidade_aves=quantidade_aves,
-                quantidade_ovos=quantidade_ovos,
-                qualidade_producao=qualidade_producao,
-                producao_nao_aproveitada=producao_nao_aproveitada,
-                responsavel=responsavel,
-                observacoes=observacoes
-            )
+            with db.atomic():
+                criado = not Producao.select().where(chave).exists()
+                _upsert([{
+                    'lote': lote.id_lote,
+                    'data_coleta': data_coleta,
+                    'quantidade_aves': quantidade_aves,
+                    'quantidade_ovos': quantidade_ovos,
+                    'qualidade_producao': qualidade_producao,
+                    'producao_nao_aproveitada': producao_nao_aproveitada,
+                    'responsavel': responsavel,
+                    'observacoes': observacoes,
+                }]).execute()
+                ProducaoController._recalcular_resumo_diario(lote.id_lote, data_coleta)
+                producao = Producao.get(chave)
         except Exception as e:
             raise Exception(f'Erro ao criar registro de produção: {str(e)}')
 
+        _invalidar_caches()
+        AlertaController.avaliar_producao(lote.id_lote, data_coleta)
+        return producao, criado
+
+    @staticmethod
+    def _remover(producao_id: int) -> bool:
+        with db.atomic():
+            producao = Producao.get_or_none(Producao.id_producao == producao_id)
+            if producao is None:
+                return False
+            Producao.delete().where(Producao.id_producao == producao_id).execute()
+            ProducaoController._recalcular_resumo_diario(producao.id_lote, producao.data_coleta)
+        _invalidar_caches()
+        return True
+
     @staticmethod
     def excluir_producao(producao_id: int) -> bool:
         try:
-            query = Producao.delete().where(Producao.id_producao == producao_id)
-            return query.execute() > 0
+            return ProducaoController._remover(producao_id)
         except Exception as e:
             raise Exception(f'Erro ao excluir produção: {str(e)}')
 
@@ -45,39 +374,62 @@ class ProducaoController:
 
     @staticmethod
     def listar_todos() -> List[Producao]:
-        return list(Producao.select().order_by(Producao.data_coleta.desc()))
+        return list(Producao.select(Producao, Lote).join(Lote).order_by(Producao.data_coleta.desc()))
 
     @staticmethod
-    def listar_por_lote(lote_id: str) -> List[Producao]:  
-        return list(Producao.select().where(Producao.id_lote == lote_id))  
+    def listar_por_lote(lote_id: int) -> List[Producao]:  
+        return list(Producao.select(Producao, Lote).join(Lote)
+                    .where(Producao.lote == lote_id)
+                    .order_by(Producao.data_coleta.desc()))  
 
     @staticmethod
     def atualizar(producao_id: int, **kwargs) -> bool:
+        if 'lote' in kwargs:
+            kwargs['lote'] = LoteController.resolver(kwargs['lote'])
+        if 'data_coleta' in kwargs:
+            kwargs['data_coleta'] = como_data(kwargs['data_coleta'])
         try:
-            query = Producao.update(**kwargs).where(Producao.id_producao == producao_id)
-            return query.execute() > 0
+            with db.atomic():
+                anterior = Producao.get_or_none(Producao.id_producao == producao_id)
+                if anterior is None:
+                    return False
+                Producao.update(**kwargs).where(Producao.id_producao == producao_id).execute()
+                atual = Producao.get_by_id(producao_id)
+                for lote_id, dia in {(anterior.id_lote, anterior.data_coleta), (atual.id_lote, atual.data_coleta)}:
+                    ProducaoController._recalcular_resumo_diario(lote_id, dia)
+            _invalidar_caches()
+            AlertaController.avaliar_producao(atual.id_lote, atual.data_coleta)
+            return True
+        except IntegrityError:
+            raise BusinessError("Já existe um registro de produção deste lote nesta data")
         except Exception as e:
             raise Exception(f'Erro ao atualizar produção: {str(e)}')
 
     @staticmethod
     def deletar(producao_id: int) -> bool:
         try:
-            query = Producao.delete().where(Producao.id_producao == producao_id)
-            return query.execute() > 0
+            return ProducaoController._remover(producao_id)
         except Exception as e:
             raise Exception(f'Erro ao deletar produção: {str(e)}')
 
+    @staticmethod
+    def totais_periodo(data_inicio, data_fim, lote_id: int = None) -> dict:
+        """Soma ovos e perdas do período (datas inclusivas) a partir do resumo diário."""
+        query = (ProducaoDiaria
+                 .select(fn.COALESCE(fn.SUM(ProducaoDiaria.total_ovos), 0).alias('total_ovos'),
+                         fn.COALESCE(fn.SUM(ProducaoDiaria.total_perdas), 0).alias('total_perdas'),
+                         fn.COALESCE(fn.SUM(ProducaoDiaria.registros), 0).alias('registros'))
+                 .where((ProducaoDiaria.dia >= como_data(data_inicio)) &
+                        (ProducaoDiaria.dia <= como_data(data_fim))))
+        if lote_id is not None:
+            query = query.where(ProducaoDiaria.lote == lote_id)
+        return query.dicts().get()
+
     @staticmethod
     def calcular_estatisticas_periodo(data_inicio: datetime, data_fim: datetime) -> dict:
-        producoes = (Producao
-                    .select()
-                    .where(
-                        (Producao.data_coleta >= data_inicio) &
-                        (Producao.data_coleta <= data_fim)
-                    ))
-        
-        total_produzido = sum(p.quantidade_ovos for p in producoes)
-        total_perdas = sum(p.producao_nao_aproveitada for p in producoes)
+        totais = ProducaoController.totais_periodo(data_inicio, data_fim)
+        total_produzido = totais['total_ovos']
+        total_perdas = totais['total_perdas']
         dias_periodo = (data_fim - data_inicio).days or 1
 
         return {
@@ -88,22 +440,134 @@ class ProducaoController:
         }
 
     @staticmethod
-    def buscar_melhores_lotes(limite: int = 5) -> List[dict]:
-        query = (Producao
-                .select(
-                    Producao.id_lote,  
-                    fn.SUM(Producao.quantidade_ovos).alias('total_producao'),
-                    fn.AVG(Producao.quantidade_ovos).alias('media_diaria')
-                )
-                .group_by(Producao.id_lote)  
-                .order_by(fn.SUM(Producao.quantidade_ovos).desc())
-                .limit(limite))
-        
-        return [{
-            'lote_id': prod.id_lote,  
-            'total_producao': int(prod.total_producao),
-            'media_diaria': round(float(prod.media_diaria), 2)
-        } for prod in query]
+    def periodos_comparacao(modo: str, dia: date = None) -> Tuple[Tuple[date, date], Tuple[date, date]]:
+        """Períodos de uma comparação pronta: semana x semana anterior, mês x mês anterior
+        ou mês x mesmo mês do ano anterior, em torno de `dia` (hoje, por padrão)."""
+        if modo not in COMPARACOES:
+            raise BusinessError(f"Comparação deve ser uma de: {', '.join(COMPARACOES)}")
+        return COMPARACOES[modo](como_data(dia or date.today()))
+
+    @staticmethod
+    def comparar_periodos(atual: Tuple[date, date], anterior: Tuple[date, date], lote=None) -> dict:
+        """Compara dois períodos quaisquer (datas inclusivas), por lote e no total.
+
+        Uma única consulta sobre o resumo diário lê as linhas dos dois períodos e soma
+        cada um com CASE; o total é uma soma em janela sobre os lotes. Para cada período
+        vêm ovos, perdas, aves-dia, registros, média diária e taxa de postura, e em
+        'variacao' o delta e a variação percentual (None quando o anterior é zero).
+        """
+        periodos = {'atual': tuple(map(como_data, atual)), 'anterior': tuple(map(como_data, anterior))}
+        for inicio, fim in periodos.values():
+            if inicio > fim:
+                raise BusinessError("Data inicial deve ser anterior à final")
+
+        condicoes = {nome: ProducaoDiaria.dia.between(inicio, fim) for nome, (inicio, fim) in periodos.items()}
+        campos = {'ovos': ProducaoDiaria.total_ovos, 'perdas': ProducaoDiaria.total_perdas,
+                  'aves': ProducaoDiaria.total_aves, 'registros': ProducaoDiaria.registros}
+        somas, totais = [], []
+        for metrica in _METRICAS_COMPARACAO:
+            for nome, condicao in condicoes.items():
+                soma = fn.SUM(Case(None, [(condicao, campos[metrica])], 0))
+                somas.append(soma.alias(f'{metrica}_{nome}'))
+                totais.append(fn.SUM(soma).over().alias(f'total_{metrica}_{nome}'))
+
+        query = (ProducaoDiaria
+                 .select(ProducaoDiaria.lote, Lote.numero_lote, *somas, *totais)
+                 .join(Lote)
+                 .where(condicoes['atual'] | condicoes['anterior'])
+                 .group_by(ProducaoDiaria.lote)
+                 .order_by(Lote.numero_lote))
+        if lote not in (None, ''):
+            query = query.where(ProducaoDiaria.lote == LoteController.resolver(lote).id_lote)
+        linhas = list(query.dicts())
+
+        dias = tuple((fim - inicio).days + 1 for inicio, fim in periodos.values())
+        vazio = {f'total_{m}_{p}': 0 for m in _METRICAS_COMPARACAO for p in periodos}
+        return {
+            'periodos': {nome: {'inicio': inicio.isoformat(), 'fim': fim.isoformat(), 'dias': n_dias}
+                         for (nome, (inicio, fim)), n_dias in zip(periodos.items(), dias)},
+            'total': _comparacao(linhas[0] if linhas else vazio, 'total_', dias),
+            'lotes': [{'lote_id': linha['lote'], 'numero_lote': linha['numero_lote'],
+                       **_comparacao(linha, '', dias)} for linha in linhas],
+        }
+
+    @staticmethod
+    def buscar_melhores_lotes(limite: int = 5, dias: int = JANELA_RANKING, hoje: date = None,
+                              ttl: int = RANKING_CACHE_TTL) -> List[dict]:
+        """Ranking dos lotes pela produção por ave-dia nos últimos `dias` dias.
+
+        Ovos divididos pelas aves alojadas somadas dia a dia, o que não favorece lotes
+        antigos ou grandes. `movimento` compara com a posição na janela anterior de mesmo
+        tamanho (positivo = subiu; None se o lote não produziu nela). As duas posições vêm
+        de RANK() sobre um único GROUP BY no intervalo de datas do resumo diário.
+
+        Só o ranking de hoje (sem `hoje` informado) fica em cache, por `ttl` segundos e
+        até a próxima escrita de produção neste worker; datas passadas são calculadas na hora.
+        """
+        em_cache = hoje is None
+        hoje = como_data(hoje or date.today())
+        chave = (hoje, dias, limite)
+        if em_cache and chave in _ranking_em_cache:
+            expira_em, ranking = _ranking_em_cache[chave]
+            if time.monotonic() < expira_em:
+                _ranking_em_cache.move_to_end(chave)
+                return ranking
+
+        geracao = _geracao_ranking
+        ranking = ProducaoController._calcular_ranking(hoje, dias, limite)
+        # Invalidado durante o cálculo: o resultado pode ser anterior à escrita, não vai para o cache
+        if em_cache and geracao == _geracao_ranking:
+            _ranking_em_cache[chave] = (time.monotonic() + ttl, ranking)
+            _ranking_em_cache.move_to_end(chave)
+            while len(_ranking_em_cache) > RANKING_CACHE_MAX:
+                _ranking_em_cache.popitem(last=False)
+        return ranking
+
+    @staticmethod
+    def _calcular_ranking(hoje: date, dias: int, limite: int) -> List[dict]:
+        inicio_atual = hoje - timedelta(days=dias - 1)
+        na_atual = ProducaoDiaria.dia >= inicio_atual
+
+        def soma(campo, condicao):
+            return fn.SUM(Case(None, [(condicao, campo)], 0))
+
+        ovos, aves = soma(ProducaoDiaria.total_ovos, na_atual), soma(ProducaoDiaria.total_aves, na_atual)
+        taxa = ovos * 1.0 / fn.NULLIF(aves, 0)
+        taxa_anterior = (soma(ProducaoDiaria.total_ovos, ~na_atual) * 1.0 /
+                         fn.NULLIF(soma(ProducaoDiaria.total_aves, ~na_atual), 0))
+        # NULL (sem produção na janela) fica no fim da ordem decrescente e não desloca os demais
+        por_lote = (ProducaoDiaria
+                    .select(ProducaoDiaria.lote, ovos.alias('ovos'), aves.alias('aves_dia'),
+                            taxa.alias('taxa'), taxa_anterior.alias('taxa_anterior'),
+                            fn.RANK().over(order_by=[taxa.desc()]).alias('posicao'),
+                            fn.RANK().over(order_by=[taxa_anterior.desc()]).alias('posicao_anterior'))
+                    .where(ProducaoDiaria.dia.between(hoje - timedelta(days=2 * dias - 1), hoje))
+                    .group_by(ProducaoDiaria.lote)
+                    .alias('ranking'))
+        query = (Lote
+                 .select(Lote.id_lote, Lote.numero_lote, por_lote.c.ovos, por_lote.c.aves_dia, por_lote.c.taxa,
+                         por_lote.c.taxa_anterior, por_lote.c.posicao, por_lote.c.posicao_anterior)
+                 .join(por_lote, on=(por_lote.c.id_lote == Lote.id_lote))
+                 .where(por_lote.c.taxa.is_null(False))
+                 .order_by(por_lote.c.posicao, Lote.numero_lote)
+                 .limit(limite)
+                 .dicts())
+
+        ranking = []
+        for linha in query:
+            anterior = linha['posicao_anterior'] if linha['taxa_anterior'] is not None else None
+            ranking.append({
+                'posicao': linha['posicao'],
+                'lote_id': linha['id_lote'],
+                'numero_lote': linha['numero_lote'],
+                'total_producao': int(linha['ovos']),
+                'media_diaria': round(linha['ovos'] / dias, 2),
+                'ovos_por_ave_dia': round(linha['taxa'], 4),
+                'taxa_postura': round(linha['taxa'] * 100, 2),
+                'posicao_anterior': anterior,
+                'movimento': anterior - linha['posicao'] if anterior is not None else None,
+            })
+        return ranking
 
     @staticmethod
     def verificar_baixa_producao(limite_percentual: float = 20.0) -> List[dict]:
@@ -127,4 +591,125 @@ class ProducaoController:
             'data': p.data_coleta,
             'quantidade': p.quantidade_ovos,
             'percentual_abaixo': round((1 - p.quantidade_ovos/media_geral) * 100, 2)
-        } for p in query]
\ No newline at end of file
+        } for p in query]
+
+    @staticmethod
+    def relatorio(data_inicio: date = None, data_fim: date = None, lote=None,
+                  agrupamento: str = None, apos: int = None, antes: int = None,
+                  limite: int = POR_PAGINA_RELATORIO) -> dict:
+        """Relatório de produção: totais, grupos e uma página dos registros.
+
+        Totais e grupos (por dia, semana, mês, lote ou qualidade) saem de uma única
+        consulta agregada; os totais gerais são somas em janela sobre os grupos. Os
+        registros são paginados por cursor como em listar_movimentacoes: `apos` traz os
+        seguintes (mais antigos) ao id informado e `antes` os anteriores (mais recentes).
+        """
+        if agrupamento and agrupamento not in AGRUPAMENTOS_RELATORIO:
+            raise BusinessError(f"Agrupamento deve ser um de: {', '.join(AGRUPAMENTOS_RELATORIO)}")
+        filtros = ProducaoController._filtros_relatorio(data_inicio, data_fim, lote)
+        totais, grupos = ProducaoController._agregar_relatorio(filtros, agrupamento)
+
+        return {
+            'agrupamento': agrupamento or None,
+            'totais': totais,
+            'grupos': grupos,
+            **ProducaoController._pagina_relatorio(filtros, apos, antes, limite),
+        }
+
+    @staticmethod
+    def registros_relatorio(data_inicio: date = None, data_fim: date = None, lote=None):
+        """Todos os registros do relatório como tuplas, para exportação.
+
+        (data_coleta, numero_lote, ovos, perdas, aves, qualidade, responsável), em ordem
+        de data; lidos sob demanda, sem montar um objeto por linha.
+        """
+        filtros = ProducaoController._filtros_relatorio(data_inicio, data_fim, lote)
+        query = (Producao
+                 .select(Producao.data_coleta, Lote.numero_lote, Producao.quantidade_ovos,
+                         Producao.producao_nao_aproveitada, Producao.quantidade_aves,
+                         Producao.qualidade_producao, Producao.responsavel)
+                 .join(Lote)
+                 .order_by(Producao.data_coleta, Producao.id_producao))
+        if filtros:
+            query = query.where(*filtros)
+        return query.tuples().iterator()
+
+    @staticmethod
+    def _filtros_relatorio(data_inicio, data_fim, lote) -> list:
+        filtros = []
+        if data_inicio:
+            filtros.append(Producao.data_coleta >= data_inicio)
+        if data_fim:
+            filtros.append(Producao.data_coleta <= data_fim)
+        if lote not in (None, ''):
+            filtros.append(Producao.lote == LoteController.resolver(lote).id_lote)
+        return filtros
+
+    @staticmethod
+    def _agregar_relatorio(filtros: list, agrupamento: Optional[str]) -> Tuple[dict, List[dict]]:
+        soma_ovos = fn.SUM(Producao.quantidade_ovos)
+        soma_perdas = fn.SUM(Producao.producao_nao_aproveitada)
+        soma_aves = fn.SUM(Producao.quantidade_aves)
+        metricas = [fn.COUNT(Producao.id_producao).alias('registros'), soma_ovos.alias('ovos'),
+                    soma_perdas.alias('perdas'), soma_aves.alias('aves')]
+
+        if not agrupamento:
+            query = Producao.select(*metricas)
+            if filtros:
+                query = query.where(*filtros)
+            return _indicadores(**query.dicts().get()), []
+
+        chave = AGRUPAMENTOS_RELATORIO[agrupamento]
+        query = (Producao
+                 .select(chave.alias('grupo'), *metricas,
+                         fn.SUM(fn.COUNT(Producao.id_producao)).over().alias('total_registros'),
+                         fn.SUM(soma_ovos).over().alias('total_ovos'),
+                         fn.SUM(soma_perdas).over().alias('total_perdas'),
+                         fn.SUM(soma_aves).over().alias('total_aves'))
+                 .join(Lote)
+                 .group_by(chave)
+                 .order_by(chave))
+        if filtros:
+            query = query.where(*filtros)
+        linhas = list(query.dicts())
+
+        primeira = linhas[0] if linhas else {}
+        totais = _indicadores(primeira.get('total_registros'), primeira.get('total_ovos'),
+                              primeira.get('total_perdas'), primeira.get('total_aves'))
+        # fn.date() herda a conversão do DateField; strftime chega como texto
+        grupos = [{'grupo': linha['grupo'].isoformat() if hasattr(linha['grupo'], 'isoformat') else linha['grupo'],
+                   **_indicadores(linha['registros'], linha['ovos'], linha['perdas'], linha['aves'])}
+                  for linha in linhas]
+        return totais, grupos
+
+    @staticmethod
+    def _pagina_relatorio(filtros: list, apos: Optional[int], antes: Optional[int], limite: int) -> dict:
+        filtros = list(filtros)
+        chave = TuplaSQL(Producao.data_coleta, Producao.id_producao)
+        cursor = apos or antes
+        if cursor:
+            Cursor = Producao.alias()
+            data_cursor = Cursor.select(Cursor.data_coleta).where(Cursor.id_producao == cursor)
+            filtros.append(chave < TuplaSQL(data_cursor, cursor) if apos else chave > TuplaSQL(data_cursor, cursor))
+
+        ordem = [Producao.data_coleta, Producao.id_producao]
+        query = (Producao
+                 .select(Producao, Lote.id_lote, Lote.numero_lote)
+                 .join(Lote)
+                 .order_by(*(ordem if antes else [campo.desc() for campo in ordem]))
+                 .limit(limite + 1))
+        if filtros:
+            query = query.where(*filtros)
+
+        registros = list(query)
+        mais = len(registros) > limite
+        registros = registros[:limite]
+        if antes:
+            registros.reverse()
+
+        tem_proxima, tem_anterior = (True, mais) if antes else (mais, bool(apos))
+        return {
+            'registros': registros,
+            'proximo': registros[-1].id_producao if registros and tem_proxima else None,
+            'anterior': registros[0].id_producao if registros and tem_anterior else None,
+        }
@@ -1,6 +1,6 @@
-from flask import Blueprint, render_template, request, Response
-from app.models.database import Producao, Lote
-from peewee import fn
+from flask import Blueprint, render_template, request, Response, flash
+from app.controllers.producao_controller import ProducaoController, AGRUPAMENTOS_RELATORIO
+from app.exceptions import BusinessError
 from io import StringIO, BytesIO
 import csv
 from reportlab.lib.pagesizes import letter
@@ -8,67 +8,68 @@ from reportlab.pdfgen import canvas
 
 producao_relatorio_bp = Blueprint('producao_relatorio', __name__)
 
+RELATORIO_VAZIO = {
+    'agrupamento': None,
+    'totais': {'registros': 0, 'ovos': 0, 'perdas': 0, 'aves': 0, 'taxa_quebra': 0, 'ovos_por_ave': 0},
+    'grupos': [], 'registros': [], 'proximo': None, 'anterior': None,
+}
+
 @producao_relatorio_bp.route('/producao/relatorio', methods=['GET'])
 def relatorio_producao():
-    print('Acessando relatorio_producao')
     # Filtros
-    inicio = request.args.get('inicio')
-    fim = request.args.get('fim')
-    lote_id = request.args.get('lote')
-    agrupamento = request.args.get('agrupamento')
-
-    print(f'Filtros recebidos: inicio={inicio}, fim={fim}, lote_id={lote_id}, agrupamento={agrupamento}')
-
-    query = Producao.select()
-    if inicio:
-        query = query.where(Producao.data_coleta >= inicio)
-    if fim:
-        query = query.where(Producao.data_coleta <= fim)
-    if lote_id:
-        query = query.where(Producao.id_lote == lote_id)
-
-    registros = list(query)
-    print(f'Registros encontrados: {len(registros)}')
+    inicio = request.args.get('inicio') or None
+    fim = request.args.get('fim') or None
+    lote_id = request.args.get('lote') or None
+    agrupamento = request.args.get('agrupamento') or None
+    filtros_url = {chave: valor for chave, valor in request.args.items()
+                   if valor and chave not in ('apos', 'antes', 'export')}
 
-    # Indicadores de performance
-    total_ovos = sum(r.quantidade_ovos for r in registros)
-    ovos_danificados = sum(r.producao_nao_aproveitada for r in registros)
-    aves_ativas = sum(r.quantidade_aves for r in registros)
-    taxa_quebra = round((ovos_danificados / total_ovos) * 100, 2) if total_ovos else 0
+    try:
+        # Exportação CSV
+        if request.args.get('export') == 'csv':
+            si = StringIO()
+            writer = csv.writer(si)
+            writer.writerow(['Data', 'Lote', 'Ovos', 'Ovos Danificados', 'Aves Ativas', 'Qualidade', 'Responsável'])
+            writer.writerows(ProducaoController.registros_relatorio(inicio, fim, lote_id))
+            output = si.getvalue()
+            return Response(output, mimetype='text/csv', headers={'Content-Disposition': 'attachment;filename=relatorio_producao.csv'})
 
-    # Exportação CSV
-    if request.args.get('export') == 'csv':
-        si = StringIO()
-        writer = csv.writer(si)
-        writer.writerow(['Data', 'Lote', 'Ovos', 'Ovos Danificados', 'Aves Ativas', 'Qualidade', 'Responsável'])
-        for r in registros:
-            writer.writerow([
-                r.data_coleta,
-                r.id_lote,
-                r.quantidade_ovos,
-                r.producao_nao_aproveitada,
-                r.quantidade_aves,
-                r.qualidade_producao,
-                r.responsavel
-            ])
-        output = si.getvalue()
-        return Response(output, mimetype='text/csv', headers={'Content-Disposition': 'attachment;filename=relatorio_producao.csv'})
+        # Exportação PDF
+        if request.args.get('export') == 'pdf':
+            buffer = BytesIO()
+            p = canvas.Canvas(buffer, pagesize=letter)
+            p.drawString(100, 750, 'Relatório de Produção de Ovos')
+            y = 720
+            for data_coleta, numero_lote, ovos, danificados, aves, _, _ in ProducaoController.registros_relatorio(inicio, fim, lote_id):
+                p.drawString(100, y, f"{data_coleta} | Lote: {numero_lote} | Ovos: {ovos} | Danificados: {danificados} | Aves: {aves}")
+                y -= 20
+                if y < 50:
+                    p.showPage()
+                    y = 750
+            p.save()
+            pdf = buffer.getvalue()
+            buffer.close()
+            return Response(pdf, mimetype='application/pdf', headers={'Content-Disposition': 'attachment;filename=relatorio_producao.pdf'})
 
-    # Exportação PDF
-    if request.args.get('export') == 'pdf':
-        buffer = BytesIO()
-        p = canvas.Canvas(buffer, pagesize=letter)
-        p.drawString(100, 750, 'Relatório de Produção de Ovos')
-        y = 720
-        for r in registros:
-            p.drawString(100, y, f"{r.data_coleta} | Lote: {r.id_lote} | Ovos: {r.quantidade_ovos} | Danificados: {r.producao_nao_aproveitada} | Aves: {r.quantidade_aves}")
-            y -= 20
-            if y < 50:
-                p.showPage()
-                y = 750
-        p.save()
-        pdf = buffer.getvalue()
-        buffer.close()
-        return Response(pdf, mimetype='application/pdf', headers={'Content-Disposition': 'attachment;filename=relatorio_producao.pdf'})
+        relatorio = ProducaoController.relatorio(inicio, fim, lote_id, agrupamento,
+                                                 apos=request.args.get('apos', type=int),
+                                                 antes=request.args.get('antes', type=int))
+    except BusinessError as e:
+        flash(str(e), 'warning')
+        relatorio = RELATORIO_VAZIO
 
-    return render_template('producao/relatorio.html', registros=registros, total_ovos=total_ovos, ovos_danificados=ovos_danificados, aves_ativas=aves_ativas, taxa_quebra=taxa_quebra)
+    totais = relatorio['totais']
+    return render_template('producao/relatorio.html',
+                           registros=relatorio['registros'],
+                           grupos=relatorio['grupos'],
+                           agrupamento=relatorio['agrupamento'],
+                           agrupamentos=AGRUPAMENTOS_RELATORIO,
+                           proximo=relatorio['proximo'],
+                           anterior=relatorio['anterior'],
+                           filtros_url=filtros_url,
+                           total_registros=totais['registros'],
+                           total_ovos=totais['ovos'],
+                           ovos_danificados=totais['perdas'],
+                           aves_ativas=totais['aves'],
+                           taxa_quebra=totais['taxa_quebra'],
+                           ovos_por_ave=totais['ovos_por_ave'])
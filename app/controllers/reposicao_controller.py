@@ -0,0 +1,84 @@
+from statistics import NormalDist
+from typing import Any, Dict, List
+import numpy as np
+from peewee import JOIN
+from app.models.database import InsumoNovo, PrevisaoConsumo
+
+# Dias entre o pedido e a chegada do insumo, por categoria (Config.REPOSICAO_PRAZOS_ENTREGA sobrepõe)
+PRAZOS_ENTREGA = {
+    'Ração': 5,
+    'Medicamento': 15,
+    'Suplemento': 10,
+    'Equipamento': 30,
+    'Limpeza': 7,
+    'Manutenção': 15,
+    'Embalagem': 10,
+    'Outros': 10,
+}
+PRAZO_ENTREGA_PADRAO = 10
+NIVEL_SERVICO = 0.95    # probabilidade de não faltar o insumo enquanto o pedido não chega
+CICLO_DIAS = 30         # período entre compras coberto pela quantidade sugerida
+
+class ReposicaoController:
+    """Ponto de pedido e quantidade sugerida de compra para todo o catálogo.
+
+    Usa o consumo diário previsto e a variância dos erros de previsão mantidos por
+    PrevisaoConsumoController (só lidos; o ajuste roda no agendador). Com consumo médio d, desvio diário s, prazo de
+    entrega L e z do nível de serviço:
+
+        estoque de segurança = z * s * raiz(L)
+        ponto de pedido      = d * L + estoque de segurança
+
+    Quando o estoque chega ao ponto de pedido, a sugestão completa o estoque até
+    cobrir o prazo de entrega mais um ciclo de compra (d * (L + ciclo) + z * s * raiz(L + ciclo)).
+    """
+
+    @staticmethod
+    def calcular(categoria: str = None, nivel_servico: float = NIVEL_SERVICO, ciclo_dias: int = CICLO_DIAS,
+                 prazos_entrega: Dict[str, int] = None, apenas_repor: bool = False) -> List[Dict[str, Any]]:
+        prazos = {**PRAZOS_ENTREGA, **(prazos_entrega or {})}
+
+        query = (InsumoNovo
+                 .select(InsumoNovo.id_insumo, InsumoNovo.nome, InsumoNovo.categoria, InsumoNovo.unidade,
+                         InsumoNovo.quantidade_atual, InsumoNovo.quantidade_minima,
+                         PrevisaoConsumo.nivel, PrevisaoConsumo.tendencia, PrevisaoConsumo.variancia)
+                 .join(PrevisaoConsumo, JOIN.LEFT_OUTER, on=(PrevisaoConsumo.insumo == InsumoNovo.id_insumo))
+                 .where(InsumoNovo.ativo == True))
+        if categoria:
+            query = query.where(InsumoNovo.categoria == categoria)
+        insumos = list(query.order_by(InsumoNovo.nome).dicts())
+        if not insumos:
+            return []
+
+        z = NormalDist().inv_cdf(nivel_servico)
+        consumo = np.maximum(np.array([(i['nivel'] or 0.0) + (i['tendencia'] or 0.0) for i in insumos]), 0)
+        desvio = np.sqrt([i['variancia'] or 0.0 for i in insumos])
+        prazo = np.array([prazos.get(i['categoria'], PRAZO_ENTREGA_PADRAO) for i in insumos], dtype=float)
+        estoque = np.array([float(i['quantidade_atual']) for i in insumos])
+
+        seguranca = z * desvio * np.sqrt(prazo)
+        ponto_pedido = consumo * prazo + seguranca
+        alvo = consumo * (prazo + ciclo_dias) + z * desvio * np.sqrt(prazo + ciclo_dias)
+        repor = (consumo > 0) & (estoque <= ponto_pedido)
+        sugerida = np.where(repor, np.ceil(np.maximum(alvo - estoque, 0)), 0)
+
+        resultado = []
+        for n, insumo in enumerate(insumos):
+            if apenas_repor and not repor[n]:
+                continue
+            resultado.append({
+                'id_insumo': insumo['id_insumo'],
+                'nome': insumo['nome'],
+                'categoria': insumo['categoria'],
+                'unidade': insumo['unidade'],
+                'estoque_atual': float(estoque[n]),
+                'quantidade_minima': float(insumo['quantidade_minima']),
+                'consumo_diario': round(float(consumo[n]), 3),
+                'desvio_diario': round(float(desvio[n]), 3),
+                'prazo_entrega_dias': int(prazo[n]),
+                'estoque_seguranca': round(float(seguranca[n]), 2),
+                'ponto_pedido': round(float(ponto_pedido[n]), 2),
+                'repor': bool(repor[n]),
+                'quantidade_sugerida': float(sugerida[n]),
+            })
+        return resultado
@@ -0,0 +1,101 @@
+from datetime import date
+from typing import Any, Dict
+import numpy as np
+from peewee import fn
+from app.controllers.lote_controller import LoteController
+from app.exceptions import BusinessError
+from app.models.database import ProducaoDiaria
+
+# Início do período de cada dia, calculado no SQLite (semanas começam na segunda-feira).
+# Único para as séries e relatórios de produção e o relatório de consumo de insumos.
+AGRUPAMENTOS = {
+    'dia': lambda dia: fn.date(dia),
+    'semana': lambda dia: fn.date(dia, 'weekday 0', '-6 days'),
+    'mes': lambda dia: fn.strftime('%Y-%m-01', dia),
+}
+MAX_PONTOS = 200    # ~6 KB de JSON com as quatro séries
+
+def lttb(x: np.ndarray, y: np.ndarray, limite: int) -> np.ndarray:
+    """Índices dos pontos mantidos pelo Largest-Triangle-Three-Buckets.
+
+    Preserva o primeiro e o último ponto e, em cada balde intermediário, o que forma
+    o maior triângulo com o ponto já escolhido e a média do balde seguinte; assim picos
+    e quedas continuam visíveis no gráfico reduzido.
+    """
+    n = len(x)
+    if limite >= n or limite < 3:
+        return np.arange(n)
+
+    bordas = np.linspace(1, n - 1, limite - 1).astype(int)
+    escolhidos = [0]
+    anterior = 0
+    for i in range(limite - 2):
+        inicio, fim = bordas[i], bordas[i + 1]
+        seguinte = slice(bordas[i + 1], bordas[i + 2]) if i + 2 < len(bordas) else slice(n - 1, n)
+        media_x, media_y = x[seguinte].mean(), y[seguinte].mean()
+        area = np.abs((x[anterior] - media_x) * (y[inicio:fim] - y[anterior]) -
+                      (x[anterior] - x[inicio:fim]) * (media_y - y[anterior]))
+        anterior = inicio + int(np.argmax(area))
+        escolhidos.append(anterior)
+    escolhidos.append(n - 1)
+    return np.array(escolhidos)
+
+class SerieProducaoController:
+
+    @staticmethod
+    def serie(data_inicio: date, data_fim: date, agrupamento: str = 'dia', lote=None,
+              max_pontos: int = MAX_PONTOS) -> Dict[str, Any]:
+        """Ovos, perdas e taxa de postura por dia, semana ou mês, de um lote ou da granja toda.
+
+        A agregação é um GROUP BY sobre o resumo diário (producao_diaria). Com mais
+        períodos que max_pontos, a série é reduzida por LTTB sobre os ovos e os mesmos
+        períodos são mantidos nas outras séries. Retorna as séries em colunas, alinhadas
+        por 'periodos' (data de início de cada período).
+        """
+        if agrupamento not in AGRUPAMENTOS:
+            raise BusinessError(f"Agrupamento deve ser um de: {', '.join(AGRUPAMENTOS)}")
+        if data_inicio > data_fim:
+            raise BusinessError("Data inicial deve ser anterior à final")
+
+        periodo = AGRUPAMENTOS[agrupamento](ProducaoDiaria.dia)
+        query = (ProducaoDiaria
+                 .select(periodo.alias('periodo'),
+                         fn.SUM(ProducaoDiaria.total_ovos).alias('ovos'),
+                         fn.SUM(ProducaoDiaria.total_perdas).alias('perdas'),
+                         fn.SUM(ProducaoDiaria.total_aves).alias('aves'))
+                 .where((ProducaoDiaria.dia >= data_inicio) & (ProducaoDiaria.dia <= data_fim))
+                 .group_by(periodo)
+                 .order_by(periodo))
+        id_lote = None
+        if lote not in (None, ''):
+            id_lote = LoteController.resolver(lote).id_lote
+            query = query.where(ProducaoDiaria.lote == id_lote)
+        linhas = list(query.tuples())
+
+        # fn.date() herda a conversão do DateField; strftime chega como texto
+        periodos = [p if isinstance(p, str) else p.isoformat() for p, _, _, _ in linhas]
+        ovos = np.array([o for _, o, _, _ in linhas], dtype=float)
+        perdas = np.array([p for _, _, p, _ in linhas], dtype=float)
+        aves = np.array([a for _, _, _, a in linhas], dtype=float)
+
+        indices = np.arange(len(linhas))
+        if len(linhas) > max_pontos:
+            dias = np.array([date.fromisoformat(p).toordinal() for p in periodos], dtype=float)
+            indices = lttb(dias, ovos, max_pontos)
+
+        # Taxa de postura = ovos / aves-dia do período (aves alojadas somadas dia a dia)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            taxa = np.where(aves > 0, ovos / aves * 100, np.nan)
+
+        return {
+            'agrupamento': agrupamento,
+            'lote': id_lote,
+            'inicio': data_inicio.isoformat(),
+            'fim': data_fim.isoformat(),
+            'total_periodos': len(linhas),
+            'reduzida': len(indices) < len(linhas),
+            'periodos': [periodos[i] for i in indices],
+            'ovos': [int(ovos[i]) for i in indices],
+            'perdas': [int(perdas[i]) for i in indices],
+            'taxa_postura': [None if np.isnan(taxa[i]) else round(float(taxa[i]), 1) for i in indices],
+        }
@@ -0,0 +1,172 @@
+from decimal import Decimal, ROUND_HALF_UP, InvalidOperation
+from typing import Dict, Iterable, List
+from peewee import fn
+from app.exceptions import BusinessError
+from app.models.database import (db, ConversaoUnidade, InsumoNovo, MovimentacaoInsumo, SaldoInsumo,
+                                 PrevisaoConsumo, UNIDADES_PADRAO, ESCALA_QUANTIDADE)
+
+def para_base(quantidade: Decimal, fator: int) -> int:
+    """Quantidade lançada em uma unidade de fator `fator` -> inteiro na unidade base."""
+    return int((Decimal(str(quantidade)) * fator).to_integral_value(rounding=ROUND_HALF_UP))
+
+def da_base(quantidade_base: int, fator: int) -> Decimal:
+    """Inteiro na unidade base -> quantidade na unidade de fator `fator`, com duas casas."""
+    return (Decimal(quantidade_base or 0) / fator).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+def _rebasear(coluna, fator: int):
+    """Expressão SQL: valor na base "própria unidade" (ESCALA_QUANTIDADE por unidade) -> base da referência."""
+    return (coluna * fator + ESCALA_QUANTIDADE // 2) / ESCALA_QUANTIDADE
+
+def _exibicao(coluna, fator: int):
+    """Expressão SQL equivalente a da_base: inteiro na base -> unidade de fator `fator`, com duas casas."""
+    return ((coluna * 100 + fator // 2) / fator) / 100.0
+
+def _tabela(unidade_insumo: str, conversoes: Iterable[ConversaoUnidade]) -> Dict[str, int]:
+    """Fator de cada unidade compatível com a do insumo, ou seja, que tem a mesma unidade base."""
+    tabela = {unidade: (base, fator * ESCALA_QUANTIDADE) for unidade, (base, fator) in UNIDADES_PADRAO.items()}
+    for conversao in conversoes:
+        tabela[conversao.unidade] = (UNIDADES_PADRAO[conversao.unidade_referencia][0], conversao.fator)
+    # Unidade sem conversão cadastrada (ex.: saco sem peso definido) é a própria base
+    tabela.setdefault(unidade_insumo, (unidade_insumo, ESCALA_QUANTIDADE))
+
+    base = tabela[unidade_insumo][0]
+    return {unidade: fator for unidade, (base_unidade, fator) in tabela.items() if base_unidade == base}
+
+def _base_da_unidade(unidade: str, conversoes: Iterable[ConversaoUnidade]) -> str:
+    if unidade in UNIDADES_PADRAO:
+        return UNIDADES_PADRAO[unidade][0]
+    for conversao in conversoes:
+        if conversao.unidade == unidade:
+            return UNIDADES_PADRAO[conversao.unidade_referencia][0]
+    return unidade
+
+class ConversaoUnidadeController:
+    """Conversão das quantidades de insumos para a unidade base (g, mL ou un).
+
+    Cada movimentação guarda quantidade_base, um inteiro em milésimos da unidade
+    base, além da quantidade e da unidade em que foi lançada. Assim as somas de
+    relatórios são SUMs inteiros no SQLite, mesmo com lançamentos em g, kg, t ou sacos.
+    O estoque do insumo (estoque_base) fica na mesma escala.
+    """
+
+    @staticmethod
+    def fatores(insumos: Dict[int, str]) -> Dict[int, Dict[str, int]]:
+        """Para cada insumo ({id_insumo: unidade de estoque}), as unidades aceitas e quanto uma vale em quantidade_base."""
+        conversoes = {}
+        if insumos:
+            for conversao in ConversaoUnidade.select().where(ConversaoUnidade.insumo.in_(list(insumos))):
+                conversoes.setdefault(conversao.insumo_id, []).append(conversao)
+        return {insumo_id: _tabela(unidade, conversoes.get(insumo_id, ())) for insumo_id, unidade in insumos.items()}
+
+    @staticmethod
+    def fatores_estoque(insumos: Dict[int, str]) -> Dict[int, int]:
+        """Fator da unidade de estoque de cada insumo, para converter somas de quantidade_base de volta."""
+        return {insumo_id: tabela[insumos[insumo_id]]
+                for insumo_id, tabela in ConversaoUnidadeController.fatores(insumos).items()}
+
+    @staticmethod
+    def fator(fatores: Dict[str, int], unidade: str, unidade_insumo: str) -> int:
+        """Fator de `unidade` na tabela do insumo; BusinessError se não houver conversão para a unidade dele."""
+        if unidade not in fatores:
+            raise BusinessError(f"Unidade '{unidade}' não pode ser convertida para '{unidade_insumo}'")
+        return fatores[unidade]
+
+    @staticmethod
+    def listar_conversoes(insumo_id: int) -> List[ConversaoUnidade]:
+        return list(ConversaoUnidade.select()
+                    .where(ConversaoUnidade.insumo == insumo_id)
+                    .order_by(ConversaoUnidade.unidade))
+
+    @staticmethod
+    def definir_conversao(insumo_id: int, unidade: str, quantidade: Decimal,
+                          unidade_referencia: str) -> ConversaoUnidade:
+        """Cadastra ou altera uma unidade do insumo, ex.: definir_conversao(id, 'saco', 25, 'kg').
+
+        Movimentações já gravadas mantêm a quantidade_base que tinham. A exceção é a
+        primeira conversão da própria unidade de estoque (ex.: insumo em sacos): os
+        lançamentos, o estoque (estoque_base) e os checkpoints passam da base "saco"
+        para a unidade de referência. Mudar depois o peso da unidade de estoque só
+        muda a exibição: estoque_anterior/posterior, quantidade_atual e o estado da
+        previsão de consumo são recalculados para o novo tamanho.
+        """
+        try:
+            quantidade = Decimal(str(quantidade))
+        except (InvalidOperation, ValueError):
+            raise BusinessError("Quantidade da conversão deve ser numérica")
+        if quantidade <= 0:
+            raise BusinessError("Quantidade da conversão deve ser maior que zero")
+        if unidade in UNIDADES_PADRAO:
+            raise BusinessError(f"A unidade '{unidade}' já tem conversão padrão")
+        if unidade_referencia not in UNIDADES_PADRAO:
+            raise BusinessError(f"Unidade de referência deve ser uma de: {', '.join(UNIDADES_PADRAO)}")
+
+        insumo = InsumoNovo.get_or_none(InsumoNovo.id_insumo == insumo_id)
+        if insumo is None:
+            raise BusinessError("Insumo não encontrado")
+
+        base, fator_referencia = UNIDADES_PADRAO[unidade_referencia]
+        fator = para_base(quantidade, fator_referencia * ESCALA_QUANTIDADE)
+        outras = [c for c in ConversaoUnidadeController.listar_conversoes(insumo_id) if c.unidade != unidade]
+        if unidade != insumo.unidade and _base_da_unidade(insumo.unidade, outras) != base:
+            raise BusinessError(f"'{unidade_referencia}' não é compatível com a unidade do insumo ({insumo.unidade})")
+        if unidade == insumo.unidade and any(UNIDADES_PADRAO[c.unidade_referencia][0] != base for c in outras):
+            raise BusinessError(f"'{unidade_referencia}' não é compatível com as outras unidades do insumo")
+
+        with db.atomic():
+            conversao = ConversaoUnidade.get_or_none((ConversaoUnidade.insumo == insumo_id) &
+                                                     (ConversaoUnidade.unidade == unidade))
+            if conversao is None:
+                conversao = ConversaoUnidade.create(insumo=insumo_id, unidade=unidade, quantidade=quantidade,
+                                                    unidade_referencia=unidade_referencia, fator=fator)
+                if unidade == insumo.unidade:
+                    # Até agora a base era o próprio "saco": todos os lançamentos e o estoque estão nessa unidade
+                    (MovimentacaoInsumo
+                     .update(quantidade_base=fn.ROUND(MovimentacaoInsumo.quantidade * fator).cast('INTEGER'))
+                     .where(MovimentacaoInsumo.insumo == insumo_id)
+                     .execute())
+                    (MovimentacaoInsumo
+                     .update(estoque_anterior_base=_rebasear(MovimentacaoInsumo.estoque_anterior_base, fator),
+                             estoque_posterior_base=_rebasear(MovimentacaoInsumo.estoque_posterior_base, fator))
+                     .where(MovimentacaoInsumo.insumo == insumo_id)
+                     .execute())
+                    (SaldoInsumo
+                     .update(saldo_base=_rebasear(SaldoInsumo.saldo_base, fator))
+                     .where(SaldoInsumo.insumo == insumo_id)
+                     .execute())
+                    (InsumoNovo
+                     .update(estoque_base=_rebasear(InsumoNovo.estoque_base, fator))
+                     .where(InsumoNovo.id_insumo == insumo_id)
+                     .execute())
+            else:
+                if (UNIDADES_PADRAO[conversao.unidade_referencia][0] != base and
+                        MovimentacaoInsumo.select().where((MovimentacaoInsumo.insumo == insumo_id) &
+                                                          (MovimentacaoInsumo.unidade == unidade)).exists()):
+                    raise BusinessError(f"Já há movimentações em '{unidade}'; a referência deve continuar em "
+                                        f"{UNIDADES_PADRAO[conversao.unidade_referencia][0]}")
+                fator_anterior = conversao.fator
+                conversao.quantidade = quantidade
+                conversao.unidade_referencia = unidade_referencia
+                conversao.fator = fator
+                conversao.save()
+                if unidade == insumo.unidade and fator != fator_anterior:
+                    # O estoque e o histórico continuam os mesmos na base; muda quanto valem na unidade do insumo
+                    estoque_base = (InsumoNovo.select(InsumoNovo.estoque_base)
+                                    .where(InsumoNovo.id_insumo == insumo_id).scalar())
+                    (InsumoNovo
+                     .update(quantidade_atual=da_base(estoque_base, fator), versao=InsumoNovo.versao + 1)
+                     .where(InsumoNovo.id_insumo == insumo_id)
+                     .execute())
+                    (MovimentacaoInsumo
+                     .update(estoque_anterior=_exibicao(MovimentacaoInsumo.estoque_anterior_base, fator),
+                             estoque_posterior=_exibicao(MovimentacaoInsumo.estoque_posterior_base, fator))
+                     .where(MovimentacaoInsumo.insumo == insumo_id)
+                     .execute())
+                    # O modelo de consumo está na unidade de estoque: nível e tendência escalam com o
+                    # fator, a variância com o quadrado dele
+                    escala = fator_anterior / fator
+                    (PrevisaoConsumo
+                     .update(nivel=PrevisaoConsumo.nivel * escala, tendencia=PrevisaoConsumo.tendencia * escala,
+                             variancia=PrevisaoConsumo.variancia * escala * escala)
+                     .where(PrevisaoConsumo.insumo == insumo_id)
+                     .execute())
+        return conversao
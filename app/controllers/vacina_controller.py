@@ -1,23 +1,25 @@
 from typing import List, Optional
-from app.models.database import Vacinacao, TipoVacina  
+from app.models.database import Vacinacao, TipoVacina, Lote
 from app.exceptions import BusinessError
+from app.controllers.lote_controller import LoteController
 from datetime import datetime, date
 
 class VacinaController:  
     
     @staticmethod
     def criar_vacina(data_aplicacao: date, responsavel: str, tipo_vacina: str,
-                    id_lote: str, quantidade_aves: int, observacoes: str = None) -> Vacinacao:
+                    id_lote, quantidade_aves: int, observacoes: str = None) -> Vacinacao:
         
         if quantidade_aves <= 0:
             raise BusinessError("Quantidade de aves deve ser maior que zero")
+        lote = LoteController.resolver(id_lote)
             
         try:
             return Vacinacao.create(
                 data_aplicacao=data_aplicacao,
                 responsavel=responsavel,
                 tipo_vacina=tipo_vacina,
-                id_lote=id_lote,
+                lote=lote,
                 quantidade_aves=quantidade_aves,
                 observacoes=observacoes
             )
@@ -26,7 +28,7 @@ class VacinaController:
 
     @staticmethod
     def listar_todos() -> List[Vacinacao]:
-        return list(Vacinacao.select().order_by(Vacinacao.data_aplicacao.desc()))
+        return list(Vacinacao.select(Vacinacao, Lote).join(Lote).order_by(Vacinacao.data_aplicacao.desc()))
 
     @staticmethod
     def buscar_por_id(id_vacinacao: int) -> Optional[Vacinacao]:
@@ -34,6 +36,8 @@ class VacinaController:
 
     @staticmethod
     def atualizar(id_vacinacao: int, **kwargs) -> bool:
+        if 'lote' in kwargs:
+            kwargs['lote'] = LoteController.resolver(kwargs['lote'])
         try:
             query = Vacinacao.update(**kwargs).where(Vacinacao.id_vacinacao == id_vacinacao)
             return query.execute() > 0
@@ -49,8 +53,8 @@ class VacinaController:
             raise Exception(f'Erro ao excluir vacinação: {str(e)}')
 
     @staticmethod
-    def listar_por_lote(id_lote: str) -> List[Vacinacao]:
-        return list(Vacinacao.select().where(Vacinacao.id_lote == id_lote)
+    def listar_por_lote(id_lote: int) -> List[Vacinacao]:
+        return list(Vacinacao.select(Vacinacao, Lote).join(Lote).where(Vacinacao.lote == id_lote)
                    .order_by(Vacinacao.data_aplicacao.desc()))
 
     @staticmethod
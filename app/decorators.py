@@ -19,11 +19,11 @@ def require_auth(allowed_roles=None):
                 return jsonify({'error': 'Invalid or expired token'}), 401
             
             try:
-                user = Usuarios.query.get(payload['user_id'])
-                if not user or not user.is_ativo:
+                user = Usuarios.get_or_none(Usuarios.id_usuario == payload['user_id'])
+                if not user or not user.ativo:
                     return jsonify({'error': 'User not found or deactivated'}), 401
                 
-                if allowed_roles and user.tipo_usuario not in allowed_roles:
+                if allowed_roles and user.tipo_usuario.upper() not in {r.value.upper() for r in allowed_roles}:
                     return jsonify({'error': 'Access denied'}), 403
                 
                 g.current_user = user
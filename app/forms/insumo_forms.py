@@ -57,6 +57,34 @@ class MovimentacaoInsumoForm(FlaskForm):
         NumberRange(min=0.01, message='Quantidade deve ser maior que zero')
     ], places=2)
     
+    unidade = SelectField('Unidade',
+        choices=[('', 'Unidade do insumo')] + [(u.value, u.value) for u in UnidadeMedida],
+        validators=[Optional()]
+    )
+    
+    data_movimentacao = DateField('Data da Movimentação', validators=[DataRequired()], default=date.today)
+    
+    observacoes = TextAreaField('Observações', validators=[
+        Length(max=500, message='Observações devem ter no máximo 500 caracteres')
+    ])
+    
+    def validate_data_movimentacao(self, field):
+        if field.data and field.data > date.today():
+            raise ValidationError('Data da movimentação não pode ser futura')
+
+class MovimentacaoLoteForm(FlaskForm):
+    """Cabeçalho comum da movimentação em lote; as quantidades vêm dos campos quantidade_<id_insumo>."""
+    tipo = SelectField('Tipo de Movimentação',
+        choices=[
+            ('Saída - Uso', 'Saída - Uso'),
+            ('Saída - Perda', 'Saída - Perda'),
+            ('Entrada - Compra', 'Entrada - Compra'),
+            ('Entrada - Doação', 'Entrada - Doação'),
+            ('Ajuste', 'Ajuste')
+        ],
+        validators=[DataRequired()]
+    )
+    
     data_movimentacao = DateField('Data da Movimentação', validators=[DataRequired()], default=date.today)
     
     observacoes = TextAreaField('Observações', validators=[
@@ -65,4 +93,4 @@ class MovimentacaoInsumoForm(FlaskForm):
     
     def validate_data_movimentacao(self, field):
         if field.data and field.data > date.today():
-            raise ValidationError('Data da movimentação não pode ser futura')
\ No newline at end of file
+            raise ValidationError('Data da movimentação não pode ser futura')
@@ -2,6 +2,7 @@ from .database import (
     db,
     Lote,
     Producao,
+    ProducaoDiaria,
     Usuarios,
     Granja,
     Sexo,
@@ -16,6 +17,9 @@ from .database import (
     CategoriaNotificacao,    
     PrioridadeNotificacao,   
     StatusNotificacao,       
+    CategoriaAviso,
+    PrioridadeAviso,
+    SituacaoNotificacao,
     QualidadeProducao,
 )
-__all__ = ["db", "Lote", "Producao", "Usuarios", "Granja", "Sexo", "TipoUsuarios", "Aves", "RacaAve", "UserActivityLog", "Avisos", "NotificacaoUsuario", "HistoricoAvisos", "HistoricoProducao", "CategoriaNotificacao", "PrioridadeNotificacao", "StatusNotificacao", "QualidadeProducao"]
\ No newline at end of file
+__all__ = ["db", "Lote", "Producao", "ProducaoDiaria", "Usuarios", "Granja", "Sexo", "TipoUsuarios", "Aves", "RacaAve", "UserActivityLog", "Avisos", "NotificacaoUsuario", "HistoricoAvisos", "HistoricoProducao", "CategoriaNotificacao", "PrioridadeNotificacao", "StatusNotificacao", "CategoriaAviso", "PrioridadeAviso", "SituacaoNotificacao", "QualidadeProducao"]
\ No newline at end of file
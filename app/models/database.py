@@ -1,10 +1,106 @@
 import datetime
-from peewee import (SqliteDatabase, Model, AutoField, CharField, DateField, 
-                    BooleanField, IntegerField, DoubleField, TextField, ForeignKeyField, 
-                    DateTimeField, DecimalField)
+import logging
+import threading
+from peewee import (Model, AutoField, CharField, DateField, 
+                    BooleanField, IntegerField, BigIntegerField, DoubleField, TextField, ForeignKeyField, 
+                    DateTimeField, DecimalField, SQL)
 from enum import Enum
-
-db = SqliteDatabase('BD_Granja.db')
+from playhouse.pool import PooledSqliteDatabase
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+PRAGMAS_SQLITE = {
+    'busy_timeout': 'SQLITE_BUSY_TIMEOUT',
+    'journal_mode': 'SQLITE_JOURNAL_MODE',
+    'synchronous': 'SQLITE_SYNCHRONOUS',
+    'cache_size': 'SQLITE_CACHE_SIZE',
+    'mmap_size': 'SQLITE_MMAP_SIZE',
+    'temp_store': 'SQLITE_TEMP_STORE',
+}
+
+def pragmas_sqlite(config) -> list:
+    """Monta a lista de PRAGMAs a partir da configuração (app.config ou atributos de Config).
+
+    busy_timeout vem primeiro para que a troca do journal_mode também espere pelo lock.
+    """
+    return [(pragma, config.get(chave)) for pragma, chave in PRAGMAS_SQLITE.items()
+            if config.get(chave) is not None]
+
+class BancoPooled(PooledSqliteDatabase):
+    """PooledSqliteDatabase com contadores de ocupação do pool."""
+
+    def __init__(self, *args, **kwargs):
+        self.contadores = {'criadas': 0, 'checkouts': 0}
+        self._trava_contadores = threading.Lock()   # checkouts acontecem em várias threads ao mesmo tempo
+        super().__init__(*args, **kwargs)
+
+    def _contar(self, chave: str) -> None:
+        with self._trava_contadores:
+            self.contadores[chave] += 1
+
+    def _add_conn_hooks(self, conn):
+        # Chamado apenas quando uma conexão nova é aberta com o SQLite
+        self._contar('criadas')
+        super()._add_conn_hooks(conn)
+
+    def _initialize_connection(self, conn):
+        # Chamado a cada checkout (conexão nova ou reaproveitada do pool)
+        self._contar('checkouts')
+        super()._initialize_connection(conn)
+
+    def ler_contadores(self) -> dict:
+        with self._trava_contadores:
+            return dict(self.contadores)
+
+    def ocupacao(self):
+        """(max_conexoes, em_uso, ociosas), ou None se o pool não expuser esses dados.
+
+        O PooledDatabase não tem API pública de ocupação: são lidos os atributos internos
+        _max_connections, _in_use e _connections do peewee 3.16.3 (versão fixada em
+        requirements). Se uma atualização os renomear, as estatísticas saem sem esses
+        campos em vez de derrubar a rota.
+        """
+        try:
+            return self._max_connections, len(self._in_use), len(self._connections)
+        except (AttributeError, TypeError):
+            logger.warning("Ocupação do pool indisponível nesta versão do peewee")
+            return None
+
+def _opcoes_pool(config) -> dict:
+    return {
+        'pragmas': pragmas_sqlite(config),
+        'max_connections': config.get('DB_MAX_CONNECTIONS'),
+        'stale_timeout': config.get('DB_STALE_TIMEOUT'),
+        'timeout': config.get('DB_POOL_TIMEOUT'),
+        'check_same_thread': False,
+    }
+
+db = BancoPooled(Config.DATABASE_PATH, **_opcoes_pool(vars(Config)))
+
+def configurar_banco(config):
+    """Reabre o banco com o caminho, os PRAGMAs e os limites do pool definidos na configuração."""
+    db.close_all()
+    db.init(config.get('DATABASE_PATH', Config.DATABASE_PATH), **_opcoes_pool(config))
+
+def estatisticas_pool() -> dict:
+    """Ocupação atual do pool de conexões deste processo."""
+    contadores = db.ler_contadores()
+    estatisticas = {'criadas': contadores['criadas'], 'checkouts': contadores['checkouts']}
+    ocupacao = db.ocupacao()
+    if ocupacao is not None:
+        max_conexoes, em_uso, ociosas = ocupacao
+        estatisticas.update(max_conexoes=max_conexoes, em_uso=em_uso, ociosas=ociosas,
+                            descartadas=contadores['criadas'] - em_uso - ociosas)
+    return estatisticas
+
+def relatorio_pragmas() -> dict:
+    """Lê do SQLite os valores efetivos de cada PRAGMA na conexão atual."""
+    efetivos = {}
+    for pragma in PRAGMAS_SQLITE:
+        linha = db.execute_sql(f'PRAGMA {pragma}').fetchone()
+        efetivos[pragma] = linha[0] if linha else None
+    return efetivos
 
 class BaseModel(Model):
     class Meta:
@@ -13,6 +109,7 @@ class BaseModel(Model):
 class Granja(BaseModel):
     id_granja = AutoField()                             #PK
     cnpj_granja = CharField(max_length=18)
+    nome_granja = CharField(max_length=100, null=True)
 
 class Sexo(Enum):
     FEMININO = "Feminino"
@@ -38,11 +135,30 @@ class Usuarios(BaseModel):
     data_admissao = DateField()
     carteira_trabalho = CharField(max_length=50)
     telefone = CharField(max_length=20)
+    ativo = BooleanField(default=True)
     
     class Meta:
         database = db
         table_name = 'usuarios'
 
+    def to_dict(self):
+        return {
+            "id_usuario": self.id_usuario,
+            "nome": self.nome,
+            "username": self.username,
+            "email": self.email,
+            "cpf": self.cpf,
+            "tipo_usuario": self.tipo_usuario,
+            "id_granja": self.id_granja,
+            "carteira_trabalho": self.carteira_trabalho,
+            "telefone": self.telefone,
+            "sexo": self.sexo,
+            "data_nascimento": self.data_nascimento.isoformat() if self.data_nascimento else None,
+            "endereco": self.endereco,
+            "data_admissao": self.data_admissao.isoformat() if self.data_admissao else None,
+            "ativo": self.ativo
+        }
+
 class Setor(BaseModel):
     id_setor = AutoField()                              #PK
     descricao_setor = CharField(max_length=100)
@@ -66,6 +182,9 @@ class Lote(BaseModel):
 
     class Meta:
         table_name = 'lotes'
+        indexes = (
+            (('numero_lote',), False),
+        )
 
 class RacaAve(Enum):
     ISA_BROWN = "Isa Brown"
@@ -78,7 +197,7 @@ class RacaAve(Enum):
 
 class Aves(BaseModel):
     id_ave = AutoField()                                #PK
-    id_lote = CharField(max_length=50)                 
+    lote = ForeignKeyField(Lote, column_name='id_lote', backref='aves')
     raca_ave = CharField(max_length=100)               
     data_nascimento = DateField()
     tempo_de_vida = IntegerField()                     
@@ -92,6 +211,8 @@ class Aves(BaseModel):
     class Meta:
         table_name = 'aves'
 
+Aves.add_index(Aves.index(Aves.lote, where=SQL('"ativa" = 1'), name='aves_id_lote_ativas'))
+
 class CategoriaInsumo(Enum):
     RACAO = "Ração"
     MEDICAMENTO = "Medicamento"
@@ -118,6 +239,16 @@ class UnidadeMedida(Enum):
     SACO = "saco"
     CAIXA = "caixa"
 
+# Unidade base e quanto cada unidade padrão vale nela; saco e caixa dependem do insumo (ConversaoUnidade)
+UNIDADES_PADRAO = {
+    'g': ('g', 1),
+    'kg': ('g', 1000),
+    't': ('g', 1000000),
+    'L': ('mL', 1000),
+    'un': ('un', 1),
+}
+ESCALA_QUANTIDADE = 1000    # quantidade_base guarda milésimos da unidade base (inteiro, sem arredondar somas)
+
 class TipoInsumo(Enum):
     RACAO = "Ração"
     MEDICAMENTOS = "Medicamentos"
@@ -136,9 +267,14 @@ class InsumoNovo(BaseModel):
     ativo = BooleanField(default=True)
     data_criacao = DateTimeField(default=datetime.datetime.now)
     usuario_criacao = ForeignKeyField(Usuarios, backref='insumos_criados', null=True)
+    versao = IntegerField(default=0)    # incrementada a cada alteração de quantidade_atual
+    estoque_base = BigIntegerField(default=0)   # estoque em milésimos da unidade base; quantidade_atual o exibe na unidade do insumo
 
     class Meta:
         table_name = 'insumos_novo'
+        indexes = (
+            (('ativo', 'categoria'), False),
+        )
 
 class MovimentacaoInsumo(BaseModel):
     id_movimentacao = AutoField()
@@ -150,10 +286,64 @@ class MovimentacaoInsumo(BaseModel):
     usuarios = ForeignKeyField(Usuarios, backref='movimentacoes_insumo')
     estoque_anterior = DecimalField(max_digits=10, decimal_places=2)
     estoque_posterior = DecimalField(max_digits=10, decimal_places=2)
+    quantidade_base = BigIntegerField(default=0)        # quantidade em milésimos da unidade base do insumo
+    unidade = CharField(max_length=10, null=True)       # unidade em que a quantidade foi lançada
+    estoque_anterior_base = BigIntegerField(default=0)  # estoque_base antes e depois da movimentação;
+    estoque_posterior_base = BigIntegerField(default=0) # estoque_anterior/posterior são a exibição deles
 
     class Meta:
         table_name = 'movimentacoes_insumo'
+        indexes = (
+            (('insumo', 'tipo', 'data_movimentacao'), False),
+            (('insumo', 'data_movimentacao'), False),
+            (('tipo', 'data_movimentacao'), False),
+            (('data_movimentacao',), False),
+        )
     
+class ConversaoUnidade(BaseModel):
+    """Unidade própria de um insumo em termos de uma unidade padrão, ex.: 1 saco = 25 kg."""
+    id_conversao = AutoField()
+    insumo = ForeignKeyField(InsumoNovo, backref='conversoes', index=False)
+    unidade = CharField(max_length=10)
+    quantidade = DecimalField(max_digits=12, decimal_places=3)
+    unidade_referencia = CharField(max_length=10)
+    fator = BigIntegerField()       # quantidade_base de uma unidade
+
+    class Meta:
+        table_name = 'conversoes_unidade'
+        indexes = (
+            (('insumo', 'unidade'), True),
+        )
+
+class SaldoInsumo(BaseModel):
+    """Saldo de um insumo no início de data_corte: todas as movimentações anteriores a essa data aplicadas."""
+    id_saldo = AutoField()
+    insumo = ForeignKeyField(InsumoNovo, backref='saldos', index=False)
+    data_corte = DateField()
+    saldo_base = BigIntegerField()      # mesma escala de estoque_base
+    data_calculo = DateTimeField(default=datetime.datetime.now)
+
+    class Meta:
+        table_name = 'saldos_insumo'
+        indexes = (
+            (('insumo', 'data_corte'), True),
+        )
+
+class PrevisaoConsumo(BaseModel):
+    """Estado do modelo de consumo diário (suavização de Holt) de um insumo, ajustado até ultimo_dia."""
+    id_previsao = AutoField()
+    insumo = ForeignKeyField(InsumoNovo, backref='previsao', unique=True)
+    nivel = DoubleField()                   # consumo diário estimado em ultimo_dia
+    tendencia = DoubleField()               # variação do consumo por dia
+    variancia = DoubleField()               # variância dos erros de previsão de um dia
+    dias_ajustados = IntegerField()
+    ultimo_dia = DateField()
+    ultima_movimentacao = IntegerField()    # maior id_movimentacao já considerado
+    atualizado_em = DateTimeField(default=datetime.datetime.now)
+
+    class Meta:
+        table_name = 'previsoes_consumo'
+
 class Insumo(BaseModel):
     id_insumo = AutoField()                             #PK
     nome = CharField(max_length=100)                    #Nome do produto
@@ -190,6 +380,9 @@ class EstoqueVacina(BaseModel):
     
     class Meta:
         table_name = 'estoque_vacina'
+        indexes = (
+            (('data_validade',), False),
+        )
 
 class Vacinacao(BaseModel):
     id_vacinacao = AutoField()
@@ -198,12 +391,17 @@ class Vacinacao(BaseModel):
     tipo_vacina = CharField(
         choices=[member.value for member in TipoVacina]
     )
-    id_lote = CharField(max_length=50)  
+    # Sem índice próprio: o índice (id_lote, data_aplicacao) já cobre as buscas por lote
+    lote = ForeignKeyField(Lote, column_name='id_lote', backref='vacinacoes', index=False)
     quantidade_aves = IntegerField()
     observacoes = TextField(null=True)
     
     class Meta:
         table_name = 'vacinacao'
+        indexes = (
+            (('lote', 'data_aplicacao'), False),
+            (('data_aplicacao',), False),
+        )
 
 class StatusVacinacao(Enum):
     AGENDADA = 'AGENDADA'
@@ -223,30 +421,79 @@ class Producao(BaseModel):
     quantidade_aves = IntegerField()
     qualidade_producao = CharField(max_length=50)
     producao_nao_aproveitada = IntegerField(default=0)
-    id_lote = CharField(max_length=50)  
+    # Sem índice próprio: o índice único (id_lote, data_coleta) já cobre as buscas por lote
+    lote = ForeignKeyField(Lote, column_name='id_lote', backref='producoes', index=False)
     observacoes = TextField(null=True)
     responsavel = CharField(max_length=100)
 
     class Meta:
         table_name = 'producao'
+        indexes = (
+            (('data_coleta', 'lote'), False),
+            (('lote', 'data_coleta'), True),        # um registro por lote por dia
+        )
+
+class ProducaoDiaria(BaseModel):
+    """Totais de produção por lote e dia, mantidos pelo ProducaoController a cada escrita em Producao."""
+    id_producao_diaria = AutoField()
+    lote = ForeignKeyField(Lote, column_name='id_lote', backref='producao_diaria', index=False)
+    dia = DateField()
+    total_ovos = IntegerField(default=0)
+    total_perdas = IntegerField(default=0)
+    total_aves = IntegerField(default=0)
+    registros = IntegerField(default=0)
+
+    class Meta:
+        table_name = 'producao_diaria'
+        indexes = (
+            (('lote', 'dia'), True),
+            (('dia',), False),
+        )
 
 class UserActivityLog(BaseModel):
     id_log = AutoField(primary_key=True)
-    usuario_id = IntegerField()  
+    usuario = ForeignKeyField(Usuarios, column_name='usuario_id', backref='logs_atividade', null=True)  # None = sistema/anônimo
     acao = CharField(max_length=100)
     detalhes = TextField(null=True)
     data_acao = DateTimeField(default=lambda: datetime.datetime.now())
+    ip_address = CharField(max_length=45, null=True)
     
     class Meta:
         table_name = 'user_activity_logs'
+        indexes = (
+            (('usuario', 'data_acao'), False),
+        )
+
+class CategoriaAviso(Enum):
+    ESTOQUE = "Estoque"
+    MANUTENCAO = "Manutenção"
+    RELATORIOS = "Relatórios"
+    GERAL = "Geral"
+
+class PrioridadeAviso(Enum):
+    BAIXA = "Baixa"
+    NORMAL = "Normal"
+    ALTA = "Alta"
+    CRITICA = "Crítica"
+
+class SituacaoNotificacao(Enum):
+    ATIVO = "Ativo"
+    LIDA = "Lida"
+    ARQUIVADA = "Arquivada"
+    EXCLUIDA = "Excluída"
 
 class Avisos(BaseModel):
     id_aviso = AutoField(primary_key=True)
     titulo = CharField(max_length=200)
     mensagem = TextField()
-    tipo = CharField(max_length=50)  
+    tipo = CharField(max_length=50)                     # CategoriaAviso
+    prioridade = CharField(max_length=20, default=PrioridadeAviso.NORMAL.value)
     data_criacao = DateTimeField(default=lambda: datetime.datetime.now())
+    data_validade = DateTimeField(null=True)
+    criado_por = ForeignKeyField(Usuarios, backref='avisos_criados', null=True)     # None = aviso automático
     ativo = BooleanField(default=True)
+    data_exclusao = DateTimeField(null=True)
+    excluido_por = ForeignKeyField(Usuarios, backref='avisos_excluidos', null=True)
     
     class Meta:
         table_name = 'avisos'
@@ -255,22 +502,54 @@ class NotificacaoUsuario(BaseModel):
     id_notificacao = AutoField(primary_key=True)
     usuario = ForeignKeyField(Usuarios, backref='notificacoes')
     aviso = ForeignKeyField(Avisos, backref='notificacoes')
-    lida = BooleanField(default=False)
+    status = CharField(max_length=20, default=SituacaoNotificacao.ATIVO.value)
     data_leitura = DateTimeField(null=True)
+    data_criacao = DateTimeField(default=lambda: datetime.datetime.now())
     
     class Meta:
         table_name = 'notificacao_usuario'
+        indexes = (
+            (('usuario', 'status'), False),
+        )
 
 class HistoricoAvisos(BaseModel):
     id_historico = AutoField(primary_key=True)
     aviso = ForeignKeyField(Avisos, backref='historicos')
-    usuario_modificador = ForeignKeyField(Usuarios)
+    usuario_modificador = ForeignKeyField(Usuarios, null=True)                      # None = ação automática
     acao = CharField(max_length=50)  
+    detalhes = TextField(null=True)
     data_acao = DateTimeField(default=lambda: datetime.datetime.now())
     
     class Meta:
         table_name = 'historico_avisos'
 
+class RegraAlerta(BaseModel):
+    """Configuração de uma regra de alerta; regras sem linha aqui usam o padrão de REGRAS_ALERTA."""
+    id_regra = AutoField(primary_key=True)
+    codigo = CharField(max_length=50, unique=True)
+    limite = DoubleField()
+    janela_dias = IntegerField()
+    prioridade = CharField(max_length=20)               # nome de PrioridadeAviso
+    ativa = BooleanField(default=True)
+
+    class Meta:
+        table_name = 'regras_alerta'
+
+class AlertaEmitido(BaseModel):
+    """Alerta em aberto. O fingerprint único impede avisar duas vezes a mesma ocorrência."""
+    id_alerta = AutoField(primary_key=True)
+    fingerprint = CharField(max_length=40, unique=True)
+    regra = CharField(max_length=50)
+    entidade = CharField(max_length=50)                 # ex.: "insumo:12", "lote:3"
+    aviso = ForeignKeyField(Avisos, backref='alertas', null=True)
+    criado_em = DateTimeField(default=lambda: datetime.datetime.now())
+
+    class Meta:
+        table_name = 'alertas_emitidos'
+        indexes = (
+            (('regra', 'entidade'), False),
+        )
+
 class HistoricoProducao(BaseModel):
     id_historico = AutoField(primary_key=True)
     producao = ForeignKeyField(Producao, backref='historicos')
@@ -302,6 +581,26 @@ class PrioridadeNotificacao(BaseModel):
     class Meta:
         table_name = 'prioridade_notificacao'
 
+class ExecucaoTarefa(BaseModel):
+    """Estado de cada tarefa periódica do agendador, compartilhado entre os workers."""
+    id_tarefa = AutoField(primary_key=True)
+    nome = CharField(max_length=50, unique=True)
+    agenda = CharField(max_length=100)                  # expressão cron com 5 campos
+    proxima_execucao = DateTimeField()
+    ultima_execucao = DateTimeField(null=True)
+    ultimo_status = CharField(max_length=10, null=True) # "ok" ou "erro"
+    ultimo_erro = TextField(null=True)
+    ultima_duracao_ms = DoubleField(null=True)
+    duracao_total_ms = DoubleField(default=0)
+    duracao_max_ms = DoubleField(default=0)
+    execucoes = IntegerField(default=0)
+    falhas = IntegerField(default=0)
+    lease_dono = CharField(max_length=100, null=True)   # worker executando a tarefa agora
+    lease_ate = DateTimeField(null=True)                # lease expirado = worker caiu; outro pode assumir
+
+    class Meta:
+        table_name = 'tarefas_agendadas'
+
 class RelatoriosMortalidade(BaseModel):
     id_mortalidade = AutoField(primary_key=True)
     data_hora_evento = DateTimeField()
@@ -316,6 +615,11 @@ class RelatoriosMortalidade(BaseModel):
     
     class Meta:
         table_name = 'relatorios_mortalidade'
+        indexes = (
+            (('data_hora_evento',), False),
+            (('lote', 'data_hora_evento'), False),
+            (('setor', 'data_hora_evento'), False),
+        )
 
 class StatusNotificacao(BaseModel):
     id_status = AutoField(primary_key=True)
@@ -325,10 +629,8 @@ class StatusNotificacao(BaseModel):
     class Meta:
         table_name = 'status_notificacao'
 
-db.connect()
-db.create_tables([Granja, Usuarios, Insumo, InsumoNovo, MovimentacaoInsumo, Lote, Setor, 
-                  EstoqueVacina, Vacinacao, Aves, Producao, 
-                  UserActivityLog, Avisos, NotificacaoUsuario, HistoricoAvisos, 
-                  HistoricoProducao, CategoriaNotificacao, PrioridadeNotificacao, 
-                  StatusNotificacao], safe=True)
-db.create_tables([RelatoriosMortalidade], safe=True)
\ No newline at end of file
+MODELOS = [Granja, Usuarios, Insumo, InsumoNovo, MovimentacaoInsumo, ConversaoUnidade, SaldoInsumo, PrevisaoConsumo, Lote, Setor, 
+           EstoqueVacina, Vacinacao, Aves, Producao, ProducaoDiaria, 
+           UserActivityLog, Avisos, NotificacaoUsuario, HistoricoAvisos, RegraAlerta, AlertaEmitido, 
+           HistoricoProducao, CategoriaNotificacao, PrioridadeNotificacao, 
+           StatusNotificacao, RelatoriosMortalidade, ExecucaoTarefa]
\ No newline at end of file
@@ -0,0 +1,401 @@
+import datetime
+import logging
+import os
+import sqlite3
+from peewee import IntegerField, BigIntegerField, CharField, DateTimeField, BooleanField, TextField, ForeignKeyField
+from playhouse.migrate import SqliteMigrator, migrate
+from app.models.database import db, BaseModel, MODELOS, Usuarios, UNIDADES_PADRAO, ESCALA_QUANTIDADE
+
+logger = logging.getLogger(__name__)
+
+class VersaoSchema(BaseModel):
+    versao = IntegerField(primary_key=True)
+    descricao = CharField(max_length=200)
+    aplicada_em = DateTimeField(default=datetime.datetime.now)
+
+    class Meta:
+        table_name = 'schema_version'
+
+_MIGRACOES = []
+
+def migracao(versao: int, descricao: str):
+    """Registra uma migração. As versões são aplicadas em ordem crescente e nunca revertidas."""
+    def decorator(func):
+        if any(m[0] == versao for m in _MIGRACOES):
+            raise ValueError(f"Migração {versao} registrada duas vezes")
+        _MIGRACOES.append((versao, descricao, func))
+        _MIGRACOES.sort(key=lambda m: m[0])
+        return func
+    return decorator
+
+def _criar_indice(nome: str, tabela: str, colunas: list, where: str = None, unico: bool = False):
+    colunas_sql = ', '.join(f'"{c}"' for c in colunas)
+    sql = f'CREATE {"UNIQUE " if unico else ""}INDEX IF NOT EXISTS "{nome}" ON "{tabela}" ({colunas_sql})'
+    if where:
+        sql += f' WHERE {where}'
+    db.execute_sql(sql)
+
+def _reconstruir_tabela(tabela: str, definicoes: dict):
+    """Troca a definição de colunas de `tabela` ({coluna: definição SQL completa}).
+
+    O SQLite não altera colunas existentes; segue o procedimento da documentação dele:
+    cria a tabela nova, copia os dados (INSERT ... SELECT), apaga a antiga, renomeia a
+    nova e recria os índices. As demais colunas (tabelas com chave primária simples) e
+    as chaves estrangeiras vêm de PRAGMA table_info e foreign_key_list.
+    """
+    indices = [sql for (sql,) in db.execute_sql("SELECT sql FROM sqlite_master WHERE type = 'index' "
+                                                "AND tbl_name = ? AND sql IS NOT NULL", (tabela,))]
+    colunas, nomes = [], []
+    for _, nome, tipo, not_null, padrao, pk in db.execute_sql(f'PRAGMA table_info("{tabela}")'):
+        nomes.append(f'"{nome}"')
+        definicao = definicoes.get(nome)
+        if definicao is None:
+            definicao = f'"{nome}" {tipo}'
+            definicao += ' NOT NULL' if not_null else ''
+            definicao += ' PRIMARY KEY' if pk else ''
+            definicao += f' DEFAULT {padrao}' if padrao is not None else ''
+        colunas.append(definicao)
+    for _, _, referencia, coluna, referenciada, *_ in db.execute_sql(f'PRAGMA foreign_key_list("{tabela}")'):
+        if coluna not in definicoes:
+            colunas.append(f'FOREIGN KEY ("{coluna}") REFERENCES "{referencia}" ("{referenciada}")')
+
+    nova = f'{tabela}__nova'
+    db.execute_sql(f'CREATE TABLE "{nova}" ({", ".join(colunas)})')
+    db.execute_sql(f'INSERT INTO "{nova}" ({", ".join(nomes)}) SELECT {", ".join(nomes)} FROM "{tabela}"')
+    db.execute_sql(f'DROP TABLE "{tabela}"')
+    db.execute_sql(f'ALTER TABLE "{nova}" RENAME TO "{tabela}"')
+    for sql in indices:
+        db.execute_sql(sql)
+
+# ===== MIGRAÇÕES =====
+# Os nomes dos índices seguem a convenção do peewee para que bancos novos
+# (criados a partir dos Meta.indexes dos modelos) e bancos migrados fiquem iguais.
+
+@migracao(1, 'Índices dos filtros de relatórios')
+def _m0001_indices_relatorios(migrator):
+    _criar_indice('producao_data_coleta_id_lote', 'producao', ['data_coleta', 'id_lote'])
+    _criar_indice('producao_id_lote_data_coleta', 'producao', ['id_lote', 'data_coleta'])
+    _criar_indice('movimentacaoinsumo_insumo_id_tipo_data_movimentacao', 'movimentacoes_insumo',
+                  ['insumo_id', 'tipo', 'data_movimentacao'])
+    _criar_indice('movimentacaoinsumo_tipo_data_movimentacao', 'movimentacoes_insumo',
+                  ['tipo', 'data_movimentacao'])
+    _criar_indice('movimentacaoinsumo_data_movimentacao', 'movimentacoes_insumo', ['data_movimentacao'])
+    _criar_indice('vacinacao_id_lote_data_aplicacao', 'vacinacao', ['id_lote', 'data_aplicacao'])
+    _criar_indice('vacinacao_data_aplicacao', 'vacinacao', ['data_aplicacao'])
+    _criar_indice('relatoriosmortalidade_data_hora_evento', 'relatorios_mortalidade', ['data_hora_evento'])
+    _criar_indice('relatoriosmortalidade_lote_id_data_hora_evento', 'relatorios_mortalidade',
+                  ['lote_id', 'data_hora_evento'])
+    _criar_indice('relatoriosmortalidade_setor_id_data_hora_evento', 'relatorios_mortalidade',
+                  ['setor_id', 'data_hora_evento'])
+    _criar_indice('estoquevacina_data_validade', 'estoque_vacina', ['data_validade'])
+    _criar_indice('insumonovo_ativo_categoria', 'insumos_novo', ['ativo', 'categoria'])
+    _criar_indice('aves_id_lote_ativas', 'aves', ['id_lote'], where='"ativa" = 1')
+    db.execute_sql('ANALYZE')
+
+@migracao(2, 'Usuários, log de atividades e avisos no banco único')
+def _m0002_usuarios_avisos(migrator):
+    migrate(
+        migrator.add_column('granja', 'nome_granja', CharField(max_length=100, null=True)),
+        migrator.add_column('usuarios', 'ativo', BooleanField(default=True)),
+
+        migrator.drop_not_null('user_activity_logs', 'usuario_id'),
+        migrator.add_column('user_activity_logs', 'ip_address', CharField(max_length=45, null=True)),
+
+        migrator.add_column('avisos', 'prioridade', CharField(max_length=20, default='Normal')),
+        migrator.add_column('avisos', 'data_validade', DateTimeField(null=True)),
+        migrator.add_column('avisos', 'criado_por_id',
+                            ForeignKeyField(Usuarios, field=Usuarios.id_usuario, null=True)),
+        migrator.add_column('avisos', 'data_exclusao', DateTimeField(null=True)),
+        migrator.add_column('avisos', 'excluido_por_id',
+                            ForeignKeyField(Usuarios, field=Usuarios.id_usuario, null=True)),
+
+        migrator.add_column('notificacao_usuario', 'status', CharField(max_length=20, default='Ativo')),
+        migrator.add_column('notificacao_usuario', 'data_criacao', DateTimeField(null=True)),
+
+        migrator.drop_not_null('historico_avisos', 'usuario_modificador_id'),
+        migrator.add_column('historico_avisos', 'detalhes', TextField(null=True)),
+    )
+
+    # `lida` vira o status LIDA; a data de criação das notificações antigas é a do aviso
+    db.execute_sql('UPDATE "notificacao_usuario" SET "status" = \'Lida\' WHERE "lida" = 1')
+    db.execute_sql('UPDATE "notificacao_usuario" SET "data_criacao" = '
+                   '(SELECT "data_criacao" FROM "avisos" WHERE "avisos"."id_aviso" = "notificacao_usuario"."aviso_id")')
+    migrate(
+        migrator.drop_column('notificacao_usuario', 'lida'),
+        migrator.add_not_null('notificacao_usuario', 'data_criacao'),
+    )
+
+    _criar_indice('useractivitylog_usuario_id_data_acao', 'user_activity_logs', ['usuario_id', 'data_acao'])
+    _criar_indice('notificacaousuario_usuario_id_status', 'notificacao_usuario', ['usuario_id', 'status'])
+    _criar_indice('avisos_criado_por_id', 'avisos', ['criado_por_id'])
+    _criar_indice('avisos_excluido_por_id', 'avisos', ['excluido_por_id'])
+
+def _resolver_lote_legado(valor) -> int:
+    """Converte um id_lote textual antigo no id de um lote existente.
+
+    Procura primeiro pelo número do lote e, se o valor for numérico, pelo id.
+    Valores que não correspondem a nenhum lote ganham um lote inativo de
+    espera com esse número, para que nenhum registro perca a referência.
+    """
+    texto = str(valor).strip() or 'SEM-LOTE'
+    linha = db.execute_sql('SELECT "id_lote" FROM "lotes" WHERE "numero_lote" = ? ORDER BY "id_lote" LIMIT 1',
+                           (texto,)).fetchone()
+    if linha is None and texto.isdigit():
+        linha = db.execute_sql('SELECT "id_lote" FROM "lotes" WHERE "id_lote" = ?', (int(texto),)).fetchone()
+    if linha is not None:
+        return linha[0]
+
+    cursor = db.execute_sql(
+        'INSERT INTO "lotes" ("numero_lote", "data_entrada", "quantidade_inicial", "idade_inicial", '
+        '"raca", "fornecedor", "observacoes", "ativo") VALUES (?, ?, 0, 0, ?, ?, ?, 0)',
+        (texto, datetime.date.today(), 'Não informada', 'Não informado',
+         'Criado pela migração 3: lote referenciado por registros antigos e não cadastrado.'))
+    logger.warning("Lote '%s' não encontrado; criado lote inativo %s", texto, cursor.lastrowid)
+    return cursor.lastrowid
+
+@migracao(3, 'Chaves estrangeiras inteiras para lote em produção, aves e vacinação')
+def _m0003_fk_lote(migrator):
+    tabelas = ('producao', 'aves', 'vacinacao')
+    _criar_indice('lote_numero_lote', 'lotes', ['numero_lote'])
+
+    valores = set()
+    for tabela in tabelas:
+        valores.update(v for (v,) in db.execute_sql(f'SELECT DISTINCT CAST("id_lote" AS TEXT) FROM "{tabela}"'))
+
+    # Resolve tudo antes de atualizar, para que um id recém-gravado não seja confundido com um valor antigo
+    db.execute_sql('CREATE TEMP TABLE "_mapa_lote" ("antigo" TEXT PRIMARY KEY, "novo" INTEGER NOT NULL)')
+    for valor in valores:
+        db.execute_sql('INSERT INTO "_mapa_lote" VALUES (?, ?)', (valor, _resolver_lote_legado(valor)))
+    for tabela in tabelas:
+        db.execute_sql(f'UPDATE "{tabela}" SET "id_lote" = (SELECT "novo" FROM "_mapa_lote" '
+                       f'WHERE "antigo" = CAST("{tabela}"."id_lote" AS TEXT))')
+    db.execute_sql('DROP TABLE "_mapa_lote"')
+
+    # Recria as colunas como INTEGER REFERENCES lotes; a afinidade INTEGER converte os valores copiados.
+    # alter_column_type() não gera a cláusula REFERENCES no SQLite, por isso a definição é escrita aqui.
+    for tabela in tabelas:
+        _reconstruir_tabela(tabela, {'id_lote': '"id_lote" INTEGER NOT NULL REFERENCES "lotes" ("id_lote")'})
+    _criar_indice('aves_id_lote', 'aves', ['id_lote'])
+    db.execute_sql('ANALYZE')
+
+@migracao(4, 'Resumo diário de produção por lote')
+def _m0004_producao_diaria(migrator):
+    db.execute_sql(
+        'CREATE TABLE IF NOT EXISTS "producao_diaria" ("id_producao_diaria" INTEGER NOT NULL PRIMARY KEY, '
+        '"id_lote" INTEGER NOT NULL, "dia" DATE NOT NULL, "total_ovos" INTEGER NOT NULL, '
+        '"total_perdas" INTEGER NOT NULL, "total_aves" INTEGER NOT NULL, "registros" INTEGER NOT NULL, '
+        'FOREIGN KEY ("id_lote") REFERENCES "lotes" ("id_lote"))')
+    _criar_indice('producaodiaria_id_lote_dia', 'producao_diaria', ['id_lote', 'dia'], unico=True)
+    _criar_indice('producaodiaria_dia', 'producao_diaria', ['dia'])
+    # Várias coletas no mesmo dia contam as mesmas aves: o plantel do dia é o maior valor informado
+    db.execute_sql(
+        'INSERT INTO "producao_diaria" ("id_lote", "dia", "total_ovos", "total_perdas", "total_aves", "registros") '
+        'SELECT "id_lote", "data_coleta", SUM("quantidade_ovos"), SUM("producao_nao_aproveitada"), '
+        'MAX("quantidade_aves"), COUNT(*) FROM "producao" GROUP BY "id_lote", "data_coleta"')
+
+@migracao(5, 'Um registro de produção por lote por dia')
+def _m0005_producao_unica(migrator):
+    # Registros repetidos do mesmo lote e dia vieram de formulários reenviados: fica o mais recente
+    db.execute_sql('CREATE TEMP TABLE "_producao_duplicada" AS '
+                   'SELECT p."id_producao" AS "removido", m."mantido" FROM "producao" AS p '
+                   'JOIN (SELECT "id_lote", "data_coleta", MAX("id_producao") AS "mantido" FROM "producao" '
+                   '      GROUP BY "id_lote", "data_coleta" HAVING COUNT(*) > 1) AS m '
+                   'ON m."id_lote" = p."id_lote" AND m."data_coleta" = p."data_coleta" '
+                   'WHERE p."id_producao" <> m."mantido"')
+    removidos = db.execute_sql('SELECT COUNT(*) FROM "_producao_duplicada"').fetchone()[0]
+    if removidos:
+        logger.warning("Migração 5: %d registro(s) de produção duplicado(s) removido(s)", removidos)
+        db.execute_sql('UPDATE "historico_producao" SET "producao_id" = '
+                       '(SELECT "mantido" FROM "_producao_duplicada" WHERE "removido" = "producao_id") '
+                       'WHERE "producao_id" IN (SELECT "removido" FROM "_producao_duplicada")')
+        db.execute_sql('DELETE FROM "producao" WHERE "id_producao" IN (SELECT "removido" FROM "_producao_duplicada")')
+    db.execute_sql('DROP TABLE "_producao_duplicada"')
+
+    db.execute_sql('DROP INDEX IF EXISTS "producao_id_lote_data_coleta"')
+    _criar_indice('producao_id_lote_data_coleta', 'producao', ['id_lote', 'data_coleta'], unico=True)
+
+    if removidos:
+        # O resumo diário somava as duplicatas; refaz com os registros que ficaram
+        db.execute_sql('DELETE FROM "producao_diaria"')
+        db.execute_sql(
+            'INSERT INTO "producao_diaria" ("id_lote", "dia", "total_ovos", "total_perdas", "total_aves", "registros") '
+            'SELECT "id_lote", "data_coleta", SUM("quantidade_ovos"), SUM("producao_nao_aproveitada"), '
+            'MAX("quantidade_aves"), COUNT(*) FROM "producao" GROUP BY "id_lote", "data_coleta"')
+
+@migracao(6, 'Versão do estoque de insumos')
+def _m0006_versao_insumo(migrator):
+    migrate(migrator.add_column('insumos_novo', 'versao', IntegerField(default=0)))
+
+@migracao(7, 'Saldos mensais de insumos (checkpoints do estoque)')
+def _m0007_saldos_insumo(migrator):
+    db.execute_sql(
+        'CREATE TABLE IF NOT EXISTS "saldos_insumo" ("id_saldo" INTEGER NOT NULL PRIMARY KEY, '
+        '"insumo_id" INTEGER NOT NULL, "data_corte" DATE NOT NULL, "saldo" DECIMAL(10, 2) NOT NULL, '
+        '"data_calculo" DATETIME NOT NULL, FOREIGN KEY ("insumo_id") REFERENCES "insumos_novo" ("id_insumo"))')
+    _criar_indice('saldoinsumo_insumo_id_data_corte', 'saldos_insumo', ['insumo_id', 'data_corte'], unico=True)
+    _criar_indice('movimentacaoinsumo_insumo_id_data_movimentacao', 'movimentacoes_insumo',
+                  ['insumo_id', 'data_movimentacao'])
+
+@migracao(8, 'Estado da previsão de consumo de insumos')
+def _m0008_previsoes_consumo(migrator):
+    db.execute_sql(
+        'CREATE TABLE IF NOT EXISTS "previsoes_consumo" ("id_previsao" INTEGER NOT NULL PRIMARY KEY, '
+        '"insumo_id" INTEGER NOT NULL, "nivel" REAL NOT NULL, "tendencia" REAL NOT NULL, '
+        '"variancia" REAL NOT NULL, "dias_ajustados" INTEGER NOT NULL, "ultimo_dia" DATE NOT NULL, '
+        '"ultima_movimentacao" INTEGER NOT NULL, "atualizado_em" DATETIME NOT NULL, '
+        'FOREIGN KEY ("insumo_id") REFERENCES "insumos_novo" ("id_insumo"))')
+    _criar_indice('previsaoconsumo_insumo_id', 'previsoes_consumo', ['insumo_id'], unico=True)
+
+@migracao(9, 'Quantidade das movimentações de insumos na unidade base, em inteiros')
+def _m0009_quantidade_base(migrator):
+    migrate(migrator.add_column('movimentacoes_insumo', 'quantidade_base', BigIntegerField(default=0)),
+            migrator.add_column('movimentacoes_insumo', 'unidade', CharField(max_length=10, null=True)))
+    db.execute_sql(
+        'CREATE TABLE IF NOT EXISTS "conversoes_unidade" ("id_conversao" INTEGER NOT NULL PRIMARY KEY, '
+        '"insumo_id" INTEGER NOT NULL, "unidade" VARCHAR(10) NOT NULL, "quantidade" DECIMAL(12, 3) NOT NULL, '
+        '"unidade_referencia" VARCHAR(10) NOT NULL, "fator" INTEGER NOT NULL, '
+        'FOREIGN KEY ("insumo_id") REFERENCES "insumos_novo" ("id_insumo"))')
+    _criar_indice('conversaounidade_insumo_id_unidade', 'conversoes_unidade', ['insumo_id', 'unidade'], unico=True)
+
+    # Até aqui toda movimentação estava na unidade do insumo; saco e caixa viram a própria unidade base
+    fatores = ' '.join(f"WHEN '{unidade}' THEN {fator * ESCALA_QUANTIDADE}"
+                       for unidade, (_, fator) in UNIDADES_PADRAO.items())
+    db.execute_sql(
+        'UPDATE "movimentacoes_insumo" SET "unidade" = (SELECT "unidade" FROM "insumos_novo" '
+        'WHERE "id_insumo" = "movimentacoes_insumo"."insumo_id")')
+    db.execute_sql(
+        f'UPDATE "movimentacoes_insumo" SET "quantidade_base" = CAST(ROUND("quantidade" * '
+        f'CASE "unidade" {fatores} ELSE {ESCALA_QUANTIDADE} END) AS INTEGER)')
+
+@migracao(10, 'Regras de alerta configuráveis e alertas emitidos')
+def _m0010_alertas(migrator):
+    db.execute_sql(
+        'CREATE TABLE IF NOT EXISTS "regras_alerta" ("id_regra" INTEGER NOT NULL PRIMARY KEY, '
+        '"codigo" VARCHAR(50) NOT NULL, "limite" REAL NOT NULL, "janela_dias" INTEGER NOT NULL, '
+        '"prioridade" VARCHAR(20) NOT NULL, "ativa" INTEGER NOT NULL)')
+    _criar_indice('regraalerta_codigo', 'regras_alerta', ['codigo'], unico=True)
+    db.execute_sql(
+        'CREATE TABLE IF NOT EXISTS "alertas_emitidos" ("id_alerta" INTEGER NOT NULL PRIMARY KEY, '
+        '"fingerprint" VARCHAR(40) NOT NULL, "regra" VARCHAR(50) NOT NULL, "entidade" VARCHAR(50) NOT NULL, '
+        '"aviso_id" INTEGER, "criado_em" DATETIME NOT NULL, '
+        'FOREIGN KEY ("aviso_id") REFERENCES "avisos" ("id_aviso"))')
+    _criar_indice('alertaemitido_fingerprint', 'alertas_emitidos', ['fingerprint'], unico=True)
+    _criar_indice('alertaemitido_regra_entidade', 'alertas_emitidos', ['regra', 'entidade'])
+    _criar_indice('alertaemitido_aviso_id', 'alertas_emitidos', ['aviso_id'])
+
+@migracao(11, 'Estado das tarefas periódicas do agendador')
+def _m0011_tarefas_agendadas(migrator):
+    db.execute_sql(
+        'CREATE TABLE IF NOT EXISTS "tarefas_agendadas" ("id_tarefa" INTEGER NOT NULL PRIMARY KEY, '
+        '"nome" VARCHAR(50) NOT NULL, "agenda" VARCHAR(100) NOT NULL, "proxima_execucao" DATETIME NOT NULL, '
+        '"ultima_execucao" DATETIME, "ultimo_status" VARCHAR(10), "ultimo_erro" TEXT, '
+        '"ultima_duracao_ms" REAL, "duracao_total_ms" REAL NOT NULL, "duracao_max_ms" REAL NOT NULL, '
+        '"execucoes" INTEGER NOT NULL, "falhas" INTEGER NOT NULL, "lease_dono" VARCHAR(100), "lease_ate" DATETIME)')
+    _criar_indice('execucaotarefa_nome', 'tarefas_agendadas', ['nome'], unico=True)
+
+def _fator_estoque(insumo_id: str, unidade: str) -> str:
+    """Expressão SQL do fator da unidade de estoque: conversão própria (saco, caixa) ou a padrão."""
+    fatores = ' '.join(f"WHEN '{u}' THEN {fator * ESCALA_QUANTIDADE}" for u, (_, fator) in UNIDADES_PADRAO.items())
+    return (f'COALESCE((SELECT "fator" FROM "conversoes_unidade" WHERE "insumo_id" = {insumo_id} '
+            f'AND "unidade" = {unidade}), CASE {unidade} {fatores} ELSE {ESCALA_QUANTIDADE} END)')
+
+@migracao(12, 'Estoque dos insumos na unidade base, em inteiros')
+def _m0012_estoque_base(migrator):
+    migrate(migrator.add_column('insumos_novo', 'estoque_base', BigIntegerField(default=0)))
+    # Mesmo fator das movimentações
+    fator = _fator_estoque('"insumos_novo"."id_insumo"', '"insumos_novo"."unidade"')
+    db.execute_sql(f'UPDATE "insumos_novo" SET "estoque_base" = CAST(ROUND("quantidade_atual" * {fator}) AS INTEGER)')
+
+@migracao(13, 'Chave estrangeira de usuário no log de atividades')
+def _m0013_fk_usuario_log(migrator):
+    # A migração 2 só tirou o NOT NULL: bancos antigos ficaram sem REFERENCES e sem o índice da FK.
+    # Logs de usuários que não existem mais passam a ser do sistema (NULL), como nos bancos novos.
+    orfaos = db.execute_sql('UPDATE "user_activity_logs" SET "usuario_id" = NULL WHERE "usuario_id" NOT IN '
+                            '(SELECT "id_usuario" FROM "usuarios")').rowcount
+    if orfaos:
+        logger.warning("Migração 13: %d log(s) de usuário inexistente atribuído(s) ao sistema", orfaos)
+    _reconstruir_tabela('user_activity_logs',
+                        {'usuario_id': '"usuario_id" INTEGER REFERENCES "usuarios" ("id_usuario")'})
+    _criar_indice('useractivitylog_usuario_id', 'user_activity_logs', ['usuario_id'])
+
+@migracao(14, 'Estoque das movimentações e checkpoints de insumos na unidade base')
+def _m0014_historico_estoque_base(migrator):
+    # Com o histórico e os checkpoints em estoque_base, mudar o peso da unidade de estoque
+    # (ex.: saco de 25 para 20 kg) só muda a exibição, e o inventário continua batendo com o estoque
+    migrate(migrator.add_column('movimentacoes_insumo', 'estoque_anterior_base', BigIntegerField(default=0)),
+            migrator.add_column('movimentacoes_insumo', 'estoque_posterior_base', BigIntegerField(default=0)),
+            migrator.add_column('saldos_insumo', 'saldo_base', BigIntegerField(default=0)))
+
+    unidade = '(SELECT "unidade" FROM "insumos_novo" WHERE "id_insumo" = "movimentacoes_insumo"."insumo_id")'
+    fator = _fator_estoque('"movimentacoes_insumo"."insumo_id"', unidade)
+    db.execute_sql(f'UPDATE "movimentacoes_insumo" SET '
+                   f'"estoque_anterior_base" = CAST(ROUND("estoque_anterior" * {fator}) AS INTEGER), '
+                   f'"estoque_posterior_base" = CAST(ROUND("estoque_posterior" * {fator}) AS INTEGER)')
+
+    unidade = '(SELECT "unidade" FROM "insumos_novo" WHERE "id_insumo" = "saldos_insumo"."insumo_id")'
+    fator = _fator_estoque('"saldos_insumo"."insumo_id"', unidade)
+    db.execute_sql(f'UPDATE "saldos_insumo" SET "saldo_base" = CAST(ROUND("saldo" * {fator}) AS INTEGER)')
+    migrate(migrator.drop_column('saldos_insumo', 'saldo'))
+
+# ===== EXECUÇÃO =====
+
+def versao_atual() -> int:
+    if not db.table_exists(VersaoSchema._meta.table_name):
+        return 0
+    return VersaoSchema.select(VersaoSchema.versao).order_by(VersaoSchema.versao.desc()).scalar() or 0
+
+def migracoes_pendentes() -> list:
+    atual = versao_atual()
+    return [m for m in _MIGRACOES if m[0] > atual]
+
+def _backup(versao: int) -> str:
+    """Copia o banco antes de alterar o schema, usando a API de backup do SQLite."""
+    caminho = db.database
+    if not caminho or caminho == ':memory:' or not os.path.exists(caminho):
+        return None
+
+    destino = f"{caminho}.v{versao}-{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}.bak"
+    copia = sqlite3.connect(destino)
+    try:
+        db.connection().backup(copia)
+    finally:
+        copia.close()
+    return destino
+
+def migrar(backup: bool = True) -> int:
+    """Leva o banco até a versão mais recente.
+
+    Banco vazio: cria as tabelas a partir dos modelos e registra todas as versões.
+    Banco existente: aplica apenas as migrações pendentes, cada uma em sua transação.
+    Retorna o número de migrações aplicadas.
+    """
+    tabelas = set(db.get_tables())
+    banco_novo = not any(m._meta.table_name in tabelas for m in MODELOS)
+
+    db.create_tables([VersaoSchema], safe=True)
+
+    if banco_novo:
+        with db.atomic():
+            db.create_tables(MODELOS, safe=True)
+            for versao, descricao, _ in _MIGRACOES:
+                VersaoSchema.create(versao=versao, descricao=descricao)
+        logger.info("Banco criado na versão %s", versao_atual())
+        return 0
+
+    pendentes = migracoes_pendentes()
+    if not pendentes:
+        return 0
+
+    if backup:
+        destino = _backup(versao_atual())
+        if destino:
+            logger.info("Backup do banco gravado em %s", destino)
+
+    migrator = SqliteMigrator(db)
+    for versao, descricao, func in pendentes:
+        logger.info("Aplicando migração %s: %s", versao, descricao)
+        with db.atomic():
+            func(migrator)
+            VersaoSchema.create(versao=versao, descricao=descricao)
+
+    return len(pendentes)
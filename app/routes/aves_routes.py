@@ -164,7 +164,7 @@ def editar(ave_id):
     # Preencher formulário com dados atuais
     if request.method == 'GET':
         try:
-            form.id_lote.data = ave_data.get('id_lote', '')
+            form.id_lote.data = ave_data.get('numero_lote', '')
             form.raca_ave.data = ave_data.get('raca_ave', '')
             data_nasc = ave_data.get('data_nascimento')
             if data_nasc:
@@ -1,11 +1,11 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
-from app.forms.insumo_forms import InsumoForm, MovimentacaoInsumoForm
+from flask import Blueprint, current_app, render_template, redirect, url_for, flash, request, jsonify
+from app.forms.insumo_forms import InsumoForm, MovimentacaoInsumoForm, MovimentacaoLoteForm
 from app.controllers.insumo_controller import InsumoController, MovimentacaoInsumoController
 from app.models.database import InsumoNovo, CategoriaInsumo, TipoMovimentacao
 from app.exceptions import BusinessError
 from datetime import date, datetime, timedelta
 from decimal import Decimal
-from app.controllers.export_controller import RelatoriosInsumosController
+from app.controllers.export_controller import RelatoriosInsumosController, AGRUPAMENTOS
 
 insumo_web = Blueprint('insumo_web', __name__, url_prefix='/insumos')
 
@@ -140,18 +140,24 @@ def listar_movimentacoes():
     if data_fim:
         data_fim = datetime.strptime(data_fim, '%Y-%m-%d').date()
     
-    movimentacoes = MovimentacaoInsumoController.listar_movimentacoes(
+    pagina = MovimentacaoInsumoController.listar_movimentacoes(
         insumo_id=insumo_id,
         tipo=tipo,
         data_inicio=data_inicio,
-        data_fim=data_fim
+        data_fim=data_fim,
+        apos=request.args.get('apos', type=int),
+        antes=request.args.get('antes', type=int)
     )
     
     # Para o select de insumos
-    insumos = InsumoController.listar_todos(ativo=True)
+    insumos = InsumoController.listar_opcoes(ativo=True)
     
     return render_template('insumo/movimentacoes.html',
-                         movimentacoes=movimentacoes,
+                         movimentacoes=pagina['movimentacoes'],
+                         proximo=pagina['proximo'],
+                         anterior=pagina['anterior'],
+                         filtros_url={chave: valor for chave, valor in request.args.items()
+                                      if valor and chave not in ('apos', 'antes')},
                          insumos=insumos,
                          tipos=TipoMovimentacao,
                          filtros={
@@ -180,7 +186,8 @@ def nova_movimentacao():
                 quantidade=form.quantidade.data,
                 data_movimentacao=form.data_movimentacao.data,
                 observacoes=form.observacoes.data,
-                usuario_id=1 
+                usuario_id=1,
+                unidade=form.unidade.data or None
             )
             
             flash('✅ Movimentação registrada com sucesso!', 'success')
@@ -191,6 +198,46 @@ def nova_movimentacao():
     
     return render_template('insumo/nova_movimentacao.html', form=form)
 
+@insumo_web.route('/movimentacoes/lote', methods=['GET', 'POST'])
+def nova_movimentacao_lote():
+    """Várias movimentações de uma vez (ex.: trato diário), gravadas juntas ou nenhuma"""
+    form = MovimentacaoLoteForm()
+    insumos_ativos = InsumoController.listar_todos(ativo=True)
+    quantidades = {i.id_insumo: request.form.get(f'quantidade_{i.id_insumo}', '').strip().replace(',', '.')
+                   for i in insumos_ativos}
+    erros_por_insumo = {}
+    
+    if form.validate_on_submit():
+        preenchidos = [insumo_id for insumo_id, valor in quantidades.items() if valor]
+        itens = [{
+            'insumo_id': insumo_id,
+            'tipo': form.tipo.data,
+            'quantidade': quantidades[insumo_id],
+            'observacoes': form.observacoes.data,
+        } for insumo_id in preenchidos]
+        
+        try:
+            resultado = MovimentacaoInsumoController.criar_movimentacoes(
+                itens, form.data_movimentacao.data, usuario_id=1
+            )
+            if not resultado['erros']:
+                flash(f'✅ {resultado["registradas"]} movimentação(ões) registrada(s) com sucesso!', 'success')
+                return redirect(url_for('insumo_web.listar_movimentacoes'))
+            
+            for erro in resultado['erros']:
+                if erro['item'] is None:
+                    flash(f'❌ {erro["erro"]}', 'danger')
+                else:
+                    erros_por_insumo[preenchidos[erro['item'] - 1]] = erro['erro']
+            if erros_por_insumo:
+                flash('❌ Nenhuma movimentação foi registrada. Corrija os itens destacados.', 'danger')
+                
+        except Exception as e:
+            flash(f'❌ Erro ao registrar movimentações: {str(e)}', 'danger')
+    
+    return render_template('insumo/nova_movimentacao_lote.html', form=form, insumos=insumos_ativos,
+                           quantidades=quantidades, erros_por_insumo=erros_por_insumo)
+
 # ===== ROTAS DE RELATÓRIOS =====
 @insumo_web.route('/relatorios', methods=['GET'])
 def relatorios():
@@ -235,47 +282,21 @@ def relatorio_consumo():
     else:
         data_inicio = datetime.strptime(data_inicio, '%Y-%m-%d').date()
     
-    # Buscar movimentações de saída no período
-    movimentacoes = MovimentacaoInsumoController.listar_movimentacoes(
-        tipo='Saída - Uso',
-        data_inicio=data_inicio,
-        data_fim=data_fim
-    )
-    
-    # Agrupar por insumo
-    consumo_por_insumo = {}
-    for mov in movimentacoes:
-        if categoria and mov.insumo.categoria != categoria:
-            continue
-            
-        nome_insumo = mov.insumo.nome
-        if nome_insumo not in consumo_por_insumo:
-            consumo_por_insumo[nome_insumo] = {
-                'insumo': mov.insumo,
-                'total_consumido': 0,
-                'movimentacoes': []
-            }
-        
-        consumo_por_insumo[nome_insumo]['total_consumido'] += mov.quantidade
-        consumo_por_insumo[nome_insumo]['movimentacoes'].append(mov)
+    agrupamento = request.args.get('agrupamento')
+    if agrupamento not in AGRUPAMENTOS:
+        agrupamento = None
     
-    consumo_ordenado = sorted(
-        consumo_por_insumo.items(), 
-        key=lambda x: x[1]['total_consumido'], 
-        reverse=True
-    )
-    
-    top_5_consumo = consumo_ordenado[:5]
-    
-    total_itens_consumidos = len(consumo_por_insumo)
-    total_quantidade_consumida = sum(dados['total_consumido'] for dados in consumo_por_insumo.values())
+    dados = RelatoriosInsumosController.consumo(data_inicio, data_fim, categoria, agrupamento)
     
     return render_template('insumo/relatorio_consumo.html',
-                         consumo_por_insumo=consumo_por_insumo,
-                         consumo_ordenado=consumo_ordenado,
-                         top_5_consumo=top_5_consumo,
-                         total_itens_consumidos=total_itens_consumidos,
-                         total_quantidade_consumida=total_quantidade_consumida,
+                         consumo_por_insumo=dados['consumo_por_insumo'],
+                         consumo_ordenado=dados['consumo_ordenado'],
+                         top_5_consumo=dados['consumo_ordenado'][:5],
+                         total_itens_consumidos=dados['total_itens'],
+                         total_quantidade_consumida=dados['total_quantidade'],
+                         total_movimentacoes=dados['total_movimentacoes'],
+                         por_periodo=dados['por_periodo'],
+                         agrupamento=agrupamento,
                          data_inicio=data_inicio,
                          data_fim=data_fim,
                          categoria=categoria,
@@ -306,13 +327,16 @@ def export_consumo(formato):
             flash('Formato de exportação inválido', 'danger')
             return redirect(url_for('insumo_web.relatorio_consumo'))
         
+        agrupamento = request.args.get('agrupamento')
+        
         # Exportar
         return RelatoriosInsumosController.exportar(
             tipo_relatorio='consumo',
             formato=formato,
             data_inicio=data_inicio,
             data_fim=data_fim,
-            categoria=categoria
+            categoria=categoria,
+            agrupamento=agrupamento if agrupamento in AGRUPAMENTOS else None
         )
         
     except Exception as e:
@@ -364,6 +388,8 @@ def export_vencimentos(formato):
 def export_cobertura(formato):
     """Exporta relatório de cobertura de estoque"""
     try:
+        dias = request.args.get('dias', 30, type=int)
+        
         # Validar formato
         if formato not in ['csv', 'excel', 'pdf']:
             flash('Formato de exportação inválido', 'danger')
@@ -372,7 +398,31 @@ def export_cobertura(formato):
         # Exportar
         return RelatoriosInsumosController.exportar(
             tipo_relatorio='cobertura',
-            formato=formato
+            formato=formato,
+            dias=dias
+        )
+        
+    except Exception as e:
+        flash(f'Erro ao exportar relatório: {str(e)}', 'danger')
+        return redirect(url_for('insumo_web.relatorios'))
+
+@insumo_web.route('/relatorios/reposicao/export/<formato>', methods=['GET'])
+def export_reposicao(formato):
+    """Exporta o ponto de pedido e a compra sugerida de cada insumo"""
+    try:
+        # Validar formato
+        if formato not in ['csv', 'excel', 'pdf']:
+            flash('Formato de exportação inválido', 'danger')
+            return redirect(url_for('insumo_web.relatorios'))
+        
+        # Exportar
+        return RelatoriosInsumosController.exportar(
+            tipo_relatorio='reposicao',
+            formato=formato,
+            categoria=request.args.get('categoria'),
+            nivel_servico=current_app.config['REPOSICAO_NIVEL_SERVICO'],
+            ciclo_dias=current_app.config['REPOSICAO_CICLO_DIAS'],
+            prazos_entrega=current_app.config['REPOSICAO_PRAZOS_ENTREGA']
         )
         
     except Exception as e:
@@ -384,7 +434,8 @@ def export_cobertura(formato):
 def relatorio_cobertura():
     """Relatório de cobertura de estoque"""
     try:
-        dados_cobertura = RelatoriosInsumosController.cobertura()
+        dias = request.args.get('dias', 30, type=int)
+        dados_cobertura = RelatoriosInsumosController.cobertura(dias)
         
         # Estatísticas
         total_insumos = len(dados_cobertura)
@@ -398,6 +449,7 @@ def relatorio_cobertura():
                              criticos=criticos,
                              atencao=atencao,
                              ok=ok,
+                             dias=dias,
                              today=date.today())
                              
     except Exception as e:
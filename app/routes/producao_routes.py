@@ -18,7 +18,7 @@ def criar():
     
     if form.validate_on_submit():
         try:
-            producao = ProducaoController.criar_producao(
+            producao, criado = ProducaoController.salvar_producao(
                 lote_id=form.id_lote.data,
                 data_coleta=form.data_coleta.data,
                 quantidade_aves=form.quantidade_aves.data,
@@ -29,7 +29,10 @@ def criar():
                 observacoes=form.observacoes.data
             )
             
-            flash('✅ Produção cadastrada com sucesso!', 'success')
+            if criado:
+                flash('✅ Produção cadastrada com sucesso!', 'success')
+            else:
+                flash('✅ Este lote já tinha produção registrada nesta data; o registro foi atualizado.', 'success')
             return redirect(url_for('producao_web.listar'))
             
         except Exception as e:
@@ -62,7 +65,7 @@ def editar(producao_id: int):
     form = ProducaoForm(obj=producao)
 
     if request.method == 'GET':
-        form.id_lote.data = producao.id_lote  
+        form.id_lote.data = producao.lote.numero_lote  
         
         if hasattr(producao.data_coleta, 'date'):
             form.data_coleta.data = producao.data_coleta.date()
@@ -73,7 +76,7 @@ def editar(producao_id: int):
         try:
             atualizado = ProducaoController.atualizar(
                 producao_id,
-                id_lote=form.id_lote.data,  
+                lote=form.id_lote.data,  
                 data_coleta=datetime.combine(form.data_coleta.data, datetime.min.time()),
                 quantidade_aves=form.quantidade_aves.data,
                 quantidade_ovos=form.quantidade_ovos.data,
@@ -1,4 +1,4 @@
-from flask import Blueprint, current_app, request, jsonify
+from flask import Blueprint, request, jsonify
 from app.controllers.auth_controller import register, sign_in
 from app.controllers.usuario_controller import get_user, get_users, deactivate_user, reactivate_user
 from app.controllers.aves_controller import register_poultry, get_poultries, get_poultry, update_poultry, delete_poultry
@@ -6,10 +6,6 @@ from app.controllers.gerenciamento_usuario_controller import update_user_data, g
 from app.controllers.notificacoes_controller import create_notification, get_notifications, delete_notifications, get_user_notifications, mark_notification_as_read, get_notifications_count, get_notification_history, get_notifications_grouped
 from app.decorators import production_access, read_only_access, admin_required
 from datetime import datetime
-from app.forms.producao_forms import ProducaoForm
-from app.controllers.producao_controller import ProducaoController
-from app.models.database import db
-from app.exceptions import BusinessError
 from app.controllers.mortalidade_controller import mortalidade_bp
 
 from app.controllers.producao_registro_controller import producao_bp
@@ -241,6 +237,12 @@ def mark_notification_read(notification_id):
 def get_notification_count():
     return get_notifications_count()
 
+@bp.route('/api/admin/db-pool', methods=['GET'])
+@admin_required
+def db_pool_status():
+    from app.models.database import estatisticas_pool
+    return jsonify(estatisticas_pool()), 200
+
 @bp.route('/api/admin/check-stock', methods=['POST'])
 @admin_required
 def check_stock_notifications():
@@ -256,6 +258,48 @@ def check_stock_notifications():
     except Exception as e:
         return jsonify({'error': f'Erro interno: {str(e)}'}), 500
 
+@bp.route('/api/admin/alert-rules', methods=['GET'])
+@admin_required
+def list_alert_rules():
+    from app.controllers.alerta_controller import AlertaController
+    return jsonify(list(AlertaController.regras().values())), 200
+
+@bp.route('/api/admin/alert-rules/<codigo>', methods=['PUT'])
+@admin_required
+def update_alert_rule(codigo):
+    """Body JSON com qualquer um de: limite, janela_dias, prioridade (BAIXA...CRITICA), ativa."""
+    from app.controllers.alerta_controller import AlertaController
+    from app.exceptions import BusinessError
+    dados = request.get_json(silent=True) or {}
+    try:
+        regra = AlertaController.definir_regra(codigo, limite=dados.get('limite'),
+                                               janela_dias=dados.get('janela_dias'),
+                                               prioridade=dados.get('prioridade'), ativa=dados.get('ativa'))
+        return jsonify(regra), 200
+    except BusinessError as e:
+        return jsonify({'error': e.message}), 400
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
+@bp.route('/api/admin/jobs', methods=['GET'])
+@admin_required
+def list_scheduled_jobs():
+    from app.agendador import obter_agendador
+    return jsonify(obter_agendador().situacao()), 200
+
+@bp.route('/api/admin/jobs/<nome>/run', methods=['POST'])
+@admin_required
+def run_scheduled_job(nome):
+    """Agenda a tarefa para agora; ela roda na thread do agendador, não nesta requisição."""
+    from app.agendador import obter_agendador
+    agendador = obter_agendador()
+    if nome not in agendador.tarefas:
+        return jsonify({'error': 'Tarefa não encontrada'}), 404
+    agendador.sincronizar()
+    if not agendador.agendar_agora(nome):
+        return jsonify({'error': 'Tarefa já em execução em outro worker'}), 409
+    return jsonify(next(t for t in agendador.situacao() if t['nome'] == nome)), 202
+
 @bp.route('/api/admin/notify-maintenance', methods=['POST'])
 @admin_required
 def send_maintenance_notification():
@@ -281,38 +325,3 @@ def send_report_notification():
             return jsonify({'message': 'Notificação de relatório não é necessária hoje'}), 200
     except Exception as e:
         return jsonify({'error': f'Erro interno: {str(e)}'}), 500
-
-producao_api = Blueprint('producao_api', __name__, url_prefix='/api/producao')
-
-@producao_api.route('/', methods=['POST'])
-def criar_producao():
-    payload = request.get_json(silent=True)
-    if payload is None:
-        return jsonify({'error': 'JSON inválido ou ausente'}), 400
-
-    form = ProducaoForm(data=payload, meta={'csrf': False})
-    if not form.validate():
-        return jsonify({'errors': form.errors}), 400
-
-    producao_data = {
-        'lote_id': form.lote_id.data,
-        'data_producao': datetime.combine(form.data_producao.data, datetime.min.time()),
-        'quantidade_aves': form.quantidade_aves.data,
-        'quantidade_produzida': form.quantidade_produzida.data,
-        'qualidade_producao': form.qualidade_producao.data,
-        'producao_nao_aproveitada': form.producao_nao_aproveitada.data,
-        'observacoes': form.observacoes.data
-    }
-
-    try:
-        with db.atomic():
-            producao = ProducaoController.criar_producao(**producao_data)
-        return jsonify({'id_producao': producao.id_producao}), 201
-    except BusinessError as be:
-        current_app.logger.warning("Regra de negócio falhou: %s", be.message)
-        return jsonify({'error': be.message}), 422
-    except ValueError as ve:
-        return jsonify({'error': str(ve)}), 422
-    except Exception:
-        current_app.logger.exception("Erro interno ao criar produção")
-        return jsonify({'error': 'erro interno'}), 500
\ No newline at end of file
@@ -41,6 +41,8 @@ def editar(id_vacinacao: int):
         return redirect(url_for('vacina_web.listar'))  
 
     form = VacinaForm(obj=vacina)  
+    if request.method == 'GET':
+        form.id_lote.data = vacina.lote.numero_lote
 
     if form.validate_on_submit():
         try:
@@ -49,7 +51,7 @@ def editar(id_vacinacao: int):
                 data_aplicacao=form.data_aplicacao.data,
                 responsavel=form.responsavel.data,
                 tipo_vacina=form.tipo_vacina.data,
-                id_lote=form.id_lote.data,
+                lote=form.id_lote.data,
                 quantidade_aves=form.quantidade_aves.data,
                 observacoes=form.observacoes.data
             )
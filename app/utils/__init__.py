@@ -1,3 +1,5 @@
-from .helpers import validate_password, generate_matricula, validate_cpf, log_user_activity
+from .helpers import validate_password, generate_matricula, validate_cpf, log_user_activity, como_data
+from .notificacoes import create_automatic_notification, check_stock_levels, notify_maintenance_due, notify_report_due
 
-__all__ = ["validate_password", "generate_matricula", "validate_cpf", "log_user_activity"]
\ No newline at end of file
+__all__ = ["validate_password", "generate_matricula", "validate_cpf", "log_user_activity", "como_data",
+           "create_automatic_notification", "check_stock_levels", "notify_maintenance_due", "notify_report_due"]
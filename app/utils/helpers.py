@@ -1,7 +1,15 @@
 import re
 import random
 import string
-from datetime import datetime
+from datetime import date, datetime
+
+def como_data(valor) -> date:
+    """Data de um datetime ou de um texto 'AAAA-MM-DD...' (agregações como MIN/MAX chegam do SQLite como texto)."""
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, str):
+        return date.fromisoformat(valor[:10])
+    return valor
 
 def validate_password(password):
     """Valida se a senha atende aos critérios mínimos"""
@@ -30,6 +38,20 @@ def validate_cpf(cpf):
     return True, "CPF válido"
 
 def log_user_activity(user_id, action, details=None):
-    """Log de atividade do usuário"""
-    print(f"User {user_id}: {action} - {details}")
-    return True
\ No newline at end of file
+    """Grava a ação no log de atividades (user_id None = sistema/anônimo).
+
+    Falhas ao gravar o log nunca interrompem a operação principal.
+    """
+    from flask import has_request_context, request
+    from app.models.database import UserActivityLog
+
+    try:
+        UserActivityLog.create(
+            usuario=user_id,
+            acao=action,
+            detalhes=details,
+            ip_address=request.remote_addr if has_request_context() else None
+        )
+        return True
+    except Exception:
+        return False
\ No newline at end of file
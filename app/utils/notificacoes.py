@@ -0,0 +1,121 @@
+import datetime
+from typing import Optional, List, Sequence
+from peewee import Value, fn
+from app.models.database import (db, Usuarios, TipoUsuarios, InsumoNovo, Avisos, NotificacaoUsuario,
+                                 HistoricoAvisos, CategoriaAviso, PrioridadeAviso, SituacaoNotificacao)
+
+def filtro_tipo_usuario(*tipos: TipoUsuarios):
+    """Expressão que compara tipo_usuario com os tipos informados, sem diferenciar maiúsculas."""
+    return fn.UPPER(Usuarios.tipo_usuario).in_([t.value.upper() for t in tipos])
+
+def create_automatic_notification(titulo: str, conteudo: str, categoria: str, prioridade: str = 'NORMAL',
+                                  destinatarios: Optional[List[int]] = None, tipos: Sequence[TipoUsuarios] = ()):
+    """Cria um aviso do sistema (sem autor) e notifica os destinatários ativos.
+
+    categoria é o valor de CategoriaAviso ("Estoque") e prioridade o nome de PrioridadeAviso ("ALTA").
+    Os destinatários são os ids em `destinatarios` ou, sem eles, os usuários ativos dos `tipos`
+    informados (todos, se nenhum); as notificações saem de um único INSERT ... SELECT.
+    Retorna o id do aviso ou None em caso de erro.
+    """
+    try:
+        categoria = CategoriaAviso(categoria)
+        prioridade = PrioridadeAviso[prioridade]
+
+        usuarios = Usuarios.select(Usuarios.id_usuario).where(Usuarios.ativo == True)
+        if destinatarios is not None:
+            usuarios = usuarios.where(Usuarios.id_usuario.in_(destinatarios))
+        elif tipos:
+            usuarios = usuarios.where(filtro_tipo_usuario(*tipos))
+
+        agora = datetime.datetime.now()
+        with db.atomic():
+            novo_aviso = Avisos.create(
+                titulo=titulo,
+                mensagem=conteudo,
+                tipo=categoria.value,
+                prioridade=prioridade.value,
+                criado_por=None
+            )
+
+            NotificacaoUsuario.insert_from(
+                usuarios.select(Value(novo_aviso.id_aviso), Usuarios.id_usuario,
+                                Value(SituacaoNotificacao.ATIVO.value), Value(agora)),
+                [NotificacaoUsuario.aviso, NotificacaoUsuario.usuario, NotificacaoUsuario.status,
+                 NotificacaoUsuario.data_criacao]
+            ).execute()
+
+            HistoricoAvisos.create(
+                aviso=novo_aviso,
+                acao='CRIADO_AUTOMATICAMENTE',
+                detalhes=f'Notificação automática: {titulo}',
+                usuario_modificador=None
+            )
+
+        return novo_aviso.id_aviso
+
+    except Exception:
+        return None
+
+def check_stock_levels():
+    """Varredura completa da regra de estoque baixo, para uso manual pelo administrador.
+
+    As escritas de estoque já avaliam a regra para o insumo alterado; aqui os insumos
+    abaixo do mínimo passam pelo mesmo AlertaController, que não repete avisos já emitidos.
+    Retorna quantos insumos estão com estoque baixo.
+    """
+    from app.controllers.alerta_controller import AlertaController
+
+    try:
+        regra = AlertaController.regras()['estoque_baixo']
+        low_stock_ids = [i.id_insumo for i in InsumoNovo.select(InsumoNovo.id_insumo).where(
+            (InsumoNovo.ativo == True) &
+            (InsumoNovo.quantidade_atual <= InsumoNovo.quantidade_minima * regra['limite']))]
+
+        AlertaController.avaliar_insumos(low_stock_ids)
+        return len(low_stock_ids)
+
+    except Exception:
+        return 0
+
+def notify_maintenance_due():
+    try:
+        create_automatic_notification(
+            titulo="Lembrete: Manutenção Semanal",
+            conteudo="Lembrete para realizar as atividades de manutenção semanal:\n\n"
+                     "- Verificar sistema de alimentação\n"
+                     "- Limpar bebedouros\n"
+                     "- Verificar sistema de ventilação\n"
+                     "- Inspeção geral das instalações\n\n"
+                     "Registre todas as atividades realizadas no sistema.",
+            categoria="Manutenção",
+            prioridade="NORMAL",
+            tipos=(TipoUsuarios.OPERADOR,)
+        )
+
+        return True
+
+    except Exception:
+        return False
+
+def notify_report_due():
+    try:
+        if datetime.date.today().day == 1:
+            create_automatic_notification(
+                titulo="Lembrete: Relatório Mensal",
+                conteudo="É hora de gerar os relatórios mensais de produção:\n\n"
+                         "- Relatório de produção de ovos\n"
+                         "- Relatório de consumo de ração\n"
+                         "- Relatório de mortalidade\n"
+                         "- Relatório financeiro\n\n"
+                         "Prazo: até o 5º dia útil do mês.",
+                categoria="Relatórios",
+                prioridade="ALTA",
+                tipos=(TipoUsuarios.ADMIN, TipoUsuarios.GERENTE)
+            )
+
+            return True
+
+        return False
+
+    except Exception:
+        return False
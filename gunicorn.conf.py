@@ -0,0 +1,6 @@
+# Lido automaticamente pelo gunicorn (ex.: gunicorn app:app)
+
+def post_worker_init(worker):
+    """Cada worker, já com a aplicação carregada, inicia o seu agendador de tarefas."""
+    from app.agendador import iniciar_agendador
+    iniciar_agendador(worker.wsgi)
@@ -1,11 +1,12 @@
 try:
     from app import create_app
-    from app.models import db
-    
+    from app.models.database import db
+    from app.models.migrations import migrar, versao_atual
+
     app = create_app()
-    with app.app_context():
-        db.create_all()
-        print("database initialized successfully!")
+    with app.app_context(), db.connection_context():
+        migrar()
+        print(f"database initialized successfully! (schema v{versao_atual()})")
 
 except Exception as e:
     print(f"ERRO: {e}")
@@ -5,6 +5,9 @@ if __name__ == '__main__':
         print("Criando aplicação...")
         app = create_app()
         print("Aplicação criada com sucesso!")
+
+        from app.agendador import iniciar_agendador
+        iniciar_agendador(app)
         
         print("Iniciando servidor...")
         app.run(
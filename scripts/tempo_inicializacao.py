@@ -0,0 +1,55 @@
+"""Mede o tempo de boot de um worker: import do pacote `app` + create_app().
+
+Cada medição roda em um interpretador novo para não aproveitar módulos já
+importados. Sai com código 1 se a mediana passar do orçamento.
+
+    python scripts/tempo_inicializacao.py [--execucoes 5] [--orcamento-ms 1500]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MEDICAO = """
+import json, time
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+app.create_app()
+t2 = time.perf_counter()
+print(json.dumps({'import_ms': (t1 - t0) * 1000, 'create_app_ms': (t2 - t1) * 1000}))
+"""
+
+def medir_uma_vez() -> dict:
+    saida = subprocess.run([sys.executable, '-c', MEDICAO], cwd=RAIZ, check=True,
+                           capture_output=True, text=True).stdout
+    return json.loads(saida.strip().splitlines()[-1])
+
+def main():
+    sys.path.insert(0, RAIZ)
+    from app.config import Config
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--execucoes', type=int, default=5)
+    parser.add_argument('--orcamento-ms', type=int, default=Config.STARTUP_BUDGET_MS)
+    args = parser.parse_args()
+
+    medicoes = [medir_uma_vez() for _ in range(args.execucoes)]
+    import_ms = statistics.median(m['import_ms'] for m in medicoes)
+    create_app_ms = statistics.median(m['create_app_ms'] for m in medicoes)
+    total_ms = import_ms + create_app_ms
+
+    print(f"import app:   {import_ms:8.1f} ms")
+    print(f"create_app(): {create_app_ms:8.1f} ms")
+    print(f"total:        {total_ms:8.1f} ms (orçamento {args.orcamento_ms} ms, mediana de {args.execucoes})")
+
+    if total_ms > args.orcamento_ms:
+        print("ACIMA DO ORÇAMENTO")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+import datetime
+import pytest
+from app.config import Config
+from app.controllers.unidade_controller import para_base
+from app.models.database import (db, configurar_banco, Lote, MovimentacaoInsumo, Usuarios, UNIDADES_PADRAO,
+                                 ESCALA_QUANTIDADE)
+from app.models.migrations import migrar
+
+@pytest.fixture
+def banco(tmp_path):
+    """Banco SQLite novo em arquivo (WAL + pool, como em produção), já migrado e com um usuário."""
+    config = {chave: valor for chave, valor in vars(Config).items() if chave.isupper()}
+    config['DATABASE_PATH'] = str(tmp_path / 'granja_teste.db')
+    configurar_banco(config)
+    with db.connection_context():
+        migrar(backup=False)
+        Usuarios.create(nome='Teste', username='teste', email='teste@granja.com', cpf='000.000.000-00',
+                        senha='x', tipo_usuario='ADMIN', id_granja='1', sexo='F',
+                        data_nascimento=datetime.date(1990, 1, 1), endereco='-',
+                        data_admissao=datetime.date(2020, 1, 1), carteira_trabalho='-', telefone='-')
+    yield db
+    db.close_all()
+    configurar_banco(config | {'DATABASE_PATH': Config.DATABASE_PATH})
+
+@pytest.fixture
+def criar_lote(banco):
+    """Cria um lote ativo no banco de teste: criar_lote('L1') ou criar_lote('L1', aves=1000)."""
+    def criar(numero, aves=100):
+        return Lote.create(numero_lote=numero, data_entrada=datetime.date(2020, 1, 1), quantidade_inicial=aves,
+                           idade_inicial=18, raca='Isa Brown', fornecedor='-')
+    return criar
+
+@pytest.fixture
+def criar_movimentacao(banco):
+    """Grava uma movimentação na unidade do insumo direto na tabela, sem alterar o estoque."""
+    def criar(insumo, tipo, quantidade, dia, usuario, hora=8):
+        fator = UNIDADES_PADRAO[insumo.unidade][1] * ESCALA_QUANTIDADE
+        return MovimentacaoInsumo.create(insumo=insumo, tipo=tipo, quantidade=quantidade, usuarios=usuario,
+                                         quantidade_base=para_base(quantidade, fator),
+                                         data_movimentacao=datetime.datetime.combine(dia, datetime.time(hora)),
+                                         estoque_anterior=0, estoque_posterior=0)
+    return criar
@@ -0,0 +1,69 @@
+from datetime import datetime
+import pytest
+from app.agendador import Agenda, Agendador, Tarefa
+from app.models.database import db, ExecucaoTarefa
+
+def test_proxima_execucao_da_agenda():
+    segunda_7h = Agenda('0 7 * * 1')
+    assert segunda_7h.proxima(datetime(2024, 5, 1, 12, 0)) == datetime(2024, 5, 6, 7, 0)      # quarta -> segunda
+    assert segunda_7h.proxima(datetime(2024, 5, 6, 7, 0)) == datetime(2024, 5, 13, 7, 0)
+
+    assert Agenda('*/15 8-9 * * *').proxima(datetime(2024, 5, 1, 9, 50)) == datetime(2024, 5, 2, 8, 0)
+    assert Agenda('10 0 1 * *').proxima(datetime(2024, 12, 31, 23, 59)) == datetime(2025, 1, 1, 0, 10)
+    # Dia do mês e dia da semana restritos: vale o que vier primeiro
+    assert Agenda('0 0 13 * 5').proxima(datetime(2024, 5, 1)) == datetime(2024, 5, 3, 0, 0)
+
+    with pytest.raises(ValueError):
+        Agenda('0 25 * * *')
+    with pytest.raises(ValueError):
+        Agenda('0 0 31 2 *').proxima(datetime(2024, 1, 1))
+
+def test_tarefa_vencida_roda_uma_vez_entre_workers(banco):
+    chamadas = []
+    tarefas = {'contar': Tarefa('contar', '0 * * * *', lambda: chamadas.append(1))}
+    with db.connection_context():
+        worker_a = Agendador(tarefas, dono='a')
+        worker_b = Agendador(tarefas, dono='b')
+        worker_a.sincronizar(datetime(2024, 5, 1, 8, 30))
+        worker_b.sincronizar(datetime(2024, 5, 1, 8, 30))
+
+        assert worker_a.executar_pendentes(datetime(2024, 5, 1, 8, 59)) == []
+        assert worker_a.executar_pendentes(datetime(2024, 5, 1, 9, 0)) == ['contar']
+        assert worker_b.executar_pendentes(datetime(2024, 5, 1, 9, 0)) == []
+        assert len(chamadas) == 1
+
+        # Lease de outro worker ainda válido: ninguém mais executa
+        ExecucaoTarefa.update(lease_dono='c', lease_ate=datetime(2100, 1, 1)).execute()
+        assert worker_b.executar('contar', forcar=True) is False
+
+        linha = ExecucaoTarefa.get(ExecucaoTarefa.nome == 'contar')
+        assert linha.execucoes == 1 and linha.ultimo_status == 'ok'
+        assert linha.ultima_duracao_ms is not None
+        assert linha.proxima_execucao > datetime(2024, 5, 1, 9, 0)
+
+def test_falha_registrada_e_lease_liberado(banco):
+    def quebra():
+        raise RuntimeError('sem conexão')
+
+    with db.connection_context():
+        agendador = Agendador({'quebra': Tarefa('quebra', '* * * * *', quebra)}, dono='a')
+        agendador.sincronizar()
+        assert agendador.executar('quebra', forcar=True) is True
+
+        situacao = agendador.situacao()[0]
+        assert situacao['falhas'] == 1 and situacao['ultimo_status'] == 'erro'
+        assert 'sem conexão' in situacao['ultimo_erro']
+        assert situacao['em_execucao_por'] is None
+
+def test_agendar_agora_deixa_a_execucao_para_a_thread(banco):
+    chamadas = []
+    with db.connection_context():
+        agendador = Agendador({'contar': Tarefa('contar', '0 7 * * 1', lambda: chamadas.append(1))}, dono='a')
+        agendador.sincronizar(datetime(2024, 5, 1, 12, 0))
+
+        assert agendador.agendar_agora('contar', datetime(2024, 5, 1, 12, 5)) is True
+        assert chamadas == []
+        assert agendador.executar_pendentes(datetime(2024, 5, 1, 12, 5)) == ['contar'] and chamadas == [1]
+
+        ExecucaoTarefa.update(lease_dono='b', lease_ate=datetime(2100, 1, 1)).execute()
+        assert agendador.agendar_agora('contar') is False
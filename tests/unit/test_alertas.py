@@ -0,0 +1,100 @@
+import datetime
+from datetime import date, timedelta
+from decimal import Decimal
+from app.controllers.alerta_controller import AlertaController
+from app.controllers.insumo_controller import InsumoController, MovimentacaoInsumoController
+from app.controllers.producao_controller import ProducaoController
+from app.models.database import (db, Avisos, AlertaEmitido, Granja, Setor, Lote, Aves, RelatoriosMortalidade,
+                                 NotificacaoUsuario, Usuarios)
+
+def _avisos(prefixo):
+    return Avisos.select().where(Avisos.titulo.startswith(prefixo)).count()
+
+def test_estoque_baixo_avisa_uma_vez_por_ocorrencia(banco):
+    with db.connection_context():
+        usuario = Usuarios.get()
+        insumo = InsumoController.criar_insumo('Milho', 'Ração', 'kg', Decimal('100'), Decimal('20'),
+                                               usuario_id=usuario.id_usuario)
+        hoje = date.today()
+        saida = lambda q: MovimentacaoInsumoController.criar_movimentacao(
+            insumo.id_insumo, 'Saída - Uso', Decimal(q), hoje, usuario_id=usuario.id_usuario)
+
+        saida('70')
+        assert _avisos('Alerta: Estoque Baixo') == 0
+
+        saida('15')
+        saida('5')
+        assert _avisos('Alerta: Estoque Baixo') == 1
+        assert NotificacaoUsuario.select().count() == 1     # só ADMIN e GERENTE recebem
+
+        # Reposição encerra a ocorrência; uma nova queda volta a avisar
+        MovimentacaoInsumoController.criar_movimentacao(insumo.id_insumo, 'Entrada - Compra', Decimal('50'), hoje,
+                                                        usuario_id=usuario.id_usuario)
+        assert AlertaEmitido.select().count() == 0
+        saida('45')
+        assert _avisos('Alerta: Estoque Baixo') == 2
+
+def test_regra_configuravel(banco):
+    with db.connection_context():
+        insumo = InsumoController.criar_insumo('Farelo', 'Ração', 'kg', Decimal('30'), Decimal('20'),
+                                               usuario_id=Usuarios.get().id_usuario)
+        assert _avisos('Alerta: Estoque Baixo') == 0
+
+        AlertaController.definir_regra('estoque_baixo', limite=2)
+        InsumoController.atualizar_insumo(insumo.id_insumo, 'Farelo', 'Ração', 'kg', Decimal('20'))
+        assert _avisos('Alerta: Estoque Baixo') == 1
+
+        AlertaController.definir_regra('insumo_vencendo', ativa=False)
+        InsumoController.atualizar_insumo(insumo.id_insumo, 'Farelo', 'Ração', 'kg', Decimal('20'),
+                                          data_validade=date.today() + timedelta(days=5))
+        assert _avisos('Alerta: Insumo Vencendo') == 0
+        assert AlertaController.regras()['insumo_vencendo']['ativa'] is False
+
+def test_insumo_vencendo_resolvido_quando_a_validade_muda(banco):
+    with db.connection_context():
+        hoje = date.today()
+        insumo = InsumoController.criar_insumo('Vermífugo', 'Medicamentos', 'un', Decimal('10'), Decimal('0'),
+                                               data_validade=hoje + timedelta(days=5),
+                                               usuario_id=Usuarios.get().id_usuario)
+        vencendo = lambda: list(AlertaEmitido.select().where(AlertaEmitido.regra == 'insumo_vencendo'))
+        atualizar = lambda validade: InsumoController.atualizar_insumo(
+            insumo.id_insumo, 'Vermífugo', 'Medicamentos', 'un', Decimal('0'), data_validade=validade)
+        assert len(vencendo()) == 1
+
+        # Nova validade ainda dentro da janela: um alerta, o da data nova
+        atualizar(hoje + timedelta(days=10))
+        assert len(vencendo()) == 1 and _avisos('Alerta: Insumo Vencendo') == 2
+
+        # Lote novo, validade fora da janela: nada em aberto
+        atualizar(hoje + timedelta(days=365))
+        assert vencendo() == []
+        atualizar(hoje + timedelta(days=10))
+        assert len(vencendo()) == 1 and _avisos('Alerta: Insumo Vencendo') == 3
+
+def test_queda_de_producao_e_pico_de_mortalidade(banco):
+    with db.connection_context():
+        usuario = Usuarios.get()
+        lote = Lote.create(numero_lote='L1', data_entrada=date(2024, 1, 1), quantidade_inicial=200,
+                           idade_inicial=18, raca='Isa Brown', fornecedor='-')
+        hoje = date.today()
+        for dias_atras in range(7, 0, -1):
+            ProducaoController.criar_producao(lote.id_lote, hoje - timedelta(days=dias_atras), 200, 180,
+                                              'Boa', 0, 'Teste')
+        assert _avisos('Alerta: Queda de Produção') == 0
+
+        ProducaoController.criar_producao(lote.id_lote, hoje, 200, 120, 'Boa', 0, 'Teste')
+        ProducaoController.criar_producao(lote.id_lote, hoje, 200, 110, 'Boa', 0, 'Teste')
+        assert _avisos('Alerta: Queda de Produção') == 1
+
+        granja = Granja.create(cnpj_granja='00.000.000/0001-00')
+        setor = Setor.create(descricao_setor='Galpão 1', capacidade=500, granja=granja)
+        ave = Aves.create(lote=lote, raca_ave='Isa Brown', data_nascimento=date(2023, 9, 1), tempo_de_vida=1,
+                          media_peso=1.8, caracteristicas_geneticas='-', tipo_alojamento='Piso',
+                          historico_vacinas='-')
+        for _ in range(2):
+            RelatoriosMortalidade.create(data_hora_evento=datetime.datetime.combine(hoje, datetime.time(9)),
+                                         ave=ave, lote=lote, setor=setor, motivo_obito='Calor',
+                                         categoria_motivo='Ambiental', funcionario=usuario)
+            AlertaController.avaliar_mortalidade(lote.id_lote, hoje)
+        # 1 morte = 0,5% das 200 aves, já no limite padrão; a segunda não repete o aviso
+        assert _avisos('Alerta: Mortalidade Elevada') == 1
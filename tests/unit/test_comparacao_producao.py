@@ -0,0 +1,50 @@
+from datetime import date, timedelta
+import pytest
+from app.controllers.producao_controller import ProducaoController
+from app.exceptions import BusinessError
+from app.models.database import db, ProducaoDiaria
+
+def test_periodos_das_comparacoes_prontas():
+    quarta = date(2024, 3, 13)
+    assert ProducaoController.periodos_comparacao('semana', quarta) == (
+        (date(2024, 3, 11), date(2024, 3, 17)), (date(2024, 3, 4), date(2024, 3, 10)))
+    assert ProducaoController.periodos_comparacao('mes', quarta) == (
+        (date(2024, 3, 1), date(2024, 3, 31)), (date(2024, 2, 1), date(2024, 2, 29)))
+    assert ProducaoController.periodos_comparacao('mes_ano_anterior', date(2024, 2, 29)) == (
+        (date(2024, 2, 1), date(2024, 2, 29)), (date(2023, 2, 1), date(2023, 2, 28)))
+    with pytest.raises(BusinessError):
+        ProducaoController.periodos_comparacao('trimestre')
+
+def test_comparacao_por_lote_e_total(banco, criar_lote):
+    with db.connection_context():
+        l1, l2 = criar_lote('L1'), criar_lote('L2')
+        segunda = date(2024, 5, 6)
+        for n in range(14):
+            ovos = 90 if n < 7 else 81                  # L1 cai 10% na segunda semana
+            ProducaoDiaria.create(lote=l1, dia=segunda + timedelta(days=n), total_ovos=ovos,
+                                  total_perdas=1, total_aves=100, registros=1)
+        for n in range(7, 14):                           # L2 só produziu na segunda semana
+            ProducaoDiaria.create(lote=l2, dia=segunda + timedelta(days=n), total_ovos=50,
+                                  total_perdas=0, total_aves=100, registros=1)
+
+        atual, anterior = ProducaoController.periodos_comparacao('semana', segunda + timedelta(days=8))
+        comparacao = ProducaoController.comparar_periodos(atual, anterior)
+
+        assert comparacao['periodos']['anterior'] == {'inicio': '2024-05-06', 'fim': '2024-05-12', 'dias': 7}
+        l1_comp, l2_comp = comparacao['lotes']
+        assert l1_comp['numero_lote'] == 'L1'
+        assert l1_comp['variacao']['ovos'] == {'delta': -63, 'percentual': -10.0}
+        assert l1_comp['variacao']['taxa_postura'] == {'delta': -9.0, 'percentual': -10.0}
+        assert l2_comp['variacao']['ovos'] == {'delta': 350, 'percentual': None}
+        assert 'taxa_postura' not in l2_comp['variacao']
+
+        total = comparacao['total']
+        assert total['atual']['ovos'] == 7 * 81 + 7 * 50 and total['anterior']['ovos'] == 7 * 90
+        assert total['atual']['media_diaria'] == 131.0
+
+        so_l2 = ProducaoController.comparar_periodos(atual, anterior, lote='L2')
+        assert [l['numero_lote'] for l in so_l2['lotes']] == ['L2']
+        assert so_l2['total']['atual']['ovos'] == 350
+
+        vazio = ProducaoController.comparar_periodos((date(2020, 1, 6), date(2020, 1, 12)), (date(2019, 1, 7), date(2019, 1, 13)))
+        assert vazio['lotes'] == [] and vazio['total']['atual']['ovos'] == 0
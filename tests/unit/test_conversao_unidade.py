@@ -0,0 +1,119 @@
+from datetime import date, timedelta
+from decimal import Decimal
+import pytest
+from app.controllers.export_controller import RelatoriosInsumosController
+from app.controllers.insumo_controller import InsumoController, MovimentacaoInsumoController, SaldoInsumoController
+from app.controllers.previsao_controller import PrevisaoConsumoController
+from app.controllers.unidade_controller import ConversaoUnidadeController
+from app.exceptions import BusinessError
+from app.models.database import db, InsumoNovo, MovimentacaoInsumo, PrevisaoConsumo, Usuarios
+
+def test_lancamentos_em_outras_unidades_vao_para_a_base(banco):
+    hoje = date.today()
+    with db.connection_context():
+        usuario_id = Usuarios.get().id_usuario
+        racao = InsumoController.criar_insumo('Ração', 'Ração', 'kg', Decimal('100'), Decimal('0'), usuario_id=usuario_id)
+        ConversaoUnidadeController.definir_conversao(racao.id_insumo, 'saco', 25, 'kg')
+
+        MovimentacaoInsumoController.criar_movimentacao(racao.id_insumo, 'Entrada - Compra', 2, hoje,
+                                                        usuario_id=usuario_id, unidade='saco')
+        MovimentacaoInsumoController.criar_movimentacao(racao.id_insumo, 'Saída - Uso', 500, hoje,
+                                                        usuario_id=usuario_id, unidade='g')
+        resultado = MovimentacaoInsumoController.criar_movimentacoes(
+            [{'insumo_id': racao.id_insumo, 'tipo': 'Saída - Uso', 'quantidade': '0.01', 'unidade': 't'},
+             {'insumo_id': racao.id_insumo, 'tipo': 'Saída - Uso', 'quantidade': '1.5'}], hoje, usuario_id=usuario_id)
+        assert resultado == {'registradas': 2, 'erros': []}
+
+        assert InsumoNovo.get_by_id(racao.id_insumo).quantidade_atual == Decimal('138.00')
+        movs = list(MovimentacaoInsumo.select().order_by(MovimentacaoInsumo.id_movimentacao))
+        assert [(m.quantidade, m.unidade, m.quantidade_base) for m in movs[1:]] == [
+            (Decimal('2'), 'saco', 50_000_000), (Decimal('500'), 'g', 500_000),
+            (Decimal('0.01'), 't', 10_000_000), (Decimal('1.5'), 'kg', 1_500_000)]
+
+        dados = RelatoriosInsumosController.consumo(hoje - timedelta(days=1), hoje)
+        assert dados['consumo_por_insumo']['Ração']['total_consumido'] == Decimal('12.00')
+
+        with pytest.raises(BusinessError):
+            MovimentacaoInsumoController.criar_movimentacao(racao.id_insumo, 'Saída - Uso', 1, hoje,
+                                                            usuario_id=usuario_id, unidade='L')
+        with pytest.raises(BusinessError):
+            ConversaoUnidadeController.definir_conversao(racao.id_insumo, 'caixa', 12, 'un')
+        with pytest.raises(BusinessError):
+            InsumoController.atualizar_insumo(racao.id_insumo, 'Ração', 'Ração', 'g', Decimal('0'))
+
+def test_peso_do_saco_definido_depois_converte_o_historico(banco):
+    hoje = date.today()
+    with db.connection_context():
+        usuario_id = Usuarios.get().id_usuario
+        milho = InsumoController.criar_insumo('Milho', 'Ração', 'saco', Decimal('10'), Decimal('0'), usuario_id=usuario_id)
+        MovimentacaoInsumoController.criar_movimentacao(milho.id_insumo, 'Saída - Uso', 2, hoje, usuario_id=usuario_id)
+        with pytest.raises(BusinessError):          # sem peso do saco, kg não é conversível
+            MovimentacaoInsumoController.criar_movimentacao(milho.id_insumo, 'Saída - Uso', 30, hoje,
+                                                            usuario_id=usuario_id, unidade='kg')
+
+        ConversaoUnidadeController.definir_conversao(milho.id_insumo, 'saco', 30, 'kg')
+        MovimentacaoInsumoController.criar_movimentacao(milho.id_insumo, 'Saída - Uso', 15, hoje,
+                                                        usuario_id=usuario_id, unidade='kg')
+
+        assert InsumoNovo.get_by_id(milho.id_insumo).quantidade_atual == Decimal('7.50')
+        assert sorted(m.quantidade_base for m in MovimentacaoInsumo.select()) == [15_000_000, 60_000_000, 300_000_000]
+        dados = RelatoriosInsumosController.consumo(hoje, hoje)
+        assert dados['consumo_por_insumo']['Milho']['total_consumido'] == Decimal('2.50')
+
+def test_estoque_e_historico_na_mesma_escala(banco):
+    hoje = date.today()
+    with db.connection_context():
+        usuario_id = Usuarios.get().id_usuario
+        racao = InsumoController.criar_insumo('Ração', 'Ração', 'kg', Decimal('10'), Decimal('0'), usuario_id=usuario_id)
+        for _ in range(10):
+            MovimentacaoInsumoController.criar_movimentacao(racao.id_insumo, 'Saída - Uso', 5, hoje,
+                                                            usuario_id=usuario_id, unidade='g')
+        MovimentacaoInsumoController.criar_movimentacao(racao.id_insumo, 'Saída - Uso', 4, hoje,
+                                                        usuario_id=usuario_id, unidade='g')
+
+        insumo = InsumoNovo.get_by_id(racao.id_insumo)
+        assert insumo.estoque_base == 9_946_000
+        assert insumo.quantidade_atual == Decimal('9.95')
+        dados = RelatoriosInsumosController.consumo(hoje, hoje)
+        assert dados['consumo_por_insumo']['Ração']['total_consumido'] == Decimal('0.05')
+
+        with pytest.raises(BusinessError):
+            MovimentacaoInsumoController.criar_movimentacao(racao.id_insumo, 'Saída - Uso', Decimal('9.95'), hoje,
+                                                            usuario_id=usuario_id)
+        MovimentacaoInsumoController.criar_movimentacao(racao.id_insumo, 'Saída - Uso', 9946, hoje,
+                                                        usuario_id=usuario_id, unidade='g')
+        assert InsumoNovo.get_by_id(racao.id_insumo).estoque_base == 0
+
+def test_novo_peso_do_saco_mantem_inventario_e_historico(banco):
+    hoje = date.today()
+    with db.connection_context():
+        usuario_id = Usuarios.get().id_usuario
+        milho = InsumoController.criar_insumo('Milho', 'Ração', 'saco', Decimal('10'), Decimal('0'), usuario_id=usuario_id)
+        ConversaoUnidadeController.definir_conversao(milho.id_insumo, 'saco', 25, 'kg')
+        MovimentacaoInsumoController.criar_movimentacao(milho.id_insumo, 'Entrada - Compra', 4,
+                                                        hoje - timedelta(days=40), usuario_id=usuario_id)
+        MovimentacaoInsumoController.criar_movimentacao(milho.id_insumo, 'Saída - Uso', 2,
+                                                        hoje - timedelta(days=5), usuario_id=usuario_id)
+        assert SaldoInsumoController.gerar_checkpoints() >= 1
+        PrevisaoConsumoController.atualizar()
+        nivel = PrevisaoConsumo.get().nivel
+
+        # 12 sacos de 25 kg = 300 kg = 15 sacos de 20 kg, hoje e em qualquer data do histórico
+        ConversaoUnidadeController.definir_conversao(milho.id_insumo, 'saco', 20, 'kg')
+        assert InsumoNovo.get_by_id(milho.id_insumo).quantidade_atual == Decimal('15.00')
+        saldo = lambda dia: SaldoInsumoController.inventario_em(dia)[0]['saldo']
+        assert saldo(hoje) == Decimal('15.00')
+        assert saldo(hoje - timedelta(days=6)) == Decimal('5.00')
+        assert saldo(hoje - timedelta(days=41)) == Decimal('0.00')
+
+        # O estoque inicial (10 sacos de 25 kg) é datado de hoje; a saída, lançada depois dele, de 5 dias atrás
+        inicial, saida, _ = MovimentacaoInsumoController.listar_movimentacoes(insumo_id=milho.id_insumo)['movimentacoes']
+        assert (saida.estoque_anterior, saida.estoque_posterior, saida.saldo_acumulado) == (
+            Decimal('17.50'), Decimal('15.00'), Decimal('2.50'))
+        assert (inicial.estoque_anterior, inicial.estoque_posterior, inicial.saldo_acumulado) == (
+            Decimal('0.00'), Decimal('12.50'), Decimal('15.00'))
+        assert PrevisaoConsumo.get().nivel == pytest.approx(nivel * 25 / 20)
+
+        # Lançamentos novos continuam a partir do mesmo estoque
+        MovimentacaoInsumoController.criar_movimentacao(milho.id_insumo, 'Saída - Uso', 5, hoje, usuario_id=usuario_id)
+        assert saldo(hoje) == InsumoNovo.get_by_id(milho.id_insumo).quantidade_atual == Decimal('10.00')
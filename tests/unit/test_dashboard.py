@@ -0,0 +1,69 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from app.controllers.dashboard_controller import DashboardController
+from app.controllers.producao_controller import ProducaoController
+from app.models.database import db, Lote
+
+def test_resumo_em_cache_e_invalidado_pela_producao(banco):
+    with db.connection_context():
+        DashboardController.invalidar()
+        hoje = date.today()
+        lote = Lote.create(numero_lote='L1', data_entrada=date(2024, 1, 1), quantidade_inicial=300,
+                           idade_inicial=18, raca='Isa Brown', fornecedor='-')
+        Lote.create(numero_lote='L2', data_entrada=date(2024, 1, 1), quantidade_inicial=200,
+                    idade_inicial=18, raca='Isa Brown', fornecedor='-')
+        if hoje.day > 1:
+            ProducaoController.criar_producao(lote.id_lote, hoje - timedelta(days=1), 300, 250, 'Boa', 0, 'Teste')
+        ProducaoController.criar_producao(lote.id_lote, hoje, 300, 270, 'Boa', 0, 'Teste')
+
+        resumo = DashboardController.resumo()
+        assert resumo['total_lotes'] == 2 and resumo['total_aves'] == 500
+        assert resumo['producao_hoje'] == 270
+        assert resumo['producao_mes'] == (520 if hoje.day > 1 else 270)
+        assert resumo['ultimas_producoes'][0]['quantidade_ovos'] == 270
+        assert resumo['ultimas_producoes'][0]['lote'] == 'L1'
+
+        # Sem escrita de produção o cache vale até o TTL; a escrita o invalida
+        Lote.create(numero_lote='L3', data_entrada=date(2024, 1, 1), quantidade_inicial=100,
+                    idade_inicial=18, raca='Isa Brown', fornecedor='-')
+        assert DashboardController.resumo() is resumo
+        ProducaoController.criar_producao(lote.id_lote, hoje, 300, 280, 'Boa', 0, 'Teste')
+        atualizado = DashboardController.resumo()
+        assert atualizado['producao_hoje'] == 280 and atualizado['total_lotes'] == 3
+
+def test_resumo_calculado_durante_a_escrita_nao_fica_em_cache(banco, monkeypatch):
+    with db.connection_context():
+        DashboardController.invalidar()
+        hoje = date.today()
+        lote = Lote.create(numero_lote='L1', data_entrada=date(2024, 1, 1), quantidade_inicial=300,
+                           idade_inicial=18, raca='Isa Brown', fornecedor='-')
+        recalcular = ProducaoController._recalcular_resumo_diario
+
+        def recalcular_com_leitura_concorrente(lote_id, dia):
+            recalcular(lote_id, dia)
+            # Outra requisição do mesmo worker lê antes do commit: vê (e guarda) o estado anterior
+            def ler():
+                with db.connection_context():
+                    return DashboardController.resumo()
+            with ThreadPoolExecutor(1) as executor:
+                assert executor.submit(ler).result()['producao_hoje'] == 0
+
+        monkeypatch.setattr(ProducaoController, '_recalcular_resumo_diario',
+                            staticmethod(recalcular_com_leitura_concorrente))
+        ProducaoController.criar_producao(lote.id_lote, hoje, 300, 270, 'Boa', 0, 'Teste')
+        assert DashboardController.resumo()['producao_hoje'] == 270
+
+def test_resumo_invalidado_durante_o_calculo_nao_fica_em_cache(banco, monkeypatch):
+    with db.connection_context():
+        DashboardController.invalidar()
+        calcular = DashboardController._calcular
+
+        def calcular_com_commit_no_meio(hoje):
+            resumo = calcular(hoje)
+            DashboardController.invalidar()         # escrita concorrente termina depois da leitura
+            return resumo
+
+        monkeypatch.setattr(DashboardController, '_calcular', staticmethod(calcular_com_commit_no_meio))
+        resumo = DashboardController.resumo()
+        monkeypatch.setattr(DashboardController, '_calcular', staticmethod(calcular))
+        assert DashboardController.resumo() is not resumo
@@ -0,0 +1,47 @@
+import io
+import openpyxl
+from app.api.endpoints.producao_api import _ler_csv, _ler_xlsx
+from app.controllers.lote_controller import LoteController
+from app.controllers.producao_controller import ProducaoController
+from app.models.database import db, Producao
+
+def test_inteiro_e_id_e_texto_e_numero_do_lote(banco, criar_lote):
+    with db.connection_context():
+        numero_3, l2, l3 = criar_lote('3'), criar_lote('L2'), criar_lote('L3')
+        assert l3.id_lote == 3 and numero_3.id_lote != 3
+
+        mapa = LoteController.mapa_referencias([3, ' 3 ', '2', 'L2', 99, '99', None, ''])
+        assert mapa == {3: l3.id_lote, '3': numero_3.id_lote, '2': l2.id_lote, 'L2': l2.id_lote}
+        assert LoteController.buscar_por_referencia(3).id_lote == mapa[3]
+
+        registro = {'data_coleta': '2024-05-06', 'quantidade_aves': 100, 'quantidade_ovos': 80,
+                    'qualidade_producao': 'Bom', 'responsavel': 'Teste'}
+        resultado = ProducaoController.importar_registros([{**registro, 'id_lote': 3},
+                                                           {**registro, 'id_lote': '3'},
+                                                           {**registro, 'lote': 99}], parcial=True)
+        assert resultado['inseridos'] == 2
+        assert resultado['erros'] == [{'linha': 3, 'erro': 'Lote não encontrado: 99'}]
+        assert sorted(p.id_lote for p in Producao.select()) == sorted([l3.id_lote, numero_3.id_lote])
+
+def test_linhas_dos_erros_sao_as_do_arquivo_com_linhas_em_branco(banco, criar_lote):
+    cabecalho = ['lote', 'data_coleta', 'quantidade_aves', 'quantidade_ovos', 'qualidade_producao']
+    linhas = [['L1', '2024-05-06', 100, 80, 'Bom'],
+              [],                                         # linha 3 em branco
+              ['L1', '2024-05-07', 100, 85, 'Bom'],
+              ['X9', '2024-05-08', 100, 90, 'Bom']]       # linha 5: lote inexistente
+
+    csv = io.BytesIO('\n'.join(','.join(map(str, l)) for l in [cabecalho] + linhas).encode())
+    pasta = openpyxl.Workbook()
+    for linha in [cabecalho] + linhas:
+        pasta.active.append(linha)
+    xlsx = io.BytesIO()
+    pasta.save(xlsx)
+    xlsx.seek(0)
+
+    with db.connection_context():
+        criar_lote('L1')
+        for registros, numeros in (_ler_csv(csv), _ler_xlsx(xlsx)):
+            assert numeros == [2, 4, 5]
+            resultado = ProducaoController.importar_registros(registros, responsavel_padrao='Teste', parcial=True,
+                                                              linhas=numeros)
+            assert resultado['erros'] == [{'linha': 5, 'erro': 'Lote não encontrado: X9'}]
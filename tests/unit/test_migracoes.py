@@ -0,0 +1,91 @@
+import datetime
+import sqlite3
+from pathlib import Path
+import pytest
+from app.config import Config
+from app.models.database import db, configurar_banco
+from app.models.migrations import migrar, versao_atual, _MIGRACOES
+
+BANCO_LEGADO = Path(__file__).resolve().parents[2] / 'BD_Granja.db'
+
+def _esquema() -> dict:
+    """Colunas, chaves estrangeiras e índices de cada tabela, sem depender da ordem das colunas."""
+    esquema = {}
+    for tabela in db.get_tables():
+        if tabela.startswith('sqlite_'):      # estatísticas do ANALYZE
+            continue
+        colunas = {(c[1], c[2], c[3], c[5]) for c in db.execute_sql(f'PRAGMA table_info("{tabela}")')}
+        chaves = {(f[2], f[3], f[4]) for f in db.execute_sql(f'PRAGMA foreign_key_list("{tabela}")')}
+        indices = {(i[1], i[2], i[4], tuple(c[2] for c in db.execute_sql(f'PRAGMA index_info("{i[1]}")')))
+                   for i in db.execute_sql(f'PRAGMA index_list("{tabela}")') if i[3] == 'c'}
+        esquema[tabela] = (colunas, chaves, indices)
+    return esquema
+
+def _abrir(caminho):
+    config = {chave: valor for chave, valor in vars(Config).items() if chave.isupper()}
+    configurar_banco(config | {'DATABASE_PATH': str(caminho)})
+
+@pytest.fixture
+def banco_legado(tmp_path):
+    """Schema do BD_Granja.db versionado (anterior às migrações) com registros no formato antigo."""
+    origem = sqlite3.connect(f'file:{BANCO_LEGADO}?mode=ro', uri=True)
+    definicoes = [sql for (sql,) in origem.execute("SELECT sql FROM sqlite_master WHERE sql IS NOT NULL "
+                                                   "AND name NOT LIKE 'sqlite_%' ORDER BY type DESC")]
+    origem.close()
+    if any('schema_version' in sql for sql in definicoes):
+        pytest.skip('BD_Granja.db local já foi migrado')
+
+    caminho = tmp_path / 'legado.db'
+    destino = sqlite3.connect(caminho)
+    for sql in definicoes:
+        destino.execute(sql)
+
+    hoje = datetime.date(2024, 5, 6)
+    destino.execute("INSERT INTO usuarios VALUES (1, 'Ana', 'ana', 'ana@granja.com', '000.000.000-00', 'x', "
+                    "'ADMIN', '1', 'F', '1990-01-01', '-', '2020-01-01', '-', '-')")
+    destino.execute("INSERT INTO lotes VALUES (1, 'A1', '2024-01-01', 100, 18, 'Isa Brown', '-', NULL, 1)")
+    destino.execute("INSERT INTO lotes VALUES (2, 'B2', '2024-01-01', 100, 18, 'Isa Brown', '-', NULL, 1)")
+    producao = 'INSERT INTO producao VALUES (?, ?, ?, 100, \'Bom\', 0, ?, NULL, \'Ana\')'
+    destino.executemany(producao, [
+        (1, hoje, 80, 'A1'),                            # número do lote
+        (2, hoje, 85, ' A1 '),                          # mesmo lote e dia, reenviado: fica este
+        (3, hoje, 70, '2'),                             # id numérico
+        (4, hoje, 60, 'X9'),                            # lote não cadastrado
+    ])
+    destino.execute("INSERT INTO historico_producao VALUES (1, 1, 1, 'UPDATE', NULL, NULL, '2024-05-06 08:00')")
+    destino.execute("INSERT INTO aves VALUES (1, 'X9', 'Isa Brown', '2024-01-01', 120, 1.8, '-', 'Piso', '-', NULL, 1)")
+    destino.execute("INSERT INTO vacinacao VALUES (1, '2024-05-01', 'Ana', 'Newcastle', 'B2', 100, NULL)")
+    destino.execute("INSERT INTO user_activity_logs VALUES (1, 1, 'login', NULL, '2024-05-06 08:00')")
+    destino.execute("INSERT INTO user_activity_logs VALUES (2, 7, 'login', NULL, '2024-05-06 09:00')")
+    destino.commit()
+    destino.close()
+
+    _abrir(caminho)
+    yield db
+    db.close_all()
+    _abrir(Config.DATABASE_PATH)
+
+def test_migracoes_em_banco_legado(banco_legado, tmp_path):
+    with db.connection_context():
+        assert migrar(backup=False) == len(_MIGRACOES)
+        assert versao_atual() == _MIGRACOES[-1][0]
+
+        lotes = {n: (i, a) for i, n, a in db.execute_sql('SELECT id_lote, numero_lote, ativo FROM lotes')}
+        assert lotes['X9'][1] == 0                                                   # lote de espera inativo
+        assert sorted(db.execute_sql('SELECT id_producao, id_lote FROM producao')) == [
+            (2, lotes['A1'][0]), (3, lotes['B2'][0]), (4, lotes['X9'][0])]
+        assert list(db.execute_sql('SELECT producao_id FROM historico_producao')) == [(2,)]
+        assert list(db.execute_sql('SELECT id_lote FROM aves')) == [(lotes['X9'][0],)]
+        assert list(db.execute_sql('SELECT id_lote FROM vacinacao')) == [(lotes['B2'][0],)]
+        assert sorted(db.execute_sql('SELECT id_lote, total_ovos FROM producao_diaria')) == sorted(
+            [(lotes['A1'][0], 85), (lotes['B2'][0], 70), (lotes['X9'][0], 60)])
+        assert sorted(db.execute_sql('SELECT id_log, usuario_id FROM user_activity_logs')) == [(1, 1), (2, None)]
+        migrado = _esquema()
+
+    _abrir(tmp_path / 'novo.db')
+    with db.connection_context():
+        migrar(backup=False)
+        novo = _esquema()
+    assert migrado.keys() == novo.keys()
+    for tabela in novo:
+        assert migrado[tabela] == novo[tabela], tabela
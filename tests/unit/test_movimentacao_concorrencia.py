@@ -0,0 +1,86 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from decimal import Decimal
+from peewee import fn
+from app.controllers.insumo_controller import InsumoController, MovimentacaoInsumoController
+from app.exceptions import BusinessError
+from app.models.database import db, InsumoNovo, MovimentacaoInsumo, Usuarios
+
+THREADS = 16
+
+def _retirar(insumo_id, usuario_id, quantidade=Decimal('1')):
+    with db.connection_context():
+        try:
+            MovimentacaoInsumoController.criar_movimentacao(insumo_id, 'Saída - Uso', quantidade,
+                                                            date.today(), usuario_id=usuario_id)
+            return True
+        except BusinessError as e:
+            assert e.message == "Estoque insuficiente"
+            return False
+
+def _novo_insumo(quantidade):
+    with db.connection_context():
+        return InsumoController.criar_insumo('Ração postura', 'Ração', 'kg', Decimal(quantidade), Decimal('0'),
+                                             usuario_id=Usuarios.get().id_usuario)
+
+def _estoque(insumo_id):
+    with db.connection_context():
+        return InsumoNovo.get_by_id(insumo_id).quantidade_atual
+
+def test_saidas_concorrentes_nao_perdem_atualizacao(banco):
+    insumo = _novo_insumo('1000')
+    usuario_id = Usuarios.get().id_usuario
+
+    with ThreadPoolExecutor(THREADS) as executor:
+        resultados = list(executor.map(lambda _: _retirar(insumo.id_insumo, usuario_id), range(400)))
+
+    assert all(resultados)
+    assert _estoque(insumo.id_insumo) == Decimal('600')
+
+def test_saidas_concorrentes_nunca_deixam_estoque_negativo(banco):
+    insumo = _novo_insumo('50')
+    usuario_id = Usuarios.get().id_usuario
+
+    with ThreadPoolExecutor(THREADS) as executor:
+        resultados = list(executor.map(lambda _: _retirar(insumo.id_insumo, usuario_id), range(200)))
+
+    assert sum(resultados) == 50
+    assert _estoque(insumo.id_insumo) == Decimal('0')
+
+    with db.connection_context():
+        saidas = (MovimentacaoInsumo.select(MovimentacaoInsumo.estoque_anterior, MovimentacaoInsumo.estoque_posterior)
+                  .where((MovimentacaoInsumo.insumo == insumo.id_insumo) & (MovimentacaoInsumo.tipo == 'Saída - Uso'))
+                  .order_by(MovimentacaoInsumo.id_movimentacao))
+        # Cada saída parte exatamente do saldo deixado pela anterior
+        saldos = [(s.estoque_anterior, s.estoque_posterior) for s in saidas]
+        assert saldos == [(Decimal(50 - i), Decimal(49 - i)) for i in range(50)]
+        assert InsumoNovo.get_by_id(insumo.id_insumo).versao == 50
+
+def test_ajuste_define_valor_exato(banco):
+    insumo = _novo_insumo('10')
+    with db.connection_context():
+        mov = MovimentacaoInsumoController.criar_movimentacao(insumo.id_insumo, 'Ajuste', Decimal('7.5'),
+                                                              date.today(), usuario_id=Usuarios.get().id_usuario)
+        assert (mov.estoque_anterior, mov.estoque_posterior) == (Decimal('10'), Decimal('7.5'))
+    assert _estoque(insumo.id_insumo) == Decimal('7.5')
+
+def test_quantidades_fracionadas_nao_acumulam_erro(banco):
+    with db.connection_context():
+        usuario_id = Usuarios.get().id_usuario
+        insumo = InsumoController.criar_insumo('Vitamina', 'Medicamentos', 'L', Decimal('0.30'), Decimal('0'),
+                                               usuario_id=usuario_id)
+        MovimentacaoInsumoController.criar_movimentacao(insumo.id_insumo, 'Saída - Uso', Decimal('0.10'),
+                                                        date.today(), usuario_id=usuario_id)
+        mov = MovimentacaoInsumoController.criar_movimentacao(insumo.id_insumo, 'Saída - Uso', Decimal('0.20'),
+                                                              date.today(), usuario_id=usuario_id)
+        assert (mov.estoque_anterior, mov.estoque_posterior) == (Decimal('0.20'), Decimal('0.00'))
+
+        for _ in range(10):
+            MovimentacaoInsumoController.criar_movimentacao(insumo.id_insumo, 'Entrada - Compra', Decimal('0.10'),
+                                                            date.today(), usuario_id=usuario_id)
+        resultado = MovimentacaoInsumoController.criar_movimentacoes(
+            [{'insumo_id': insumo.id_insumo, 'tipo': 'Saída - Uso', 'quantidade': '0.70'},
+             {'insumo_id': insumo.id_insumo, 'tipo': 'Saída - Uso', 'quantidade': '0.30'}],
+            date.today(), usuario_id=usuario_id)
+        assert resultado['erros'] == []
+    assert _estoque(insumo.id_insumo) == Decimal('0')
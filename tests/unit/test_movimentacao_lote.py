@@ -0,0 +1,43 @@
+from datetime import date
+from decimal import Decimal
+from app.controllers.insumo_controller import InsumoController, MovimentacaoInsumoController
+from app.models.database import db, InsumoNovo, MovimentacaoInsumo, Usuarios
+
+def _insumos(*quantidades):
+    usuario_id = Usuarios.get().id_usuario
+    return [InsumoController.criar_insumo(f'Insumo {n}', 'Ração', 'kg', Decimal(q), Decimal('0'), usuario_id=usuario_id)
+            for n, q in enumerate(quantidades)]
+
+def test_movimentacoes_em_lote_sao_aplicadas_juntas(banco):
+    with db.connection_context():
+        racao, milho = _insumos('100', '40')
+        itens = [
+            {'insumo_id': racao.id_insumo, 'tipo': 'Saída - Uso', 'quantidade': '30'},
+            {'insumo_id': milho.id_insumo, 'tipo': 'Saída - Uso', 'quantidade': '15.5'},
+            {'insumo_id': racao.id_insumo, 'tipo': 'Saída - Uso', 'quantidade': '20'},
+        ]
+        resultado = MovimentacaoInsumoController.criar_movimentacoes(itens, date.today(), Usuarios.get().id_usuario)
+
+        assert resultado == {'registradas': 3, 'erros': []}
+        assert InsumoNovo.get_by_id(racao.id_insumo).quantidade_atual == Decimal('50')
+        assert InsumoNovo.get_by_id(milho.id_insumo).quantidade_atual == Decimal('24.5')
+        saldos = [(m.estoque_anterior, m.estoque_posterior) for m in
+                  MovimentacaoInsumo.select().where((MovimentacaoInsumo.insumo == racao.id_insumo) &
+                                                    (MovimentacaoInsumo.tipo == 'Saída - Uso'))
+                  .order_by(MovimentacaoInsumo.id_movimentacao)]
+        assert saldos == [(Decimal('100'), Decimal('70')), (Decimal('70'), Decimal('50'))]
+
+def test_movimentacoes_em_lote_sao_tudo_ou_nada(banco):
+    with db.connection_context():
+        racao, milho = _insumos('100', '10')
+        movimentacoes_antes = MovimentacaoInsumo.select().count()
+        itens = [
+            {'insumo_id': racao.id_insumo, 'tipo': 'Saída - Uso', 'quantidade': '30'},
+            {'insumo_id': milho.id_insumo, 'tipo': 'Saída - Uso', 'quantidade': '11'},
+        ]
+        resultado = MovimentacaoInsumoController.criar_movimentacoes(itens, date.today(), Usuarios.get().id_usuario)
+
+        assert resultado['registradas'] == 0
+        assert [e['item'] for e in resultado['erros']] == [2]
+        assert InsumoNovo.get_by_id(racao.id_insumo).quantidade_atual == Decimal('100')
+        assert MovimentacaoInsumo.select().count() == movimentacoes_antes
@@ -0,0 +1,56 @@
+import datetime
+from datetime import date, timedelta
+from decimal import Decimal
+from app.controllers.insumo_controller import MovimentacaoInsumoController, SaldoInsumoController
+from app.models.database import db, InsumoNovo, MovimentacaoInsumo, Usuarios
+
+def test_paginas_por_cursor_com_saldo_acumulado(banco):
+    inicio = date.today() - timedelta(days=90)
+    with db.connection_context():
+        usuario = Usuarios.get()
+        racao = InsumoNovo.create(nome='Ração', categoria='Ração', unidade='kg')
+        cal = InsumoNovo.create(nome='Cal', categoria='Limpeza', unidade='kg')
+
+        for n in range(30):
+            dia = inicio + timedelta(days=n * 3)
+            MovimentacaoInsumoController.criar_movimentacao(racao.id_insumo, 'Entrada - Compra', 10, dia,
+                                                            usuario_id=usuario.id_usuario)
+            MovimentacaoInsumoController.criar_movimentacao(racao.id_insumo, 'Saída - Uso', 4, dia,
+                                                            usuario_id=usuario.id_usuario)
+            # Mesmo dia gravado com hora, misturado às datas sem hora
+            MovimentacaoInsumo.create(insumo=cal, tipo='Entrada - Compra', quantidade=1, usuarios=usuario,
+                                      data_movimentacao=datetime.datetime.combine(dia, datetime.time(9)),
+                                      estoque_anterior=n, estoque_posterior=n + 1,
+                                      estoque_anterior_base=n * 10 ** 6, estoque_posterior_base=(n + 1) * 10 ** 6)
+        SaldoInsumoController.gerar_checkpoints()
+
+        vistas, cursor = [], None
+        while True:
+            pagina = MovimentacaoInsumoController.listar_movimentacoes(apos=cursor, limite=7)
+            vistas += pagina['movimentacoes']
+            cursor = pagina['proximo']
+            if not cursor:
+                break
+
+        todas = list(MovimentacaoInsumo.select().order_by(MovimentacaoInsumo.data_movimentacao.desc(),
+                                                          MovimentacaoInsumo.id_movimentacao.desc()))
+        assert [m.id_movimentacao for m in vistas] == [m.id_movimentacao for m in todas]
+        assert vistas[0].insumo.nome in ('Ração', 'Cal') and vistas[0].usuarios.nome == 'Teste'
+
+        saldos, esperado = {}, {}
+        for mov in reversed(todas):
+            saldos[mov.insumo_id] = saldos.get(mov.insumo_id, 0) + mov.estoque_posterior - mov.estoque_anterior
+            esperado[mov.id_movimentacao] = saldos[mov.insumo_id]
+        assert all(m.saldo_acumulado == esperado[m.id_movimentacao] for m in vistas)
+        assert vistas[0].saldo_acumulado in (Decimal('180.00'), Decimal('30.00'))
+
+        # Voltando a partir da segunda página, com filtro
+        primeira = MovimentacaoInsumoController.listar_movimentacoes(insumo_id=cal.id_insumo, limite=5)
+        segunda = MovimentacaoInsumoController.listar_movimentacoes(insumo_id=cal.id_insumo, limite=5,
+                                                                   apos=primeira['proximo'])
+        volta = MovimentacaoInsumoController.listar_movimentacoes(insumo_id=cal.id_insumo, limite=5,
+                                                                 antes=segunda['anterior'])
+        assert primeira['anterior'] is None and segunda['anterior'] is not None
+        assert [m.id_movimentacao for m in volta['movimentacoes']] == \
+               [m.id_movimentacao for m in primeira['movimentacoes']]
+        assert volta['anterior'] is None and volta['proximo'] == primeira['proximo']
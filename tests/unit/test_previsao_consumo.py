@@ -0,0 +1,52 @@
+from datetime import date, timedelta
+from decimal import Decimal
+import pytest
+from app.controllers.previsao_controller import PrevisaoConsumoController
+from app.models.database import db, InsumoNovo, PrevisaoConsumo, Usuarios
+
+def _estados():
+    return {p.insumo_id: (p.nivel, p.tendencia, p.variancia, p.dias_ajustados, p.ultimo_dia)
+            for p in PrevisaoConsumo.select()}
+
+def test_atualizacao_incremental_igual_ao_ajuste_completo(banco, criar_movimentacao):
+    hoje = date.today()
+    with db.connection_context():
+        usuario = Usuarios.get()
+        racao = InsumoNovo.create(nome='Ração', categoria='Ração', unidade='kg', quantidade_atual=1000)
+        cal = InsumoNovo.create(nome='Cal', categoria='Limpeza', unidade='kg', quantidade_atual=10)
+        for dias_atras in range(90, 0, -1):
+            criar_movimentacao(racao, 'Saída - Uso', 10 + (90 - dias_atras) % 7, hoje - timedelta(days=dias_atras),
+                               usuario)
+        for dias_atras in range(15, 0, -3):
+            criar_movimentacao(cal, 'Saída - Uso', 2, hoje - timedelta(days=dias_atras), usuario)
+
+        assert PrevisaoConsumoController.atualizar(hoje - timedelta(days=30)) == 1
+        assert PrevisaoConsumoController.atualizar(hoje - timedelta(days=10)) == 2
+        criar_movimentacao(racao, 'Saída - Uso', 30, hoje - timedelta(days=40), usuario)     # lançada com atraso
+        PrevisaoConsumoController.atualizar()
+        incremental = _estados()
+
+        PrevisaoConsumoController.reconstruir()
+        completo = _estados()
+        assert incremental.keys() == completo.keys() == {racao.id_insumo, cal.id_insumo}
+        for insumo_id, estado in completo.items():
+            assert incremental[insumo_id] == pytest.approx(estado)
+
+def test_data_de_ruptura_com_consumo_constante(banco, criar_movimentacao):
+    hoje = date.today()
+    with db.connection_context():
+        usuario = Usuarios.get()
+        racao = InsumoNovo.create(nome='Ração', categoria='Ração', unidade='kg', quantidade_atual=Decimal('200'))
+        InsumoNovo.create(nome='Vacina', categoria='Medicamento', unidade='un', quantidade_atual=5)
+        for dias_atras in range(60, 0, -1):
+            criar_movimentacao(racao, 'Saída - Uso', 10, hoje - timedelta(days=dias_atras), usuario)
+
+        # A consulta só lê o estado salvo
+        assert PrevisaoConsumoController.prever()[0]['ajustado_ate'] is None
+        PrevisaoConsumoController.atualizar()
+        previsao = {p['nome']: p for p in PrevisaoConsumoController.prever()}
+        assert previsao['Ração']['consumo_diario_previsto'] == pytest.approx(10)
+        assert previsao['Ração']['data_ruptura'] == hoje - timedelta(days=1) + timedelta(days=20)
+        assert previsao['Ração']['data_ruptura_min'] <= previsao['Ração']['data_ruptura'] <= previsao['Ração']['data_ruptura_max']
+        assert previsao['Vacina']['data_ruptura'] is None
+        assert previsao['Vacina']['consumo_diario_previsto'] == 0
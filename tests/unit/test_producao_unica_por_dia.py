@@ -0,0 +1,48 @@
+from datetime import date, datetime
+import pytest
+from app.controllers.producao_controller import ProducaoController
+from app.exceptions import BusinessError
+from app.models.database import db, Producao, ProducaoDiaria
+
+def test_segundo_registro_do_dia_substitui_o_primeiro(banco, criar_lote):
+    with db.connection_context():
+        lote = criar_lote('L1')
+        primeiro, criado = ProducaoController.salvar_producao(lote.id_lote, datetime(2024, 5, 6, 7, 0), 100, 80,
+                                                              'Boa', 2, 'Ana')
+        assert criado is True
+        # Outro horário do mesmo dia, com o lote pelo número: mesma linha
+        segundo, criado = ProducaoController.salvar_producao('L1', datetime(2024, 5, 6, 17, 30), 100, 90,
+                                                             'Regular', 1, 'Bia', 'recontagem')
+        assert criado is False and segundo.id_producao == primeiro.id_producao
+        assert (segundo.quantidade_ovos, segundo.responsavel, segundo.observacoes) == (90, 'Bia', 'recontagem')
+        assert Producao.select().count() == 1
+        diaria = ProducaoDiaria.get()
+        assert (diaria.total_ovos, diaria.total_perdas, diaria.registros) == (90, 1, 1)
+
+def test_duplicados_no_mesmo_lote_de_importacao(banco, criar_lote):
+    with db.connection_context():
+        lote = criar_lote('L1')
+        ProducaoController.criar_producao(lote.id_lote, date(2024, 5, 6), 100, 50, 'Boa', 0, 'Ana')
+        registro = {'id_lote': lote.id_lote, 'quantidade_aves': 100, 'qualidade_producao': 'Bom',
+                    'responsavel': 'Teste'}
+        resultado = ProducaoController.importar_registros([
+            {**registro, 'data_coleta': '2024-05-06', 'quantidade_ovos': 60},
+            {**registro, 'data_coleta': '2024-05-07', 'quantidade_ovos': 70},
+            {**registro, 'data_coleta': '07/05/2024', 'quantidade_ovos': 75}])
+
+        # Dentro do lote enviado vale o último registro do dia
+        assert (resultado['inseridos'], resultado['atualizados']) == (1, 2)
+        producoes = {p.data_coleta: p.quantidade_ovos for p in Producao.select()}
+        assert producoes == {date(2024, 5, 6): 60, date(2024, 5, 7): 75}
+        assert {d.dia: d.total_ovos for d in ProducaoDiaria.select()} == producoes
+
+def test_atualizar_para_dia_ocupado_vira_erro_de_negocio(banco, criar_lote):
+    with db.connection_context():
+        lote = criar_lote('L1')
+        ProducaoController.criar_producao(lote.id_lote, date(2024, 5, 6), 100, 50, 'Boa', 0, 'Ana')
+        outro = ProducaoController.criar_producao(lote.id_lote, date(2024, 5, 7), 100, 60, 'Boa', 0, 'Ana')
+
+        with pytest.raises(BusinessError, match='Já existe um registro'):
+            ProducaoController.atualizar(outro.id_producao, data_coleta=date(2024, 5, 6))
+        assert Producao.get_by_id(outro.id_producao).data_coleta == date(2024, 5, 7)
+        assert {d.dia: d.total_ovos for d in ProducaoDiaria.select()} == {date(2024, 5, 6): 50, date(2024, 5, 7): 60}
@@ -0,0 +1,72 @@
+from datetime import date, timedelta
+import app.controllers.producao_controller as producao_controller
+from app.controllers.producao_controller import ProducaoController
+from app.models.database import db, ProducaoDiaria
+
+def _dias(lote, inicio, n, ovos, aves):
+    for d in range(n):
+        ProducaoDiaria.create(lote=lote, dia=inicio + timedelta(days=d), total_ovos=ovos,
+                              total_perdas=0, total_aves=aves, registros=1)
+
+def test_ranking_por_ave_dia_com_movimento(banco, criar_lote):
+    producao_controller._ranking_em_cache.clear()
+    with db.connection_context():
+        hoje = date.today()
+        anterior, atual = hoje - timedelta(days=13), hoje - timedelta(days=6)
+        grande = criar_lote('GRANDE', 1000)
+        pequeno = criar_lote('PEQUENO', 100)
+        novo = criar_lote('NOVO', 100)
+        antigo = criar_lote('ANTIGO', 100)
+        _dias(grande, anterior, 7, 900, 1000)       # 90% -> 80%, mas muito mais ovos
+        _dias(grande, atual, 7, 800, 1000)
+        _dias(pequeno, anterior, 7, 85, 100)        # 85% -> 95%
+        _dias(pequeno, atual, 7, 95, 100)
+        _dias(novo, atual, 7, 88, 100)              # só na janela atual
+        _dias(antigo, anterior, 7, 99, 100)         # só na janela anterior: fora do ranking
+        ProducaoDiaria.create(lote=antigo, dia=date(2023, 1, 1), total_ovos=99999,
+                              total_perdas=0, total_aves=1, registros=1)
+
+        ranking = ProducaoController.buscar_melhores_lotes(limite=5, dias=7, hoje=hoje)
+        assert [l['numero_lote'] for l in ranking] == ['PEQUENO', 'NOVO', 'GRANDE']
+        assert ranking[0]['taxa_postura'] == 95.0 and ranking[0]['ovos_por_ave_dia'] == 0.95
+        assert (ranking[0]['posicao_anterior'], ranking[0]['movimento']) == (3, 2)
+        assert ranking[1]['posicao_anterior'] is None and ranking[1]['movimento'] is None
+        assert (ranking[2]['posicao'], ranking[2]['posicao_anterior'], ranking[2]['movimento']) == (3, 2, -1)
+        assert ranking[2]['total_producao'] == 5600
+
+        # Só o ranking de hoje fica em cache, até a próxima escrita de produção
+        atual = ProducaoController.buscar_melhores_lotes(limite=5, dias=7)
+        assert atual == ranking and ProducaoController.buscar_melhores_lotes(limite=5, dias=7) is atual
+        assert ProducaoController.buscar_melhores_lotes(limite=5, dias=7, hoje=hoje) is not ranking
+        ProducaoController.criar_producao(novo.id_lote, hoje, 100, 10, 'Boa', 0, 'Teste')   # substitui o dia: 538 / 700
+        atualizado = ProducaoController.buscar_melhores_lotes(limite=5, dias=7)
+        assert atualizado is not atual and atualizado[-1]['numero_lote'] == 'NOVO'
+
+def test_cache_do_ranking_expira_e_tem_limite(banco, criar_lote, monkeypatch):
+    monkeypatch.setattr(producao_controller, 'RANKING_CACHE_MAX', 3)
+    producao_controller._ranking_em_cache.clear()
+    with db.connection_context():
+        _dias(criar_lote('L1', 100), date.today() - timedelta(days=6), 7, 90, 100)
+        primeiro = ProducaoController.buscar_melhores_lotes(dias=7, ttl=0)
+        assert ProducaoController.buscar_melhores_lotes(dias=7, ttl=0) is not primeiro     # expirado
+
+        for limite in range(1, 10):
+            ProducaoController.buscar_melhores_lotes(limite=limite, dias=7)
+        assert [chave[2] for chave in producao_controller._ranking_em_cache] == [7, 8, 9]
+        ProducaoController.buscar_melhores_lotes(dias=7, hoje=date(2020, 1, 1))
+        assert len(producao_controller._ranking_em_cache) == 3
+
+def test_ranking_invalidado_durante_o_calculo_nao_fica_em_cache(banco, criar_lote, monkeypatch):
+    producao_controller._ranking_em_cache.clear()
+    with db.connection_context():
+        _dias(criar_lote('L1', 100), date.today() - timedelta(days=6), 7, 90, 100)
+        calcular = ProducaoController._calcular_ranking
+
+        def calcular_com_commit_no_meio(hoje, dias, limite):
+            ranking = calcular(hoje, dias, limite)
+            producao_controller._invalidar_caches()     # escrita concorrente termina depois da leitura
+            return ranking
+
+        monkeypatch.setattr(ProducaoController, '_calcular_ranking', staticmethod(calcular_com_commit_no_meio))
+        ProducaoController.buscar_melhores_lotes(dias=7)
+        assert not producao_controller._ranking_em_cache
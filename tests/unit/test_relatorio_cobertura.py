@@ -0,0 +1,31 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from app.controllers.export_controller import RelatoriosInsumosController
+from app.controllers.insumo_controller import InsumoController, MovimentacaoInsumoController
+from app.models.database import db, Usuarios
+
+def test_cobertura_agrega_consumo_na_janela(banco):
+    hoje = date.today()
+    with db.connection_context():
+        usuario_id = Usuarios.get().id_usuario
+        racao = InsumoController.criar_insumo('Ração', 'Ração', 'kg', Decimal('300'), Decimal('0'), usuario_id=usuario_id)
+        vacina = InsumoController.criar_insumo('Vacina', 'Medicamento', 'un', Decimal('50'), Decimal('0'), usuario_id=usuario_id)
+        parado = InsumoController.criar_insumo('Cal', 'Limpeza', 'kg', Decimal('10'), Decimal('0'), usuario_id=usuario_id)
+
+        for dias_atras, quantidade in ((0, '5'), (3, '10'), (20, '15'), (30, '60'), (45, '100')):
+            MovimentacaoInsumoController.criar_movimentacao(racao.id_insumo, 'Saída - Uso', Decimal(quantidade),
+                                                            hoje - timedelta(days=dias_atras), usuario_id=usuario_id)
+        MovimentacaoInsumoController.criar_movimentacao(vacina.id_insumo, 'Saída - Perda', Decimal('20'), hoje,
+                                                        observacoes='quebra', usuario_id=usuario_id)
+
+        por_insumo = {item['insumo'].id_insumo: item for item in RelatoriosInsumosController.cobertura()}
+        # A janela de 30 dias vai de 29 dias atrás até hoje: a saída de 30 dias atrás fica de fora
+        assert por_insumo[racao.id_insumo]['total_consumido_30d'] == Decimal('30')
+        assert por_insumo[racao.id_insumo]['media_diaria'] == Decimal('1')
+        assert por_insumo[racao.id_insumo]['dias_cobertura'] == Decimal('110')
+        assert por_insumo[vacina.id_insumo]['total_consumido_30d'] == 0      # perdas não são consumo
+        assert por_insumo[parado.id_insumo]['dias_cobertura'] == 999
+
+        semana = {item['insumo'].id_insumo: item for item in RelatoriosInsumosController.cobertura(dias=7)}
+        assert semana[racao.id_insumo]['total_consumido_30d'] == Decimal('15')
+        assert RelatoriosInsumosController.cobertura(dias=60)[0]['total_consumido_30d'] == Decimal('190')
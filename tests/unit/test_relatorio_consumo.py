@@ -0,0 +1,37 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from app.controllers.export_controller import RelatoriosInsumosController
+from app.models.database import db, InsumoNovo, Usuarios
+
+def test_consumo_agrupado_por_insumo_e_semana(banco, criar_movimentacao):
+    segunda = date(2026, 3, 2)
+    with db.connection_context():
+        usuario = Usuarios.get()
+        racao = InsumoNovo.create(nome='Ração', categoria='Ração', unidade='kg')
+        racao_2 = InsumoNovo.create(nome='Ração', categoria='Ração', unidade='kg')
+        cal = InsumoNovo.create(nome='Cal', categoria='Limpeza', unidade='kg')
+        vacina = InsumoNovo.create(nome='Vacina', categoria='Medicamento', unidade='L')
+
+        criar_movimentacao(racao, 'Saída - Uso', 10, segunda, usuario)
+        criar_movimentacao(racao, 'Saída - Uso', 5, segunda + timedelta(days=6), usuario, hora=23)   # domingo à noite
+        criar_movimentacao(racao, 'Saída - Uso', 7, segunda + timedelta(days=7), usuario)
+        criar_movimentacao(racao, 'Saída - Perda', 100, segunda, usuario)
+        criar_movimentacao(racao, 'Saída - Uso', 50, segunda - timedelta(days=1), usuario)            # fora do período
+        criar_movimentacao(racao_2, 'Saída - Uso', 1, segunda, usuario)
+        criar_movimentacao(cal, 'Saída - Uso', 3, segunda + timedelta(days=8), usuario)
+        criar_movimentacao(vacina, 'Saída - Uso', 2, segunda, usuario)
+
+        dados = RelatoriosInsumosController.consumo(segunda, segunda + timedelta(days=13), agrupamento='semana')
+        assert [nome for nome, _ in dados['consumo_ordenado']] == ['Ração', 'Cal', 'Vacina',
+                                                                   f'Ração (#{racao_2.id_insumo})']
+        assert dados['consumo_por_insumo']['Ração']['total_consumido'] == Decimal('22')
+        assert dados['consumo_por_insumo']['Ração']['num_movimentacoes'] == 3
+        assert dados['consumo_por_insumo']['Ração']['por_periodo'] == [(segunda, Decimal('15')),
+                                                                       (segunda + timedelta(days=7), Decimal('7'))]
+        # Os totais por período não misturam unidades
+        assert dados['por_periodo'] == [(segunda, 'L', Decimal('2')), (segunda, 'kg', Decimal('16')),
+                                        (segunda + timedelta(days=7), 'kg', Decimal('10'))]
+        assert dados['total_quantidade'] == Decimal('28') and dados['total_movimentacoes'] == 6
+
+        limpeza = RelatoriosInsumosController.consumo(segunda, segunda + timedelta(days=13), categoria='Limpeza')
+        assert list(limpeza['consumo_por_insumo']) == ['Cal'] and limpeza['por_periodo'] == []
@@ -0,0 +1,59 @@
+from datetime import date, timedelta
+import pytest
+from app.controllers.producao_controller import ProducaoController
+from app.exceptions import BusinessError
+from app.models.database import db, Producao
+
+def _producoes(lotes, segunda, dias):
+    Producao.insert_many([{'lote': lote.id_lote, 'data_coleta': segunda + timedelta(days=n),
+                           'quantidade_aves': 100, 'quantidade_ovos': 80 + n,
+                           'qualidade_producao': 'Boa' if n % 2 else 'Regular',
+                           'producao_nao_aproveitada': 2, 'responsavel': 'Teste'}
+                          for n in range(dias) for lote in lotes]).execute()
+
+def test_relatorio_agrupado_em_sql_com_indicadores(banco, criar_lote):
+    with db.connection_context():
+        l1, l2 = criar_lote('L1'), criar_lote('L2')
+        segunda = date(2024, 5, 6)
+        _producoes((l1, l2), segunda, 14)
+
+        relatorio = ProducaoController.relatorio(segunda, segunda + timedelta(days=13), agrupamento='semana')
+        ovos = 2 * sum(80 + n for n in range(14))
+        assert relatorio['totais']['registros'] == 28 and relatorio['totais']['ovos'] == ovos
+        assert relatorio['totais']['taxa_quebra'] == round(56 / ovos * 100, 2)
+        assert relatorio['totais']['ovos_por_ave'] == round(ovos / 2800, 2)
+        assert [g['grupo'] for g in relatorio['grupos']] == ['2024-05-06', '2024-05-13']
+        assert relatorio['grupos'][0]['ovos'] == 2 * sum(80 + n for n in range(7))
+
+        por_lote = ProducaoController.relatorio(agrupamento='lote', lote='L2')
+        assert [(g['grupo'], g['registros']) for g in por_lote['grupos']] == [('L2', 14)]
+        por_qualidade = ProducaoController.relatorio(agrupamento='qualidade')
+        assert {g['grupo']: g['registros'] for g in por_qualidade['grupos']} == {'Boa': 14, 'Regular': 14}
+
+        sem_grupo = ProducaoController.relatorio()
+        assert sem_grupo['grupos'] == [] and sem_grupo['totais'] == relatorio['totais']
+
+        with pytest.raises(BusinessError):
+            ProducaoController.relatorio(agrupamento='ano')
+
+def test_registros_paginados_por_cursor(banco, criar_lote):
+    with db.connection_context():
+        lote = criar_lote('L1')
+        segunda = date(2024, 5, 6)
+        _producoes((lote,), segunda, 25)
+
+        primeira = ProducaoController.relatorio(limite=10)
+        assert len(primeira['registros']) == 10 and primeira['anterior'] is None
+        assert primeira['registros'][0].data_coleta == segunda + timedelta(days=24)
+        assert primeira['registros'][0].lote.numero_lote == 'L1'
+
+        segunda_pagina = ProducaoController.relatorio(apos=primeira['proximo'], limite=10)
+        ultima = ProducaoController.relatorio(apos=segunda_pagina['proximo'], limite=10)
+        assert len(ultima['registros']) == 5 and ultima['proximo'] is None
+        assert ultima['registros'][-1].data_coleta == segunda
+
+        volta = ProducaoController.relatorio(antes=ultima['anterior'], limite=10)
+        assert [r.id_producao for r in volta['registros']] == [r.id_producao for r in segunda_pagina['registros']]
+
+        exportados = list(ProducaoController.registros_relatorio(lote='L1'))
+        assert len(exportados) == 25 and exportados[0][:3] == (segunda, 'L1', 80)
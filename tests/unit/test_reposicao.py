@@ -0,0 +1,35 @@
+from datetime import date, timedelta
+import pytest
+from app.controllers.previsao_controller import PrevisaoConsumoController
+from app.controllers.reposicao_controller import ReposicaoController
+from app.models.database import db, InsumoNovo, Usuarios
+
+def test_ponto_de_pedido_e_quantidade_sugerida(banco, criar_movimentacao):
+    with db.connection_context():
+        usuario = Usuarios.get()
+        racao = InsumoNovo.create(nome='Ração', categoria='Ração', unidade='kg', quantidade_atual=40)
+        vacina = InsumoNovo.create(nome='Vacina', categoria='Medicamento', unidade='un', quantidade_atual=500)
+        InsumoNovo.create(nome='Cal', categoria='Limpeza', unidade='kg', quantidade_atual=0)     # sem consumo
+        for dias_atras in range(60, 0, -1):
+            dia = date.today() - timedelta(days=dias_atras)
+            criar_movimentacao(racao, 'Saída - Uso', 10, dia, usuario)
+            criar_movimentacao(vacina, 'Saída - Uso', 5 if dias_atras % 2 == 0 else 15, dia, usuario)
+
+        PrevisaoConsumoController.atualizar()
+        resultado = {r['nome']: r for r in ReposicaoController.calcular(prazos_entrega={'Ração': 6}, ciclo_dias=30)}
+
+        # Consumo constante: sem estoque de segurança
+        assert resultado['Ração']['prazo_entrega_dias'] == 6
+        assert resultado['Ração']['estoque_seguranca'] == pytest.approx(0, abs=1e-6)
+        assert resultado['Ração']['ponto_pedido'] == pytest.approx(60)
+        assert resultado['Ração']['repor'] is True
+        assert resultado['Ração']['quantidade_sugerida'] == 10 * (6 + 30) - 40
+
+        # Consumo variável: segurança cresce com o nível de serviço
+        assert resultado['Vacina']['estoque_seguranca'] > 0
+        assert resultado['Vacina']['repor'] is False and resultado['Vacina']['quantidade_sugerida'] == 0
+        mais_seguro = ReposicaoController.calcular(categoria='Medicamento', nivel_servico=0.99)[0]
+        assert mais_seguro['estoque_seguranca'] > resultado['Vacina']['estoque_seguranca']
+
+        assert resultado['Cal']['repor'] is False
+        assert [r['nome'] for r in ReposicaoController.calcular(apenas_repor=True)] == ['Ração']
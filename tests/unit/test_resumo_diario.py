@@ -0,0 +1,44 @@
+from datetime import date, timedelta
+from app.controllers.producao_controller import ProducaoController
+from app.models.database import db, ProducaoDiaria
+
+def _resumo():
+    return sorted(ProducaoDiaria
+                  .select(ProducaoDiaria.lote, ProducaoDiaria.dia, ProducaoDiaria.total_ovos,
+                          ProducaoDiaria.total_perdas, ProducaoDiaria.total_aves, ProducaoDiaria.registros)
+                  .tuples())
+
+def _confere_com_reconstrucao():
+    incremental = _resumo()
+    ProducaoController.reconstruir_resumo_diario()
+    assert incremental == _resumo()
+    return incremental
+
+def test_resumo_incremental_igual_a_reconstrucao(banco, criar_lote):
+    with db.connection_context():
+        l1, l2 = criar_lote('L1'), criar_lote('L2')
+        dia = date(2024, 5, 6)
+        ids = [ProducaoController.criar_producao(lote.id_lote, dia + timedelta(days=n), 100, 80 + n, 'Boa', n,
+                                                 'Teste').id_producao
+               for n in range(3) for lote in (l1, l2)]
+        assert len(_confere_com_reconstrucao()) == 6
+
+        # Mesmo registro com outros valores, movido para outro lote e para outro dia
+        ProducaoController.atualizar(ids[0], quantidade_ovos=50, quantidade_aves=90)
+        ProducaoController.atualizar(ids[2], lote=l2.id_lote, data_coleta=dia + timedelta(days=10))
+        ProducaoController.atualizar(ids[3], data_coleta=dia + timedelta(days=20))
+        resumo = _confere_com_reconstrucao()
+        assert (l1.id_lote, dia, 50, 0, 90, 1) in resumo
+        assert not any(linha[:2] == (l1.id_lote, dia + timedelta(days=1)) for linha in resumo)
+
+        # Importação sobre dias já existentes e exclusões
+        ProducaoController.importar_registros([
+            {'id_lote': l1.id_lote, 'data_coleta': (dia + timedelta(days=2)).isoformat(), 'quantidade_aves': 100,
+             'quantidade_ovos': 70, 'qualidade_producao': 'Bom', 'responsavel': 'Teste'},
+            {'id_lote': l2.id_lote, 'data_coleta': (dia + timedelta(days=30)).isoformat(), 'quantidade_aves': 100,
+             'quantidade_ovos': 60, 'qualidade_producao': 'Bom', 'responsavel': 'Teste'}])
+        ProducaoController.excluir_producao(ids[1])
+        ProducaoController.deletar(ids[2])
+        resumo = _confere_com_reconstrucao()
+        assert (l1.id_lote, dia + timedelta(days=2), 70, 0, 100, 1) in resumo
+        assert not any(linha[:2] == (l2.id_lote, dia + timedelta(days=10)) for linha in resumo)
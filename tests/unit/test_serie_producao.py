@@ -0,0 +1,48 @@
+from datetime import date, timedelta
+import numpy as np
+import pytest
+from app.controllers.serie_producao_controller import SerieProducaoController, lttb
+from app.exceptions import BusinessError
+from app.models.database import db, ProducaoDiaria
+
+def test_agrupamento_por_semana_e_lote(banco, criar_lote):
+    with db.connection_context():
+        l1, l2 = criar_lote('L1'), criar_lote('L2')
+        segunda = date(2024, 5, 6)
+        for n in range(14):
+            for lote in (l1, l2):
+                ProducaoDiaria.create(lote=lote, dia=segunda + timedelta(days=n), total_ovos=80 + n,
+                                      total_perdas=1, total_aves=100, registros=1)
+
+        serie = SerieProducaoController.serie(segunda, segunda + timedelta(days=13), 'semana')
+        assert serie['periodos'] == ['2024-05-06', '2024-05-13']
+        assert serie['ovos'] == [2 * sum(80 + n for n in range(7)), 2 * sum(80 + n for n in range(7, 14))]
+        assert serie['perdas'] == [14, 14]
+        assert serie['taxa_postura'][0] == pytest.approx(83.0)
+
+        do_lote = SerieProducaoController.serie(segunda, segunda + timedelta(days=13), 'mes', lote='L2')
+        assert do_lote['periodos'] == ['2024-05-01'] and do_lote['ovos'] == [sum(80 + n for n in range(14))]
+
+        with pytest.raises(BusinessError):
+            SerieProducaoController.serie(segunda, segunda, 'ano')
+
+def test_serie_longa_reduzida_mantem_extremos_e_picos(banco, criar_lote):
+    with db.connection_context():
+        lote = criar_lote('L1')
+        inicio = date(2020, 1, 1)
+        dias = 3 * 365
+        ProducaoDiaria.insert_many([{'lote': lote.id_lote, 'dia': inicio + timedelta(days=n),
+                                     'total_ovos': 5 if n == 500 else 90, 'total_perdas': 0,
+                                     'total_aves': 100, 'registros': 1} for n in range(dias)]).execute()
+
+        serie = SerieProducaoController.serie(inicio, inicio + timedelta(days=dias - 1), max_pontos=150)
+        assert serie['total_periodos'] == dias and serie['reduzida'] is True
+        assert len(serie['periodos']) == 150
+        assert serie['periodos'][0] == inicio.isoformat()
+        assert serie['periodos'][-1] == (inicio + timedelta(days=dias - 1)).isoformat()
+        assert (inicio + timedelta(days=500)).isoformat() in serie['periodos']      # a queda não some
+
+def test_lttb_sem_reducao_quando_cabe():
+    x = np.arange(10, dtype=float)
+    assert list(lttb(x, x, 20)) == list(range(10))
+    assert len(lttb(x, np.sin(x), 5)) == 5